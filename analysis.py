@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+import compute
+from data_store import EXTRA_EXPENSE_PREFIX
+
+# Expense checklist value (also the DataStore key) -> display label
+EXPENSE_CATEGORIES = {
+    'energy': 'Energy & Gas',
+    'healthcare': 'Healthcare',
+    'housing': 'Housing & Utilities',
+    'leisure': 'Leisure Goods',
+}
+
+# Dataset key -> display label
+SERIES_LABELS = {
+    'income': 'Median Household Income',
+    'min_wage': 'Minimum Wage',
+    **EXPENSE_CATEGORIES,
+}
+
+# Income-to-expense ratio series in the growth cube -> display label
+INCOME_RATIOS = {f"income-to-{key}": f"Income-to-{label} ratio" for key, label in EXPENSE_CATEGORIES.items()}
+
+
+def expense_keys(datasets):
+    """Expense dataset keys: the dashboard's categories, then any extra expense series loaded for scale testing"""
+    return list(EXPENSE_CATEGORIES) + [key for key in datasets if key.startswith(EXTRA_EXPENSE_PREFIX)]
+
+
+def value_column(df):
+    """Return the name of the FRED series column in a dataset"""
+    return [col for col in df.columns if col != 'observation_date'][0]
+
+
+def filter_by_year_range(df, start_year, end_year):
+    """Filter dataframe by year range"""
+    return df[compute.year_mask(df['observation_date'].dt.year.to_numpy(), start_year, end_year)]
+
+
+def calculate_growth_percentage(series):
+    """Calculate percentage growth from first to last value"""
+    return compute.growth_percentage(series.to_numpy())
+
+
+def growth_in_range(df):
+    """Growth percentage of an already filtered dataset, or None with fewer than two rows"""
+    if len(df) > 1:
+        return calculate_growth_percentage(df[value_column(df)])
+    return None
+
+
+def adjust_for_inflation(df, value_column, base_year=2020):
+    """Apply inflation adjustment to convert values to base_year dollars"""
+    # This is a simplified inflation adjustment (see compute.INFLATION_RATE)
+    df_copy = df.copy()
+    df_copy[value_column] = compute.adjust_for_inflation(
+        df_copy[value_column].to_numpy(), df_copy['observation_date'].dt.year.to_numpy(), base_year)
+    return df_copy
+
+
+def apply_view(df, view_option, base_year=2020):
+    """Return a copy of a filtered dataset transformed for the selected view option"""
+    col = value_column(df)
+    if view_option == 'percent':
+        display_df = df.copy()
+        display_df[col] = compute.percent_change(df[col].to_numpy())
+        return display_df
+    if view_option == 'adjusted':
+        return adjust_for_inflation(df, col, base_year)
+    return df.copy()
+
+
+def filter_expenses(datasets, selected_expenses, start_year, end_year):
+    """Filter the selected expense datasets by year range, keyed by display label"""
+    return {label: filter_by_year_range(datasets[key], start_year, end_year)
+            for key, label in EXPENSE_CATEGORIES.items() if key in selected_expenses}
+
+
+def series_arrays(df):
+    """(years, values) arrays of a dataset, the form the compute functions take"""
+    return df['observation_date'].dt.year.to_numpy(), df[value_column(df)].to_numpy()
+
+
+def income_expense_ratios(income_df, expense_df):
+    """Income divided by expense for each year both series cover; returns (years, ratios)"""
+    return compute.income_expense_ratios(*series_arrays(income_df), *series_arrays(expense_df))
+
+
+def latest_income_expense_ratio(income_df, expense_df):
+    """Income-to-expense ratio in the latest year both series cover, or None"""
+    return compute.latest_income_expense_ratio(*series_arrays(income_df), *series_arrays(expense_df))
+
+
+def income_distribution(income_df):
+    """Per-year household income distribution anchored to the median income series"""
+    return compute.IncomeDistribution.lognormal(*series_arrays(income_df))
+
+
+def household_budget(datasets):
+    """Household budget simulator over the per-capita expense series"""
+    return compute.HouseholdBudget({key: series_arrays(datasets[key]) for key in expense_keys(datasets)})
+
+
+def fit_dataset_trends(datasets):
+    """Trend fits for every dataset over its whole history: {key: {model: TrendFit}}"""
+    return {key: compute.fit_trends(*series_arrays(df)) for key, df in datasets.items()}
+
+
+def forecast_in_view(fit, filtered_df, view_option, end_year=compute.FORECAST_END_YEAR, base_year=2020):
+    """(dates, values) of a forecast extension shown like the filtered dataset, or None
+
+    Extensions are only drawn when the range reaches the series' last observation
+    and holds at least two points. In the percent view they are measured from
+    the first value in the range, like the history.
+    """
+    if fit is None or len(filtered_df) < 2:
+        return None
+    years, values = series_arrays(filtered_df)
+    if years[-1] < fit.last_year:
+        return None
+    forecast_years, forecast = fit.extension(end_year)
+    shown = compute.apply_view(np.r_[values[0], forecast], np.r_[years[0], forecast_years], view_option, base_year)
+    return pd.to_datetime([f"{year}-01-01" for year in forecast_years]), shown[1:]
+
+
+def rolling_analytics(datasets):
+    """Rolling moving averages, CAGR and volatility for every dataset, over their whole histories"""
+    return compute.RollingAnalytics({key: series_arrays(df) for key, df in datasets.items()})
+
+
+def rolling_in_view(analytics, key, measure, window, filtered_df, view_option, base_year=2020):
+    """(dates, values) of a rolling measure over the filtered dataset's years, shown for the view, or None
+
+    Moving averages follow the view like the series itself (measured from the
+    first value in the range in the percent view). CAGR and volatility are
+    already percentages: the percent view leaves them as they are and the
+    inflation-adjusted view shows real rates.
+    """
+    if filtered_df.empty:
+        return None
+    years, values = series_arrays(filtered_df)
+    real = view_option == 'adjusted'
+    rolling_years, rolling = analytics.series(key, measure, window, years[0], years[-1], real)
+    if not len(rolling_years):
+        return None
+    if measure == 'moving-average' and view_option == 'percent':
+        rolling = compute.apply_view(np.r_[values[0], rolling], np.r_[years[0], rolling_years], 'percent')[1:]
+    return pd.to_datetime([f"{year}-01-01" for year in rolling_years]), rolling
+
+
+def dataset_growth_cube(datasets):
+    """Growth cube (see compute.GrowthCube) of every dataset and every income-to-expense ratio"""
+    series = {key: series_arrays(df) for key, df in datasets.items()}
+    for key in expense_keys(datasets):
+        years, ratios = income_expense_ratios(datasets['income'], datasets[key])
+        series[f"income-to-{key}"] = (np.array(years, dtype=int), np.array(ratios))
+    return compute.GrowthCube(series)
+
+
+def work_hours(datasets):
+    """Hours of minimum-wage and median-pay work every expense category costs, per year"""
+    return compute.WorkHours(series_arrays(datasets['min_wage']), series_arrays(datasets['income']),
+                             {key: series_arrays(datasets[key]) for key in expense_keys(datasets)})
+
+
+def living_wage(datasets):
+    """Living wage for every year and family type, with the minimum wage and median income to compare"""
+    return compute.LivingWage({key: series_arrays(datasets[key]) for key in expense_keys(datasets)},
+                              min_wage=series_arrays(datasets['min_wage']), income=series_arrays(datasets['income']))
+
+
+def affordability_attribution(datasets):
+    """Attribution of income-to-expense affordability changes to income and each expense category"""
+    return compute.AffordabilityAttribution(series_arrays(datasets['income']),
+                                            {key: series_arrays(datasets[key]) for key in expense_keys(datasets)})
+
+
+def latest_value(df):
+    """(year, value) of the last observation in a dataset, or None when it is empty"""
+    if df.empty:
+        return None
+    last = df.iloc[-1]
+    return last['observation_date'].year, last[value_column(df)]
+
+
+def affordability_baseline(datasets, categories, start_year, end_year):
+    """Latest median income, minimum wage and expense values in a year range, to score incomes against
+
+    Each series contributes its own latest observation in the range, the values
+    the income comparison panel and the ratio KPIs use.
+    """
+    income = latest_value(filter_by_year_range(datasets['income'], start_year, end_year))
+    if income is None:
+        raise ValueError(f"no median income data between {start_year} and {end_year}")
+    min_wage = latest_value(filter_by_year_range(datasets['min_wage'], start_year, end_year))
+    expenses = {}
+    for key in categories:
+        latest = latest_value(filter_by_year_range(datasets[key], start_year, end_year))
+        if latest is not None:
+            expenses[key] = latest[1]
+    return {
+        'year': income[0],
+        'median_income': income[1],
+        'min_wage': None if min_wage is None else min_wage[1],
+        'expenses': expenses,
+    }
+
+
+def score_incomes(datasets, incomes, categories=tuple(EXPENSE_CATEGORIES), start_year=None, end_year=None):
+    """Score an array of incomes against the latest median income, minimum wage and expenses
+
+    The year range defaults to all the data. Returns (baseline, scores) with
+    scores as a dict of arrays; see compute.score_incomes.
+    """
+    all_years = [df['observation_date'].dt.year for df in datasets.values()]
+    start_year = min(years.min() for years in all_years) if start_year is None else start_year
+    end_year = max(years.max() for years in all_years) if end_year is None else end_year
+    baseline = affordability_baseline(datasets, categories, start_year, end_year)
+    scores = compute.score_incomes(incomes, baseline['median_income'], baseline['min_wage'], baseline['expenses'])
+    return baseline, scores
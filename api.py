@@ -0,0 +1,307 @@
+import gzip
+import hashlib
+import io
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from flask import Blueprint, Response, jsonify, request
+
+from analysis import (EXPENSE_CATEGORIES, SERIES_LABELS, apply_view, filter_by_year_range, filter_expenses,
+                      growth_in_range, income_expense_ratios, latest_income_expense_ratio, score_incomes, value_column)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+API_PREFIX = '/api/v1'
+VIEW_OPTIONS = ('actual', 'percent', 'adjusted')
+DEFAULT_BASE_YEAR = 2020
+
+# Bodies smaller than this are sent uncompressed (the headers would cost more than they save)
+MIN_COMPRESS_BYTES = 512
+
+# Bodies larger than this are compressed at the fastest level, where compression time starts to dominate
+FAST_COMPRESS_BYTES = 1024 * 1024
+
+# Most incomes one affordability request may score
+MAX_SCORED_INCOMES = 1_000_000
+
+# Decimal places kept per affordability score column (full precision is noise in a payroll report)
+SCORE_DECIMALS = {'ratio_pct': 2, 'difference': 2, 'min_wage_multiple': 4}
+RATIO_DECIMALS = 4
+
+
+class ApiError(ValueError):
+    """A request the data API cannot serve"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def year_bounds(datasets):
+    """(first, last) observation year across every dataset, the default start and end"""
+    all_years = pd.concat([df['observation_date'].dt.year for df in datasets.values()])
+    return int(all_years.min()), int(all_years.max())
+
+
+@lru_cache(maxsize=8)
+def _year_bounds_for(store, version):
+    return year_bounds(store.datasets)
+
+
+def store_year_bounds(store):
+    """year_bounds() of a store's datasets, computed once per dataset version rather than per request"""
+    return _year_bounds_for(store, store.version)
+
+
+def parse_params(args, bounds):
+    """Validate query parameters and return them in canonical (hashable) form; bounds is year_bounds()"""
+    try:
+        start_year = int(args.get('start', bounds[0]))
+        end_year = int(args.get('end', bounds[1]))
+        base_year = int(args.get('base_year', DEFAULT_BASE_YEAR))
+    except ValueError:
+        raise ApiError("start, end and base_year must be integers")
+    if start_year > end_year:
+        raise ApiError("start must not be after end")
+    # The adjusted view compounds inflation from the base year, so far-off years overflow
+    if 'base_year' in args and not bounds[0] <= base_year <= bounds[1]:
+        raise ApiError(f"base_year must be between {bounds[0]} and {bounds[1]}")
+
+    categories = args.get('categories')
+    if categories is None:
+        categories = tuple(EXPENSE_CATEGORIES)
+    else:
+        categories = tuple(sorted({item for item in categories.split(',') if item}))
+        unknown = [item for item in categories if item not in EXPENSE_CATEGORIES]
+        if unknown:
+            raise ApiError(f"unknown categories: {', '.join(unknown)}")
+
+    view = args.get('view', 'actual')
+    if view not in VIEW_OPTIONS:
+        raise ApiError(f"view must be one of: {', '.join(VIEW_OPTIONS)}")
+
+    return (('start', start_year), ('end', end_year), ('categories', categories),
+            ('view', view), ('base_year', base_year))
+
+
+def _json_values(values):
+    """Convert a numeric column to a JSON-safe list (NaN becomes null)"""
+    return [None if pd.isna(value) else float(value) for value in values]
+
+
+def series_payload(datasets, params):
+    """Filtered, view-transformed income, minimum wage and expense series"""
+    p = dict(params)
+    series = []
+    for key in ('income', 'min_wage') + p['categories']:
+        filtered_df = filter_by_year_range(datasets[key], p['start'], p['end'])
+        display_df = apply_view(filtered_df, p['view'], p['base_year'])
+        series.append({
+            'key': key,
+            'label': SERIES_LABELS[key],
+            'series_id': value_column(display_df),
+            'dates': display_df['observation_date'].dt.strftime('%Y-%m-%d').tolist(),
+            'values': _json_values(display_df[value_column(display_df)]),
+        })
+    return {'series': series}
+
+
+def kpi_payload(datasets, params):
+    """The Key Metrics card values as numbers (None where the dashboard shows N/A)"""
+    p = dict(params)
+    filtered_income = filter_by_year_range(datasets['income'], p['start'], p['end'])
+    filtered_min_wage = filter_by_year_range(datasets['min_wage'], p['start'], p['end'])
+    housing_growth = housing_ratio = None
+    if 'housing' in p['categories']:
+        filtered_housing = filter_by_year_range(datasets['housing'], p['start'], p['end'])
+        housing_growth = growth_in_range(filtered_housing)
+        housing_ratio = latest_income_expense_ratio(filtered_income, filtered_housing)
+    return {
+        'income_growth_pct': growth_in_range(filtered_income),
+        'housing_growth_pct': housing_growth,
+        'income_housing_ratio': housing_ratio,
+        'min_wage_growth_pct': growth_in_range(filtered_min_wage),
+    }
+
+
+def ratio_payload(datasets, params):
+    """Income-to-expense ratio for each selected category and year"""
+    p = dict(params)
+    filtered_income = filter_by_year_range(datasets['income'], p['start'], p['end'])
+    ratios = []
+    for label, df in filter_expenses(datasets, p['categories'], p['start'], p['end']).items():
+        years, values = income_expense_ratios(filtered_income, df)
+        key = next(key for key, name in EXPENSE_CATEGORIES.items() if name == label)
+        ratios.append({'key': key, 'label': label, 'years': years, 'values': _json_values(values)})
+    return {'ratios': ratios}
+
+
+def parse_incomes(body, content_type):
+    """Incomes from a JSON body ({"incomes": [...]} or a bare list) or a CSV with an income column"""
+    try:
+        if content_type == 'text/csv':
+            frame = pd.read_csv(io.BytesIO(body))
+            incomes = frame['income'] if 'income' in frame else frame.iloc[:, 0]
+        else:
+            incomes = json.loads(body)
+            if isinstance(incomes, dict):
+                incomes = incomes.get('incomes')
+        incomes = np.asarray(incomes, dtype=float)
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise ApiError("send incomes as JSON {\"incomes\": [...]} or as CSV with an income column")
+    if incomes.ndim != 1 or not len(incomes):
+        raise ApiError("incomes must be a non-empty list of numbers")
+    if len(incomes) > MAX_SCORED_INCOMES:
+        raise ApiError(f"at most {MAX_SCORED_INCOMES} incomes can be scored at once", status=413)
+    if not np.isfinite(incomes).all():
+        raise ApiError("incomes must all be finite numbers")
+    return incomes
+
+
+def _json_array(values, decimals):
+    """Round a float array and convert it to a JSON-safe list (NaN becomes null)"""
+    values = np.round(values, decimals)
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+    values = values.astype(object)
+    values[~finite] = None
+    return values.tolist()
+
+
+def affordability_payload(datasets, params, incomes):
+    """Tier, percent of median, dollar gap, minimum wage multiple and expense ratios per income"""
+    p = dict(params)
+    try:
+        baseline, scores = score_incomes(datasets, incomes, p['categories'], p['start'], p['end'])
+    except ValueError as exc:
+        raise ApiError(str(exc))
+    columns = {'tier': scores.pop('tier').tolist()}
+    for name, values in scores.items():
+        columns[name] = _json_array(values, SCORE_DECIMALS.get(name, RATIO_DECIMALS))
+    return {
+        'baseline': {
+            'year': int(baseline['year']),
+            'median_income': float(baseline['median_income']),
+            'min_wage': None if baseline['min_wage'] is None else float(baseline['min_wage']),
+            'expenses': {key: float(value) for key, value in baseline['expenses'].items()},
+        },
+        'count': len(incomes),
+        'scores': columns,
+    }
+
+
+ENDPOINTS = {
+    'series': series_payload,
+    'kpis': kpi_payload,
+    'ratios': ratio_payload,
+}
+
+
+def make_etag(endpoint, version, params, encoding=None):
+    """Strong ETag from the dataset version, endpoint, parameters and the content encoding the body was sent with"""
+    digest = hashlib.sha1(repr((endpoint, version, params)).encode()).hexdigest()[:20]
+    return f"{digest}-{encoding}" if encoding else digest
+
+
+def negotiate_encoding(accept_encodings):
+    """Pick brotli when the client and server support it, then gzip, else identity"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    """Compress a response body with the negotiated content encoding"""
+    fast = len(body) > FAST_COMPRESS_BYTES
+    if encoding == 'br':
+        return brotli.compress(body, quality=1 if fast else 11)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=1 if fast else 6)
+    return body
+
+
+def register_api(server, store):
+    """Register the /api/v1 data endpoints on the Flask server"""
+    blueprint = Blueprint('api_v1', __name__, url_prefix=API_PREFIX)
+
+    @lru_cache(maxsize=256)
+    def render(endpoint, version, params, encoding):
+        """Build, serialize and compress one response body (cached per dataset version)"""
+        payload = {'version': version, 'params': dict(params), **ENDPOINTS[endpoint](store.datasets, params)}
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        if len(body) < MIN_COMPRESS_BYTES:
+            return body, None
+        return compress(body, encoding), encoding
+
+    def request_params():
+        return parse_params(request.args, store_year_bounds(store))
+
+    def respond(endpoint):
+        store.refresh()
+        version = store.version
+        params = request_params()
+        encoding = negotiate_encoding(request.accept_encodings)
+
+        # Answer repeat polls from the ETag alone, without computing anything. A client holds the
+        # ETag of the identity body or of the body compressed with its encoding; both are current
+        etags = [make_etag(endpoint, version, params, used) for used in dict.fromkeys([encoding, None])]
+        matched = next((etag for etag in etags if etag in request.if_none_match), None)
+        if matched is not None:
+            response = Response(status=304)
+            response.set_etag(matched)
+        else:
+            # The ETag names the encoding actually used: small bodies are sent as identity
+            body, used_encoding = render(endpoint, version, params, encoding)
+            response = Response(body, mimetype='application/json')
+            if used_encoding:
+                response.headers['Content-Encoding'] = used_encoding
+            response.set_etag(make_etag(endpoint, version, params, used_encoding))
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    @blueprint.route('/series')
+    def series():
+        return respond('series')
+
+    @blueprint.route('/kpis')
+    def kpis():
+        return respond('kpis')
+
+    @blueprint.route('/ratios')
+    def ratios():
+        return respond('ratios')
+
+    @blueprint.route('/affordability', methods=['POST'])
+    def affordability():
+        # Scores depend on the posted incomes, so they are neither cached nor given an ETag
+        store.refresh()
+        version = store.version
+        params = request_params()
+        incomes = parse_incomes(request.get_data(), request.mimetype)
+        payload = {'version': version, 'params': dict(params),
+                   **affordability_payload(store.datasets, params, incomes)}
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        encoding = negotiate_encoding(request.accept_encodings) if len(body) >= MIN_COMPRESS_BYTES else None
+        response = Response(compress(body, encoding), mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = 'no-store'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def handle_api_error(error):
+        return jsonify({'error': str(error)}), error.status
+
+    server.register_blueprint(blueprint)
+    # Registered app-wide so other /api/v1 blueprints (e.g. exports) report errors the same way
+    server.register_error_handler(ApiError, handle_api_error)
+    return blueprint
@@ -1,12 +1,20 @@
 import dash
 from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
 
+from analysis import INCOME_RATIOS, SERIES_LABELS
+from compute import ROLLING_WINDOWS
+from compute.living_wage import LIVING_WAGE_MAX_ADULTS, LIVING_WAGE_MAX_CHILDREN
+from compute.household import MAX_ADULTS, MAX_CHILDREN
+from data_store import DataStore
+from defaults import DEFAULT_INPUTS
+
 # Define a colors dictionary to reuse for charts and styling across the app
 COLORS = {
     "cash": "#3cb521",  # Example color for cash-related elements (if needed)
@@ -20,326 +28,718 @@ COLORS = {
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.SPACELAB, dbc.icons.FONT_AWESOME])
 app.title = "California Cost of Living Dashboard"
 
-# Load datasets and convert observation_date columns to datetime objects
-min_wage_df = pd.read_csv('data/CaliMinWage.csv')
-min_wage_df['observation_date'] = pd.to_datetime(min_wage_df['observation_date'])
-
-energy_gas_df = pd.read_csv('data/energyGasPC.csv')
-energy_gas_df['observation_date'] = pd.to_datetime(energy_gas_df['observation_date'])
-
-healthcare_df = pd.read_csv('data/healthCarePC.csv')
-healthcare_df['observation_date'] = pd.to_datetime(healthcare_df['observation_date'])
-
-housing_df = pd.read_csv('data/housingUtliPC.csv')
-housing_df['observation_date'] = pd.to_datetime(housing_df['observation_date'])
-
-leisure_df = pd.read_csv('data/leisureGoodsPC.csv')
-leisure_df['observation_date'] = pd.to_datetime(leisure_df['observation_date'])
-
-income_df = pd.read_csv('data/medianHouseIncomeCal.csv')
-income_df['observation_date'] = pd.to_datetime(income_df['observation_date'])
-
-# Build the app layout using Bootstrap components and styling classes
-app.layout = dbc.Container([
-    # Header Section with updated styling (centered text, primary background, white text, and padding)
-    dbc.Row([
-        dbc.Col([
-            html.H1(
-                "California Cost of Living Dashboard",
-                className="text-center bg-primary text-white p-2"
-            ),
-            html.P(
-                "Explore changes in income, expenses, and affordability factors over time",
-                className="text-center lead"
-            )
-        ])
-    ]),
-
-    html.Hr(),
-
-    # Date Range Selector Section
-    dbc.Row([
-        dbc.Col([
-            html.H5("Select Date Range"),
-            dcc.RangeSlider(
-                id='year-slider',
-                min=min(min_wage_df['observation_date'].dt.year.min(), income_df['observation_date'].dt.year.min()),
-                max=max(min_wage_df['observation_date'].dt.year.max(), income_df['observation_date'].dt.year.max()),
-                step=1,
-                marks={
-                    i: str(i) for i in range(
-                        min(min_wage_df['observation_date'].dt.year.min(), income_df['observation_date'].dt.year.min()),
-                        max(min_wage_df['observation_date'].dt.year.max(),
-                            income_df['observation_date'].dt.year.max()) + 1,
-                        5
-                    )
-                },
-                value=[1990, 2020]  # Default selection
-            ),
-        ], width=12, md=10, className="mx-auto mb-4")
-    ]),
-
-    # Analysis Controls Section with two cards for options and key metrics
-    dbc.Row([
-        # Analysis Options Card
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Analysis Options"),
-                dbc.CardBody([
-                    html.Label("Select Expense Categories:"),
-                    dbc.Checklist(
-                        id='expense-checklist',
-                        options=[
-                            {'label': ' Energy & Gas', 'value': 'energy'},
-                            {'label': ' Healthcare', 'value': 'healthcare'},
-                            {'label': ' Housing & Utilities', 'value': 'housing'},
-                            {'label': ' Leisure Goods', 'value': 'leisure'}
-                        ],
-                        value=['energy', 'healthcare', 'housing'],
-                        inline=True
-                    ),
-                    html.Br(),
-                    html.Label("View Option:"),
-                    dbc.RadioItems(
-                        id='view-radio',
-                        options=[
-                            {'label': ' Actual Values', 'value': 'actual'},
-                            {'label': ' Percentage Change', 'value': 'percent'},
-                            {'label': ' Inflation Adjusted (~2.5%) ', 'value': 'adjusted'}
-                        ],
-                        value='actual',
-                        inline=True
-                    ),
-                ])
+# Load datasets (observation_date columns are parsed to datetime objects)
+_load_started = time.perf_counter()
+store = DataStore()
+# Seconds spent in each startup phase (see scripts/startup_profile.py)
+startup_timings = {'data_load': time.perf_counter() - _load_started}
+
+# Milliseconds the income input waits after the last keystroke before sending its value,
+# so typing a salary makes one server call instead of one per digit
+INCOME_INPUT_DEBOUNCE_MS = 400
+
+# Import callbacks from an external file and register them with the app.
+# (Ensure your callbacks use the COLORS dictionary for any chart styling if needed.)
+from callbacks import register_callbacks, prerender_outputs
+from metrics import CallbackMetrics, register_metrics
+from memory import CallbackMemoryTracker, register_memory_tracking
+from profiling import CallbackProfiler, register_profiling
+
+# Per-callback latency and payload metrics, exposed at /metrics and /metrics.json
+metrics = CallbackMetrics()
+# On-demand profiling is only available when DASHBOARD_PROFILE_TOKEN is set
+profiler = CallbackProfiler.from_env()
+# Per-invocation allocation tracking (tracemalloc) is only on when DASHBOARD_TRACE_MEMORY is set
+memory = CallbackMemoryTracker.from_env()
+
+
+def background_callback_manager():
+    """Dash background callback manager backed by diskcache, or None when DASHBOARD_BACKGROUND_CALLBACKS=0
+
+    Results are cached on disk by inputs and dataset version, so any worker can
+    reuse a simulation another one ran. Without diskcache (and multiprocess and
+    psutil) the app refuses to start rather than quietly run the simulation in
+    the request; set DASHBOARD_BACKGROUND_CALLBACKS=0 to do that deliberately.
+    """
+    if os.environ.get('DASHBOARD_BACKGROUND_CALLBACKS', '1') == '0':
+        return None
+    try:
+        import diskcache
+    except ImportError as exc:
+        raise RuntimeError("background callbacks need the diskcache, multiprocess and psutil packages; install them "
+                           "or set DASHBOARD_BACKGROUND_CALLBACKS=0 to run slow callbacks in the request") from exc
+    cache = diskcache.Cache(os.environ.get('DASHBOARD_CALLBACK_CACHE',
+                                           os.path.join(tempfile.gettempdir(), 'dashboard-callbacks')))
+    return dash.DiskcacheManager(cache, cache_by=[lambda: store.version], expire=24 * 3600)
+
+
+# Slow callbacks (the projection) run as background callbacks unless DASHBOARD_BACKGROUND_CALLBACKS=0
+_registration_started = time.perf_counter()
+background_manager = background_callback_manager()
+callbacks = register_callbacks(app, store, metrics=metrics, profiler=profiler, memory=memory,
+                               background_manager=background_manager)
+startup_timings['callback_registration'] = time.perf_counter() - _registration_started
+
+_registration_started = time.perf_counter()
+register_metrics(app, metrics)
+if profiler is not None:
+    register_profiling(app.server, profiler)
+if memory is not None:
+    register_memory_tracking(app.server, memory)
+
+# JSON data API (/api/v1/...) served from the same analysis helpers as the callbacks
+from api import register_api
+
+register_api(app.server, store)
+
+# Streaming CSV / Parquet / Excel exports of the current selection
+from export import register_export
+
+register_export(app.server, store)
+startup_timings['route_registration'] = time.perf_counter() - _registration_started
+
+
+def build_layout(initial):
+    """Build the app layout using Bootstrap components, filled with prerendered outputs"""
+    min_wage_df = store['min_wage']
+    income_df = store['income']
+
+    return dbc.Container([
+        # Header Section with updated styling (centered text, primary background, white text, and padding)
+        dbc.Row([
+            dbc.Col([
+                html.H1(
+                    "California Cost of Living Dashboard",
+                    className="text-center bg-primary text-white p-2"
+                ),
+                html.P(
+                    "Explore changes in income, expenses, and affordability factors over time",
+                    className="text-center lead"
+                )
+            ])
+        ]),
+
+        html.Hr(),
+
+        # Date Range Selector Section
+        dbc.Row([
+            dbc.Col([
+                html.H5("Select Date Range"),
+                dcc.RangeSlider(
+                    id='year-slider',
+                    min=min(min_wage_df['observation_date'].dt.year.min(), income_df['observation_date'].dt.year.min()),
+                    max=max(min_wage_df['observation_date'].dt.year.max(), income_df['observation_date'].dt.year.max()),
+                    step=1,
+                    marks={
+                        i: str(i) for i in range(
+                            min(min_wage_df['observation_date'].dt.year.min(), income_df['observation_date'].dt.year.min()),
+                            max(min_wage_df['observation_date'].dt.year.max(),
+                                income_df['observation_date'].dt.year.max()) + 1,
+                            5
+                        )
+                    },
+                    value=DEFAULT_INPUTS['year-slider.value']  # Default selection
+                ),
+            ], width=12, md=10, className="mx-auto mb-4")
+        ]),
+
+        # Analysis Controls Section with two cards for options and key metrics
+        dbc.Row([
+            # Analysis Options Card
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Analysis Options"),
+                    dbc.CardBody([
+                        html.Label("Select Expense Categories:"),
+                        dbc.Checklist(
+                            id='expense-checklist',
+                            options=[
+                                {'label': ' Energy & Gas', 'value': 'energy'},
+                                {'label': ' Healthcare', 'value': 'healthcare'},
+                                {'label': ' Housing & Utilities', 'value': 'housing'},
+                                {'label': ' Leisure Goods', 'value': 'leisure'}
+                            ],
+                            value=DEFAULT_INPUTS['expense-checklist.value'],
+                            inline=True
+                        ),
+                        html.Br(),
+                        html.Label("View Option:"),
+                        dbc.RadioItems(
+                            id='view-radio',
+                            options=[
+                                {'label': ' Actual Values', 'value': 'actual'},
+                                {'label': ' Percentage Change', 'value': 'percent'},
+                                {'label': ' Inflation Adjusted (~2.5%) ', 'value': 'adjusted'}
+                            ],
+                            value=DEFAULT_INPUTS['view-radio.value'],
+                            inline=True
+                        ),
+                        html.Br(),
+                        html.Label("Forecast to 2030:"),
+                        dbc.RadioItems(
+                            id='forecast-radio',
+                            options=[
+                                {'label': ' None', 'value': 'none'},
+                                {'label': ' Linear', 'value': 'linear'},
+                                {'label': ' Log-linear (CAGR)', 'value': 'log-linear'},
+                                {'label': ' Holt', 'value': 'holt'}
+                            ],
+                            value=DEFAULT_INPUTS['forecast-radio.value'],
+                            inline=True
+                        ),
+                        html.Br(),
+                        html.Label("Rolling Overlay:"),
+                        dbc.RadioItems(
+                            id='rolling-measure',
+                            options=[
+                                {'label': ' None', 'value': 'none'},
+                                {'label': ' Moving Average', 'value': 'moving-average'},
+                                {'label': ' CAGR', 'value': 'cagr'},
+                                {'label': ' Volatility', 'value': 'volatility'}
+                            ],
+                            value=DEFAULT_INPUTS['rolling-measure.value'],
+                            inline=True
+                        ),
+                        dbc.RadioItems(
+                            id='rolling-window',
+                            options=[{'label': f' {window}-year window', 'value': window} for window in ROLLING_WINDOWS],
+                            value=DEFAULT_INPUTS['rolling-window.value'],
+                            inline=True
+                        ),
+                        html.Br(),
+                        html.Label("Download Data:"),
+                        html.Div([
+                            dbc.Button([html.I(className="fa fa-download me-1"), label], id=f'export-{fmt}',
+                                       href=initial[f'export-{fmt}.href'], external_link=True,
+                                       color="secondary", outline=True, size="sm", className="me-2")
+                            for fmt, label in [('csv', "CSV"), ('parquet', "Parquet"), ('xlsx', "Excel")]
+                        ]),
+                    ])
+                ]),
+            ], width=12, lg=5),
+
+            # Key Metrics Card with updated text color classes
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Key Metrics"),
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H6("Median Income Growth", className="text-muted"),
+                                html.H4(initial['income-growth-value.children'], id='income-growth-value',
+                                        className="text-primary"),
+                            ], width=6),
+                            dbc.Col([
+                                html.H6("Housing Cost Growth", className="text-muted"),
+                                html.H4(initial['housing-growth-value.children'], id='housing-growth-value',
+                                        className="text-danger"),
+                            ], width=6),
+                        ]),
+                        html.Br(),
+                        dbc.Row([
+                            dbc.Col([
+                                html.H6("Income-to-Housing Ratio", className="text-muted"),
+                                html.H4(initial['income-housing-ratio.children'], id='income-housing-ratio',
+                                        className="text-success"),
+                            ], width=6),
+                            dbc.Col([
+                                html.H6("Minimum Wage Growth", className="text-muted"),
+                                html.H4(initial['min-wage-growth.children'], id='min-wage-growth',
+                                        className="text-info"),
+                            ], width=6),
+                        ]),
+                        html.Br(),
+                        dbc.Row([
+                            dbc.Col([
+                                html.H6("Min. Wage Hours for Housing", className="text-muted"),
+                                html.H4(initial['min-wage-housing-hours.children'], id='min-wage-housing-hours',
+                                        className="text-danger"),
+                            ], width=6),
+                            dbc.Col([
+                                html.H6("Median Pay Hours for Housing", className="text-muted"),
+                                html.H4(initial['median-pay-housing-hours.children'], id='median-pay-housing-hours',
+                                        className="text-primary"),
+                            ], width=6),
+                        ]),
+                    ])
+                ]),
+            ], width=12, lg=7),
+        ], className="mb-4"),
+
+        # Tabs Section: Contains multiple tabs for different analyses
+        dbc.Tabs([
+            # Complete Income Analysis Tab with Personal Income Comparison
+            # Replace your entire Income Analysis Tab section with this code
+            dbc.Tab(label="Income Analysis", tab_id="income-tab", children=[
+                # Personal income comparison section
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Compare Your Income"),
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.Label("Enter Your Annual Income ($):", className="form-label"),
+                                        dbc.InputGroup([
+                                            dbc.InputGroupText("$"),
+                                            dbc.Input(
+                                                id="personal-income-input",
+                                                type="number",
+                                                min=0,
+                                                step=1000,
+                                                debounce=INCOME_INPUT_DEBOUNCE_MS,
+                                                value=DEFAULT_INPUTS['personal-income-input.value'],
+                                                placeholder="Enter your annual income"
+                                            ),
+                                        ]),
+                                        html.Div(initial["income-comparison-result.children"], id="income-comparison-result",
+                                                 className="mt-3")
+                                    ], width=12, md=5),
+                                    dbc.Col([
+                                        dcc.Graph(id="income-comparison-chart", figure=initial["income-comparison-chart.figure"],
+                                              config={'displayModeBar': False})
+                                    ], width=12, md=7)
+                                ])
+                            ])
+                        ], className="mb-4")
+                    ], width=12)
+                ]),
+
+                # Existing Income Analysis content
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='income-chart', figure=initial['income-chart.figure'])
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Median Household Income Data", className="mt-3"),
+                        dash_table.DataTable(
+                            id='income-table',
+                            data=initial['income-table.data'],
+                            columns=initial['income-table.columns'],
+                            style_table={'overflowX': 'auto'},
+                            style_cell={
+                                'textAlign': 'left',
+                                'padding': '10px',
+                                'minWidth': '100px', 'width': '150px', 'maxWidth': '200px',
+                            },
+                            style_header={
+                                'backgroundColor': 'rgb(230, 230, 230)',
+                                'fontWeight': 'bold'
+                            },
+                            page_size=10,
+                        ),
+                    ], width=12)
+                ]),
             ]),
-        ], width=12, lg=5),
-
-        # Key Metrics Card with updated text color classes
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Key Metrics"),
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col([
-                            html.H6("Median Income Growth", className="text-muted"),
-                            html.H4(id='income-growth-value', className="text-primary"),
-                        ], width=6),
-                        dbc.Col([
-                            html.H6("Housing Cost Growth", className="text-muted"),
-                            html.H4(id='housing-growth-value', className="text-danger"),
-                        ], width=6),
-                    ]),
-                    html.Br(),
-                    dbc.Row([
-                        dbc.Col([
-                            html.H6("Income-to-Housing Ratio", className="text-muted"),
-                            html.H4(id='income-housing-ratio', className="text-success"),
-                        ], width=6),
-                        dbc.Col([
-                            html.H6("Minimum Wage Growth", className="text-muted"),
-                            html.H4(id='min-wage-growth', className="text-info"),
-                        ], width=6),
-                    ]),
-                ])
+
+            # Expenses Analysis Tab
+            dbc.Tab(label="Expenses Analysis", tab_id="expenses-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='expenses-chart', figure=initial['expenses-chart.figure'])
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Expense Comparison", className="mt-3"),
+                        dash_table.DataTable(
+                            id='expenses-table',
+                            data=initial['expenses-table.data'],
+                            columns=initial['expenses-table.columns'],
+                            style_table={'overflowX': 'auto'},
+                            style_cell={
+                                'textAlign': 'left',
+                                'padding': '10px',
+                                'minWidth': '100px', 'width': '150px', 'maxWidth': '200px',
+                            },
+                            style_header={
+                                'backgroundColor': 'rgb(230, 230, 230)',
+                                'fontWeight': 'bold'
+                            },
+                            page_size=10,
+                        ),
+                    ], width=12)
+                ]),
             ]),
-        ], width=12, lg=7),
-    ], className="mb-4"),
-
-    # Tabs Section: Contains multiple tabs for different analyses
-    dbc.Tabs([
-        # Complete Income Analysis Tab with Personal Income Comparison
-        # Replace your entire Income Analysis Tab section with this code
-        dbc.Tab(label="Income Analysis", tab_id="income-tab", children=[
-            # Personal income comparison section
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader("Compare Your Income"),
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    html.Label("Enter Your Annual Income ($):", className="form-label"),
-                                    dbc.InputGroup([
-                                        dbc.InputGroupText("$"),
-                                        dbc.Input(
-                                            id="personal-income-input",
-                                            type="number",
-                                            min=0,
-                                            step=1000,
-                                            value=60000,
-                                            placeholder="Enter your annual income"
-                                        ),
-                                    ]),
-                                    html.Div(id="income-comparison-result", className="mt-3")
-                                ], width=12, md=5),
-                                dbc.Col([
-                                    dcc.Graph(id="income-comparison-chart", config={'displayModeBar': False})
-                                ], width=12, md=7)
-                            ])
-                        ])
-                    ], className="mb-4")
-                ], width=12)
+            dbc.Tab(label="Comparative Analysis", tab_id="comparative-tab", children=[
+                # Explanation text at the top
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Income vs. Expenses Analysis", className="mt-5 mb-3 fw-bold"),
+                        html.P("This chart shows how income has changed relative to various expenses over time.",
+                               className="lead"),
+                        html.P(
+                            "A higher income-to-expense ratio indicates better affordability, while a declining ratio suggests expenses are growing faster than income.",
+                            className="text-muted"),
+                    ], width=12, className="p-4")
+                ], className="mt-4"),
+
+                # Income vs. Expenses Chart (Dynamic Height & Full Flex Growth)
+                dbc.Row([
+                    dbc.Col([
+                        html.Div([
+                            dcc.Graph(id='comparison-chart', figure=initial['comparison-chart.figure'],
+                                      config={'displayModeBar': False},
+                                      style={'flex': '1', 'min-height': '60vh', 'width': '100%'})
+                        ], style={'display': 'flex', 'flex-direction': 'column', 'height': '100%'})
+                    ], width=12, className="p-4")
+                ], className="mt-4"),
+
+                # Ratio Chart (Now with same flexbox styling)
+                dbc.Row([
+                    dbc.Col([
+                        html.Div([
+                            dcc.Graph(id='ratio-chart', figure=initial['ratio-chart.figure'],
+                                      config={'displayModeBar': False},
+                                      style={'flex': '1', 'min-height': '50vh', 'width': '100%'})
+                        ], style={'display': 'flex', 'flex-direction': 'column', 'height': '100%'})
+                    ], width=12, className="p-4")
+                ], className="mt-4 mb-5 py-4"),
+
+                # What moved affordability between the first and last year of the range
+                dbc.Row([
+                    dbc.Col([
+                        html.P("Each bar is the part of the change in median income over the selected categories' "
+                               "total that comes from income growth or from one category's cost growth, split by "
+                               "log-change shares so the parts add up to the whole change.",
+                               className="text-muted"),
+                        dcc.Graph(id='attribution-chart', figure=initial['attribution-chart.figure'],
+                                  config={'displayModeBar': False}),
+                        html.Div(initial['attribution-summary.children'], id='attribution-summary'),
+                    ], width=12)
+                ], className="mb-4"),
+
+                # Hours of work each category costs
+                dbc.Row([
+                    dbc.Col([
+                        html.P("Hours of work that pay for a year of each selected category (per person), at the "
+                               "minimum wage and at median pay: the median household income over a 2,080-hour "
+                               "full-time year.",
+                               className="text-muted"),
+                        dcc.Graph(id='hours-chart', figure=initial['hours-chart.figure'])
+                    ], width=12)
+                ], className="mb-4"),
             ]),
 
-            # Existing Income Analysis content
-            dbc.Row([
-                dbc.Col([
-                    dcc.Graph(id='income-chart')
-                ], width=12)
+            # Household Budget Simulator Tab
+            dbc.Tab(label="Household Budget", tab_id="household-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Household Budget Simulator", className="mt-3"),
+                        html.P("The expense series are per person. Pick a household to see what the selected "
+                               "categories would cost it each year, and what is left of its income.",
+                               className="text-muted"),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Adults:", className="form-label"),
+                        dcc.Dropdown(
+                            id='household-adults',
+                            options=[{'label': str(count), 'value': count} for count in range(1, MAX_ADULTS + 1)],
+                            value=DEFAULT_INPUTS['household-adults.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                    dbc.Col([
+                        html.Label("Children:", className="form-label"),
+                        dcc.Dropdown(
+                            id='household-children',
+                            options=[{'label': str(count), 'value': count} for count in range(MAX_CHILDREN + 1)],
+                            value=DEFAULT_INPUTS['household-children.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                    dbc.Col([
+                        html.Label("Household Income ($, blank for the median):", className="form-label"),
+                        dbc.Input(
+                            id='household-income-input',
+                            type="number",
+                            min=0,
+                            step=1000,
+                            debounce=INCOME_INPUT_DEBOUNCE_MS,
+                            value=DEFAULT_INPUTS['household-income-input.value'],
+                            placeholder="Median household income"
+                        ),
+                    ], width=12, md=4),
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Div(initial['household-budget-summary.children'], id='household-budget-summary'),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='household-budget-chart', figure=initial['household-budget-chart.figure'])
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='household-surplus-chart', figure=initial['household-surplus-chart.figure'],
+                                  config={'displayModeBar': False})
+                    ], width=12)
+                ], className="mb-4"),
             ]),
-            dbc.Row([
-                dbc.Col([
-                    html.H5("Median Household Income Data", className="mt-3"),
-                    dash_table.DataTable(
-                        id='income-table',
-                        style_table={'overflowX': 'auto'},
-                        style_cell={
-                            'textAlign': 'left',
-                            'padding': '10px',
-                            'minWidth': '100px', 'width': '150px', 'maxWidth': '200px',
-                        },
-                        style_header={
-                            'backgroundColor': 'rgb(230, 230, 230)',
-                            'fontWeight': 'bold'
-                        },
-                        page_size=10,
-                    ),
-                ], width=12)
+
+            # Projection Tab
+            dbc.Tab(label="Projection", tab_id="projection-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Monte Carlo Projection", className="mt-3"),
+                        html.P("Growth and volatility of income and the selected expenses are fitted to the "
+                               "selected years, then thousands of future paths are simulated. The bands show "
+                               "where the middle 50% and 90% of the paths end up.",
+                               className="text-muted"),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Years Ahead:", className="form-label"),
+                        dcc.Dropdown(
+                            id='projection-horizon',
+                            options=[{'label': str(years), 'value': years} for years in (5, 10, 20, 30)],
+                            value=DEFAULT_INPUTS['projection-horizon.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                    dbc.Col([
+                        html.Label("Simulated Paths:", className="form-label"),
+                        dcc.Dropdown(
+                            id='projection-paths',
+                            options=[{'label': f"{paths:,}", 'value': paths} for paths in (1000, 5000, 10000)],
+                            value=DEFAULT_INPUTS['projection-paths.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                    dbc.Col([
+                        html.Div(id='projection-status', className="text-muted mt-4"),
+                    ], width=12, md=4),
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='projection-chart', figure=initial['projection-chart.figure'])
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Div(initial['projection-summary.children'], id='projection-summary')
+                    ], width=12)
+                ], className="mb-4"),
             ]),
-        ]),
 
-        # Expenses Analysis Tab
-        dbc.Tab(label="Expenses Analysis", tab_id="expenses-tab", children=[
-            dbc.Row([
-                dbc.Col([
-                    dcc.Graph(id='expenses-chart')
-                ], width=12)
+            # Living Wage Tab
+            dbc.Tab(label="Living Wage", tab_id="living-wage-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Living Wage by Family Type", className="mt-3"),
+                        html.P("The pre-tax income a family needs to cover its costs each year, and the hourly "
+                               "wage each working adult would have to earn, compared with the minimum wage and "
+                               "the median household income.",
+                               className="text-muted"),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Working Adults:", className="form-label"),
+                        dcc.Dropdown(
+                            id='living-wage-adults',
+                            options=[{'label': str(count), 'value': count}
+                                     for count in range(1, LIVING_WAGE_MAX_ADULTS + 1)],
+                            value=DEFAULT_INPUTS['living-wage-adults.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                    dbc.Col([
+                        html.Label("Children:", className="form-label"),
+                        dcc.Dropdown(
+                            id='living-wage-children',
+                            options=[{'label': str(count), 'value': count}
+                                     for count in range(LIVING_WAGE_MAX_CHILDREN + 1)],
+                            value=DEFAULT_INPUTS['living-wage-children.value'],
+                            clearable=False
+                        ),
+                    ], width=6, md=2),
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Div(initial['living-wage-summary.children'], id='living-wage-summary'),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='living-wage-chart', figure=initial['living-wage-chart.figure'])
+                    ], width=12, lg=7),
+                    dbc.Col([
+                        dcc.Graph(id='living-wage-families-chart', figure=initial['living-wage-families-chart.figure'],
+                                  config={'displayModeBar': False})
+                    ], width=12, lg=5),
+                ], className="mb-4"),
             ]),
-            dbc.Row([
-                dbc.Col([
-                    html.H5("Expense Comparison", className="mt-3"),
-                    dash_table.DataTable(
-                        id='expenses-table',
-                        style_table={'overflowX': 'auto'},
-                        style_cell={
-                            'textAlign': 'left',
-                            'padding': '10px',
-                            'minWidth': '100px', 'width': '150px', 'maxWidth': '200px',
-                        },
-                        style_header={
-                            'backgroundColor': 'rgb(230, 230, 230)',
-                            'fontWeight': 'bold'
-                        },
-                        page_size=10,
-                    ),
-                ], width=12)
+
+            # Growth Heatmap Tab
+            dbc.Tab(label="Growth Heatmap", tab_id="heatmap-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        html.H5("Growth for Every Year Range", className="mt-3"),
+                        html.P("Each cell is the growth from its start year (row) to its end year (column), so "
+                               "every range the year slider can pick is shown at once. The box marks the range "
+                               "currently selected.",
+                               className="text-muted"),
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Series:", className="form-label"),
+                        dcc.Dropdown(
+                            id='heatmap-series',
+                            options=[{'label': label, 'value': key}
+                                     for key, label in {**SERIES_LABELS, **INCOME_RATIOS}.items()],
+                            value=DEFAULT_INPUTS['heatmap-series.value'],
+                            clearable=False
+                        ),
+                    ], width=12, md=4),
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Graph(id='growth-heatmap', figure=initial['growth-heatmap.figure'])
+                    ], width=12)
+                ]),
+                dbc.Row([
+                    dbc.Col([
+                        html.Div(initial['growth-heatmap-summary.children'], id='growth-heatmap-summary')
+                    ], width=12)
+                ], className="mb-4"),
             ]),
-        ]),
-        dbc.Tab(label="Comparative Analysis", tab_id="comparative-tab", children=[
-            # Explanation text at the top
-            dbc.Row([
-                dbc.Col([
-                    html.H5("Income vs. Expenses Analysis", className="mt-5 mb-3 fw-bold"),
-                    html.P("This chart shows how income has changed relative to various expenses over time.",
-                           className="lead"),
-                    html.P(
-                        "A higher income-to-expense ratio indicates better affordability, while a declining ratio suggests expenses are growing faster than income.",
-                        className="text-muted"),
-                ], width=12, className="p-4")
-            ], className="mt-4"),
-
-            # Income vs. Expenses Chart (Dynamic Height & Full Flex Growth)
-            dbc.Row([
-                dbc.Col([
-                    html.Div([
-                        dcc.Graph(id='comparison-chart', config={'displayModeBar': False},
-                                  style={'flex': '1', 'min-height': '60vh', 'width': '100%'})
-                    ], style={'display': 'flex', 'flex-direction': 'column', 'height': '100%'})
-                ], width=12, className="p-4")
-            ], className="mt-4"),
-
-            # Ratio Chart (Now with same flexbox styling)
-            dbc.Row([
-                dbc.Col([
-                    html.Div([
-                        dcc.Graph(id='ratio-chart', config={'displayModeBar': False},
-                                  style={'flex': '1', 'min-height': '50vh', 'width': '100%'})
-                    ], style={'display': 'flex', 'flex-direction': 'column', 'height': '100%'})
-                ], width=12, className="p-4")
-            ], className="mt-4 mb-5 py-4"),
-        ]),
 
-        # Data Sources Tab
-        dbc.Tab(label="Data Sources", tab_id="data-tab", children=[
-            dbc.Row([
-                dbc.Col([
-                    html.H4("Data Sources and Documentation", className="mt-3"),
-                    html.Hr(),
-                    html.H5("California Economic Data Sets"),
-                    html.Ul([
-                        html.Li([
-                            html.Strong("Minimum Wage Data: "),
-                            "Federal Reserve Economic Data (FRED), State Minimum Wage Rate for California"
-                        ]),
-                        html.Li([
-                            html.Strong("Energy & Gas Data: "),
-                            "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Gasoline and Other Energy Goods in California"
-                        ]),
-                        html.Li([
-                            html.Strong("Healthcare Data: "),
-                            "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Healthcare in California"
-                        ]),
-                        html.Li([
-                            html.Strong("Housing & Utilities Data: "),
-                            "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Housing and Utilities in California"
+            # Data Sources Tab
+            dbc.Tab(label="Data Sources", tab_id="data-tab", children=[
+                dbc.Row([
+                    dbc.Col([
+                        html.H4("Data Sources and Documentation", className="mt-3"),
+                        html.Hr(),
+                        html.H5("California Economic Data Sets"),
+                        html.Ul([
+                            html.Li([
+                                html.Strong("Minimum Wage Data: "),
+                                "Federal Reserve Economic Data (FRED), State Minimum Wage Rate for California"
+                            ]),
+                            html.Li([
+                                html.Strong("Energy & Gas Data: "),
+                                "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Gasoline and Other Energy Goods in California"
+                            ]),
+                            html.Li([
+                                html.Strong("Healthcare Data: "),
+                                "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Healthcare in California"
+                            ]),
+                            html.Li([
+                                html.Strong("Housing & Utilities Data: "),
+                                "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Housing and Utilities in California"
+                            ]),
+                            html.Li([
+                                html.Strong("Leisure Goods Data: "),
+                                "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Recreational Goods and Vehicles in California"
+                            ]),
+                            html.Li([
+                                html.Strong("Median Household Income Data: "),
+                                "Federal Reserve Economic Data (FRED), Median Household Income in California"
+                            ]),
                         ]),
-                        html.Li([
-                            html.Strong("Leisure Goods Data: "),
-                            "Federal Reserve Economic Data (FRED), Per Capita Personal Consumption Expenditures: Recreational Goods and Vehicles in California"
+                        html.Hr(),
+                        html.H5("Data License Information"),
+                        html.P([
+                            "All datasets used in this dashboard are from the Federal Reserve Bank of St. Louis' FRED database, available under their ",
+                            html.A("Terms of Use", href="https://fred.stlouisfed.org/legal/"),
+                            ". FRED® data is available under a mixed license where some components are licensed under an ODC-BY license, while others require attribution to the original source."
                         ]),
-                        html.Li([
-                            html.Strong("Median Household Income Data: "),
-                            "Federal Reserve Economic Data (FRED), Median Household Income in California"
+                        html.P([
+                            "Citation: Federal Reserve Bank of St. Louis, Various Economic Data Series for California, retrieved from FRED, Federal Reserve Bank of St. Louis, [Accessed ",
+                            f"{datetime.now().strftime('%B %d, %Y')}",
+                            "]."
                         ]),
-                    ]),
-                    html.Hr(),
-                    html.H5("Data License Information"),
-                    html.P([
-                        "All datasets used in this dashboard are from the Federal Reserve Bank of St. Louis' FRED database, available under their ",
-                        html.A("Terms of Use", href="https://fred.stlouisfed.org/legal/"),
-                        ". FRED® data is available under a mixed license where some components are licensed under an ODC-BY license, while others require attribution to the original source."
-                    ]),
-                    html.P([
-                        "Citation: Federal Reserve Bank of St. Louis, Various Economic Data Series for California, retrieved from FRED, Federal Reserve Bank of St. Louis, [Accessed ",
-                        f"{datetime.now().strftime('%B %d, %Y')}",
-                        "]."
-                    ]),
-                ], width=12)
+                    ], width=12)
+                ]),
             ]),
-        ]),
 
-    ], id="tabs", active_tab="income-tab", className="mb-4"),
-
-    # Footer Section with updated styling for consistency (centered text with padding)
-    html.Hr(),
-    dbc.Row([
-        dbc.Col([
-            html.Footer([
-                html.P("© 2023 California Cost of Living Dashboard", className="mb-0"),
-                html.P([
-                    "Data sources: Federal Reserve Economic Data (FRED) | ",
-                    html.A("GitHub Repository", href="#")
-                ], className="small text-muted")
-            ], className="text-center py-3")
+        ], id="tabs", active_tab="income-tab", className="mb-4"),
+
+        # Footer Section with updated styling for consistency (centered text with padding)
+        html.Hr(),
+        dbc.Row([
+            dbc.Col([
+                html.Footer([
+                    html.P("© 2023 California Cost of Living Dashboard", className="mb-0"),
+                    html.P([
+                        "Data sources: Federal Reserve Economic Data (FRED) | ",
+                        html.A("GitHub Repository", href="#")
+                    ], className="small text-muted")
+                ], className="text-center py-3")
+            ])
         ])
-    ])
-], fluid=True)
+    ], fluid=True)
 
-# Import callbacks from an external file and register them with the app.
-# (Ensure your callbacks use the COLORS dictionary for any chart styling if needed.)
-from callbacks import register_callbacks
 
-register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_df, leisure_df, income_df)
+# Prerendered layouts are cached per dataset version and rebuilt when the data changes
+_layout_cache = {}
+_layout_lock = threading.Lock()
+
+
+def serve_layout():
+    """Return the layout for the current dataset version, prerendering it if needed"""
+    store.refresh()
+    version = store.version
+    layout = _layout_cache.get(version)
+    if layout is None:
+        with _layout_lock:
+            layout = _layout_cache.get(version)
+            if layout is None:
+                layout = build_layout(prerender_outputs(callbacks, DEFAULT_INPUTS))
+                _layout_cache.clear()
+                _layout_cache[version] = layout
+    return layout
+
+
+# A skeleton of the layout (same ids, no prerendered outputs) lets Dash validate
+# callbacks without building the real layout while the module is imported
+app.validation_layout = build_layout(defaultdict(lambda: None))
+app.layout = serve_layout
+
+
+def warm_layout():
+    """Prerender the default layout in the background so workers boot without waiting for it"""
+    started = time.perf_counter()
+    serve_layout()
+    startup_timings['layout_prerender'] = time.perf_counter() - started
+    if memory is not None:
+        # Trace from here on, so the report covers callbacks rather than startup
+        memory.start()
+
+
+_warmup_lock = threading.Lock()
+layout_warmup = None
+
+
+def start_layout_warmup():
+    """Start the layout warm-up thread unless it already runs, and return it
+
+    It starts with the first request rather than on import, so importing the
+    app (tests, scripts) starts no threads and no memory tracing.
+    """
+    global layout_warmup
+    with _warmup_lock:
+        if layout_warmup is None:
+            layout_warmup = threading.Thread(target=warm_layout, name='layout-warmup', daemon=True)
+            layout_warmup.start()
+    return layout_warmup
+
+
+@app.server.before_request
+def _warm_up_on_first_request():
+    # Page loads that arrive before the warm-up finishes wait on _layout_lock for its result
+    if layout_warmup is None:
+        start_layout_warmup()
+
 
 # Start the app using Werkzeug's development server with debugging enabled.
 if __name__ == '__main__':
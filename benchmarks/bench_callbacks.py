@@ -0,0 +1,104 @@
+"""Benchmark the dashboard callbacks' compute paths with pytest-benchmark
+
+Calls update_income_tab, update_expenses_tab, update_comparative_tab and
+update_income_comparison directly (no Dash request handling) over a sweep of
+slider ranges, category subsets and view options, on the real data and on
+copies scaled to 10x, 100x and 1000x as many observations. Each benchmark is
+grouped by callback and size.
+
+The file is not collected by a plain `pytest` run; name it to run it:
+
+    python -m pytest benchmarks/bench_callbacks.py --sizes 1,10 --benchmark-autosave
+    python -m pytest benchmarks/bench_callbacks.py -k update_income_tab --benchmark-compare
+    pytest-benchmark compare 0001 0002 --group-by group
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from callbacks import build_callbacks
+from data_store import DataStore, load_datasets
+
+pytest.importorskip('pytest_benchmark')
+
+RANGES = [(1968, 2024), (1990, 2020), (2010, 2020), (2019, 2020)]
+CATEGORY_SUBSETS = [('housing',), ('energy', 'healthcare', 'housing'), ('energy', 'healthcare', 'housing', 'leisure')]
+VIEWS = ['actual', 'percent', 'adjusted']
+INCOMES = [30000, 60000, 150000]
+
+# Each benchmark runs at least 3 rounds, adds rounds for up to a second, and is warmed up first
+pytestmark = pytest.mark.benchmark(min_rounds=3, max_time=1.0, warmup=True, warmup_iterations=1,
+                                   disable_gc=True)
+
+
+def scale_datasets(datasets, factor):
+    """Return copies of the datasets with factor observations per original one
+
+    Each observation is spread over factor evenly spaced dates within its year,
+    with values interpolated towards the next observation, so year filtering
+    and growth figures behave as on the real data.
+    """
+    if factor == 1:
+        return datasets
+    scaled = {}
+    offsets = np.arange(factor) / factor
+    for key, df in datasets.items():
+        col = [column for column in df.columns if column != 'observation_date'][0]
+        values = df[col].to_numpy(dtype=float)
+        following = np.append(values[1:], values[-1])
+        dates = df['observation_date'].to_numpy()
+        steps = (pd.DatetimeIndex(dates) + pd.DateOffset(years=1)).to_numpy() - dates
+        scaled[key] = pd.DataFrame({
+            'observation_date': (dates[:, None] + steps[:, None] * offsets[None, :]).ravel(),
+            col: (values[:, None] + (following - values)[:, None] * offsets[None, :]).ravel(),
+        })
+    return scaled
+
+
+@pytest.fixture(scope='session')
+def base_datasets(request):
+    return load_datasets(request.config.getoption('data_dir'))
+
+
+@pytest.fixture(scope='session')
+def scaled(base_datasets, size):
+    """(callbacks, row count) over the data scaled to size"""
+    store = DataStore.from_datasets(scale_datasets(base_datasets, size), version=f"x{size}")
+    return build_callbacks(store), sum(len(df) for df in store.datasets.values())
+
+
+def run(benchmark, scaled, size, name, *args):
+    callbacks, rows = scaled
+    benchmark.group = f"{name}[x{size}]"
+    benchmark.extra_info['rows'] = rows
+    benchmark(callbacks[name], *args)
+
+
+def range_id(years):
+    return f"{years[0]}-{years[1]}"
+
+
+@pytest.mark.parametrize('view', VIEWS)
+@pytest.mark.parametrize('years', RANGES, ids=range_id)
+def test_update_income_tab(benchmark, scaled, size, years, view):
+    run(benchmark, scaled, size, 'update_income_tab', list(years), view)
+
+
+@pytest.mark.parametrize('view', VIEWS)
+@pytest.mark.parametrize('categories', CATEGORY_SUBSETS, ids='+'.join)
+@pytest.mark.parametrize('years', RANGES, ids=range_id)
+def test_update_expenses_tab(benchmark, scaled, size, years, categories, view):
+    run(benchmark, scaled, size, 'update_expenses_tab', list(years), list(categories), view)
+
+
+@pytest.mark.parametrize('view', VIEWS)
+@pytest.mark.parametrize('categories', CATEGORY_SUBSETS, ids='+'.join)
+@pytest.mark.parametrize('years', RANGES, ids=range_id)
+def test_update_comparative_tab(benchmark, scaled, size, years, categories, view):
+    run(benchmark, scaled, size, 'update_comparative_tab', list(years), list(categories), view)
+
+
+@pytest.mark.parametrize('income', INCOMES)
+@pytest.mark.parametrize('years', RANGES, ids=range_id)
+def test_update_income_comparison(benchmark, scaled, size, years, income):
+    run(benchmark, scaled, size, 'update_income_comparison', income, list(years))
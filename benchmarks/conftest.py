@@ -0,0 +1,19 @@
+import pytest
+
+from data_store import DATA_DIR
+
+SIZES = [1, 10, 100, 1000]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('dashboard benchmarks')
+    group.addoption('--data-dir', default=DATA_DIR, help="dataset directory to benchmark on")
+    group.addoption('--sizes', type=lambda text: [int(size) for size in text.split(',')], default=SIZES,
+                    help="comma separated scale factors (default: 1,10,100,1000)")
+
+
+def pytest_generate_tests(metafunc):
+    # One session-wide set of scaled data per size, shared by every benchmark at that size
+    if 'size' in metafunc.fixturenames:
+        sizes = metafunc.config.getoption('sizes')
+        metafunc.parametrize('size', sizes, ids=[f"x{size}" for size in sizes], scope='session')
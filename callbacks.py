@@ -1,94 +1,272 @@
-from dash import Input, Output
-import plotly.express as px
+from functools import lru_cache
+
+from dash import Input, Output, Patch, ctx
+from dash.exceptions import MissingCallbackContextException
+import numpy as np
+import plotly.colors
 import plotly.graph_objects as go
 import pandas as pd
-import numpy as np
 from dash import html
 
-def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_df, leisure_df, income_df):
-    """Register all callbacks for the dashboard"""
-
-    # Helper functions
-    def filter_by_year_range(df, start_year, end_year):
-        """Filter dataframe by year range"""
-        return df[(df['observation_date'].dt.year >= start_year) &
-                  (df['observation_date'].dt.year <= end_year)]
-
-    def calculate_growth_percentage(series):
-        """Calculate percentage growth from first to last value"""
-        if len(series) < 2:
-            return 0
-        first_val = series.iloc[0]
-        last_val = series.iloc[-1]
-        if first_val == 0:
-            return 0
-        return ((last_val - first_val) / first_val) * 100
-
-    def adjust_for_inflation(df, value_column, base_year=2020):
-        """Apply inflation adjustment to convert values to base_year dollars"""
-        # This is a simplified inflation adjustment
-        # In a real app, you would use actual CPI or inflation data
-        df_copy = df.copy()
-
-        # Simplified inflation factors (approx. 2.5% annual inflation)
-        years = df_copy['observation_date'].dt.year
-        # Create adjustment factors (further from base_year = larger adjustment)
-        adjustment_factors = np.power(1.025, base_year - years)
-
-        # Apply adjustment
-        df_copy[value_column] = df_copy[value_column] * adjustment_factors
-        return df_copy
+from analysis import (EXPENSE_CATEGORIES, INCOME_RATIOS, SERIES_LABELS, affordability_attribution, apply_view,
+                      dataset_growth_cube, filter_by_year_range, filter_expenses, fit_dataset_trends, forecast_in_view,
+                      growth_in_range, household_budget, income_distribution, income_expense_ratios,
+                      latest_income_expense_ratio, living_wage, rolling_analytics, rolling_in_view, series_arrays,
+                      value_column, work_hours)
+from compute import (FAN_PERCENTILES, FORECAST_END_YEAR, compare_income, fan_bands, first_per_year, fit_growth,
+                     ratio_bands, simulate_paths)
+from export import EXPORT_FORMATS, export_url
+from singleflight import SingleFlight
+
+# Forecast option -> legend label of the dashed extensions
+FORECAST_LABELS = {
+    'linear': "Linear trend",
+    'log-linear': "Log-linear (CAGR)",
+    'holt': "Holt",
+}
+
+# Rolling overlay option -> how its traces and axis are labelled
+ROLLING_LABELS = {
+    'moving-average': "moving average",
+    'cagr': "CAGR",
+    'volatility': "volatility",
+}
+
+# Colors plotly_white gives traces without their own, so forecasts can match their series
+DEFAULT_COLORWAY = plotly.colors.qualitative.Plotly
+
+# Seed for the projection's simulated paths, so a set of parameters always gives the same result
+PROJECTION_SEED = 2024
+
+# Income tier (see compute.INCOME_TIERS) -> (text class, message) for the income comparison card
+INCOME_TIER_DISPLAY = {
+    "significantly below": ("text-danger", "Your income is significantly below California's median, which may present affordability challenges in many parts of the state."),
+    "below": ("text-warning", "Your income is below California's median, which may limit housing options in higher-cost regions."),
+    "near": ("text-info", "Your income is near California's median, providing moderate affordability in many areas."),
+    "above": ("text-success", "Your income exceeds California's median, offering greater flexibility in most housing markets."),
+}
+
+
+def _in_dash_request():
+    """Whether the code runs inside a Dash callback request rather than a direct call"""
+    try:
+        ctx.triggered_id
+    except (MissingCallbackContextException, LookupError):
+        # LookupError: a thread where Dash never set up its callback context
+        return False
+    return True
+
+
+def _triggered_inputs():
+    """The inputs ('id.property') that fired the current Dash request, or () outside one"""
+    if not _in_dash_request():
+        return ()
+    return tuple(sorted(ctx.triggered_prop_ids))
+
+
+def _income_chart_update(empty_fig, income_years, income_values, personal_income, percentile_trend):
+    """The income comparison chart for a range's median incomes and an income, on top of its empty figure
+
+    In a Dash request this is a Patch that only sends the trace data: the
+    browser already has the layout (every return of the callback keeps the
+    empty figure's traces and axes). When the income alone changed, the
+    browser's median trace is already this range's (the callback fills it in
+    with or without an income), so only the income and percentile traces are
+    sent. Direct calls (prerender, scripts) get the full figure.
+    """
+    median, income_line, percentile = empty_fig['data']
+    income_x = [min(income_years), max(income_years)]
+    if _in_dash_request():
+        fig = Patch()
+        if _triggered_inputs() != ('personal-income-input.value',):
+            fig['data'][0]['x'] = income_years
+            fig['data'][0]['y'] = income_values
+        fig['data'][1]['x'] = income_x
+        fig['data'][1]['y'] = [personal_income, personal_income]
+        fig['data'][1]['showlegend'] = True
+        fig['data'][2]['x'] = income_years
+        fig['data'][2]['y'] = percentile_trend
+        fig['data'][2]['showlegend'] = True
+        fig['layout']['yaxis2']['visible'] = True
+        return fig
+    layout = dict(empty_fig['layout'], yaxis2=dict(empty_fig['layout']['yaxis2'], visible=True))
+    return {
+        'data': [dict(median, x=income_years, y=income_values),
+                 dict(income_line, x=income_x, y=[personal_income, personal_income], showlegend=True),
+                 dict(percentile, x=income_years, y=percentile_trend, showlegend=True)],
+        'layout': layout,
+    }
+
+
+def register_callbacks(app, store, coalesce=True, metrics=None, profiler=None, memory=None,
+                       background_manager=None):
+    """Register all callbacks for the dashboard and return them as plain callables
+
+    Callbacks read their data from the DataStore on every call, so a reload of
+    the store is picked up without re-registering anything. Pass a
+    CallbackMetrics to record per-callback timings and a CallbackProfiler to
+    allow on-demand profiling, and a CallbackMemoryTracker to record
+    allocations per invocation. With a Dash background callback manager, slow
+    callbacks (the projection) run as background callbacks. With app=None the
+    callbacks are only built, not registered (see build_callbacks).
+    """
+
+    # Identical concurrent requests (e.g. a burst of first page loads) on one dataset version share a computation
+    flight = SingleFlight(enabled=coalesce, version=lambda: store.version, trigger=_triggered_inputs)
+    callbacks = {}
+
+    # Trend fits for every series, made once per dataset version and reused for any year range
+    @lru_cache(maxsize=2)
+    def trend_fits_for(version):
+        return fit_dataset_trends(store.datasets)
+
+    def forecast_fit(key, forecast_model):
+        """The fitted trend of a series for the chosen forecast option, or None"""
+        fits = trend_fits_for(store.version)
+        return fits[key].get(forecast_model) if forecast_model in FORECAST_LABELS else None
+
+    def forecast_trace(fit, filtered_df, view_option, name, color, scale=1):
+        """Dashed extension of a series to the forecast end year, or None when it is not shown"""
+        forecast = forecast_in_view(fit, filtered_df, view_option)
+        if forecast is None:
+            return None
+        dates, values = forecast
+        return go.Scatter(
+            x=dates,
+            y=values * scale,
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=2, dash='dash'),
+        )
+
+    # Rolling measures for every series, computed once per dataset version
+    @lru_cache(maxsize=2)
+    def rolling_analytics_for(version):
+        return rolling_analytics(store.datasets)
+
+    def rolling_trace(key, filtered_df, view_option, measure, window, name, color, scale=1):
+        """Dash-dot rolling overlay of a series, or None; CAGR and volatility go on the right-hand axis"""
+        if measure not in ROLLING_LABELS:
+            return None
+        overlay = rolling_in_view(rolling_analytics_for(store.version), key, measure, window, filtered_df,
+                                  view_option)
+        if overlay is None:
+            return None
+        dates, values = overlay
+        rate = measure != 'moving-average'
+        return go.Scatter(
+            x=dates,
+            y=values if rate else values * scale,
+            mode='lines',
+            name=f"{name} {window}-yr {ROLLING_LABELS[measure]}",
+            line=dict(color=color, width=2, dash='dashdot'),
+            yaxis='y2' if rate else 'y',
+        )
+
+    def rolling_axis(fig, measure, window):
+        """Add the right-hand axis CAGR and volatility overlays are drawn on"""
+        if measure in ROLLING_LABELS and measure != 'moving-average':
+            fig.update_layout(yaxis2=dict(title=f"{window}-yr {ROLLING_LABELS[measure]} (%)", overlaying='y',
+                                          side='right', showgrid=False, ticksuffix='%'))
+
+    def dashboard_callback(outputs, inputs, background=False, running=None, caches=()):
+        """Register a callback with Dash behind the single-flight layer (and metrics, if enabled)
+
+        background=True runs it as a Dash background callback when a manager is
+        configured (the running updates apply while it works); without one it is
+        an ordinary callback. Background callbacks are left out of the
+        prerendered layout and run when the page loads instead, so the layout
+        never waits for them. caches lists the lru caches it reads, whose hits
+        and misses the metrics record.
+        """
+        def decorator(func):
+            # Profile and trace memory inside the single-flight layer so only real computations count
+            wrapped = profiler.wrap(func.__name__, func) if profiler is not None else func
+            if memory is not None:
+                wrapped = memory.wrap(func.__name__, wrapped)
+            wrapped = flight.wrap(wrapped)
+            if metrics is not None:
+                wrapped = metrics.instrument(func.__name__, wrapped, hit_probe=flight.last_call_shared,
+                                             caches={cache.__name__: cache for cache in caches})
+            wrapped.background = background and background_manager is not None
+            # The layout ships prerendered default outputs, so skip the page-load calls
+            if app is not None:
+                if wrapped.background:
+                    # Background jobs run in a separate process, so their metrics stay in that process
+                    app.callback(outputs, inputs, prevent_initial_call=False, background=True,
+                                 manager=background_manager, running=running)(wrapped)
+                else:
+                    app.callback(outputs, inputs, prevent_initial_call=True)(wrapped)
+            wrapped.outputs = outputs
+            wrapped.inputs = inputs
+            callbacks[func.__name__] = wrapped
+            return wrapped
+
+        return decorator
+
+    # Income distribution tables are built once per dataset version, never per request
+    @lru_cache(maxsize=2)
+    def income_distribution_for(version):
+        return income_distribution(store['income'])
 
     # Callback for Income Chart and Table
-    @app.callback(
+    @dashboard_callback(
         [Output('income-chart', 'figure'),
          Output('income-table', 'data'),
          Output('income-table', 'columns'),
          Output('income-growth-value', 'children')],
         [Input('year-slider', 'value'),
-         Input('view-radio', 'value')]
+         Input('view-radio', 'value'),
+         Input('forecast-radio', 'value'),
+         Input('rolling-measure', 'value'),
+         Input('rolling-window', 'value')],
+        caches=(trend_fits_for, rolling_analytics_for)
     )
-    def update_income_tab(years, view_option):
+    def update_income_tab(years, view_option, forecast_model='none', rolling_measure='none', rolling_window=5):
+        income_df = store['income']
         start_year, end_year = years
         filtered_df = filter_by_year_range(income_df, start_year, end_year)
 
-        # Create a copy for display
-        display_df = filtered_df.copy()
-
         # Calculate growth percentage
-        if len(filtered_df) > 1:
-            income_col = [col for col in filtered_df.columns if col != 'observation_date'][0]
-            growth_pct = calculate_growth_percentage(filtered_df[income_col])
-            growth_text = f"{growth_pct:.1f}%"
-        else:
-            growth_text = "N/A"
+        growth_pct = growth_in_range(filtered_df)
+        growth_text = f"{growth_pct:.1f}%" if growth_pct is not None else "N/A"
 
-        # Handle view options
-        if view_option == 'percent':
-            if len(filtered_df) > 1:
-                income_col = [col for col in filtered_df.columns if col != 'observation_date'][0]
-                first_val = filtered_df[income_col].iloc[0]
-                display_df[income_col] = ((filtered_df[income_col] - first_val) / first_val) * 100
-                y_title = "Percent Change (%)"
-            else:
-                y_title = "Median Household Income ($)"
+        # Handle view options (apply_view returns a copy for display)
+        display_df = apply_view(filtered_df, view_option)
+        if view_option == 'percent' and len(filtered_df) > 1:
+            y_title = "Percent Change (%)"
         elif view_option == 'adjusted':
-            # Apply inflation adjustment
-            income_col = [col for col in filtered_df.columns if col != 'observation_date'][0]
-            display_df = adjust_for_inflation(filtered_df, income_col)
             y_title = "Inflation-Adjusted Median Household Income (2020 $)"
         else:
             y_title = "Median Household Income ($)"
 
-        # Create figure
-        fig = px.line(
-            display_df,
-            x='observation_date',
-            y=[col for col in display_df.columns if col != 'observation_date'][0],
-            title=f"California Median Household Income ({start_year}-{end_year})",
-            labels={'observation_date': 'Year', 'value': y_title}
+        # Create figure, in the template's first trace color like the other tabs' first series
+        income_col = value_column(display_df)
+        fig = go.Figure(
+            go.Scatter(
+                x=display_df['observation_date'],
+                y=display_df[income_col],
+                mode='lines',
+                name="Median Income",
+                showlegend=False,
+                line=dict(color=DEFAULT_COLORWAY[0])
+            ),
+            layout=dict(title=dict(text=f"California Median Household Income ({start_year}-{end_year})"))
         )
 
+        # Dashed trend extension to the forecast end year
+        trace = forecast_trace(forecast_fit('income', forecast_model), filtered_df, view_option,
+                               f"Forecast ({FORECAST_LABELS.get(forecast_model)})", DEFAULT_COLORWAY[0])
+        if trace is not None:
+            fig.add_trace(trace)
+
+        # Rolling overlay
+        trace = rolling_trace('income', filtered_df, view_option, rolling_measure, rolling_window, "Median Income",
+                              DEFAULT_COLORWAY[0])
+        if trace is not None:
+            fig.add_trace(trace)
+            rolling_axis(fig, rolling_measure, rolling_window)
+
         # Add this line to format the y-axis ticks with commas
         fig.update_layout(
             xaxis_title="Year",
@@ -123,41 +301,31 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
 
     # Remaining callbacks (kept the same)...
     # Callback for Expenses Chart and Table
-    @app.callback(
+    @dashboard_callback(
         [Output('expenses-chart', 'figure'),
          Output('expenses-table', 'data'),
          Output('expenses-table', 'columns'),
          Output('housing-growth-value', 'children')],
         [Input('year-slider', 'value'),
          Input('expense-checklist', 'value'),
-         Input('view-radio', 'value')]
+         Input('view-radio', 'value'),
+         Input('forecast-radio', 'value'),
+         Input('rolling-measure', 'value'),
+         Input('rolling-window', 'value')],
+        caches=(trend_fits_for, rolling_analytics_for)
     )
-    def update_expenses_tab(years, selected_expenses, view_option):
+    def update_expenses_tab(years, selected_expenses, view_option, forecast_model='none', rolling_measure='none',
+                            rolling_window=5):
         start_year, end_year = years
 
-        # Map expense selection to dataframes
-        expense_map = {
-            'energy': ('Energy & Gas', energy_gas_df),
-            'healthcare': ('Healthcare', healthcare_df),
-            'housing': ('Housing & Utilities', housing_df),
-            'leisure': ('Leisure Goods', leisure_df)
-        }
-
         # Filter selected expenses by year range
-        filtered_expenses = {}
-        for key, (label, df) in expense_map.items():
-            if key in selected_expenses:
-                filtered_df = filter_by_year_range(df, start_year, end_year)
-                filtered_expenses[label] = filtered_df
+        filtered_expenses = filter_expenses(store.datasets, selected_expenses, start_year, end_year)
 
         # Calculate housing growth for the KPI
-        if 'housing' in selected_expenses and len(filtered_expenses['Housing & Utilities']) > 1:
-            housing_col = \
-                [col for col in filtered_expenses['Housing & Utilities'].columns if col != 'observation_date'][0]
-            housing_growth = calculate_growth_percentage(filtered_expenses['Housing & Utilities'][housing_col])
-            housing_growth_text = f"{housing_growth:.1f}%"
-        else:
-            housing_growth_text = "N/A"
+        housing_growth = None
+        if 'housing' in selected_expenses:
+            housing_growth = growth_in_range(filtered_expenses[EXPENSE_CATEGORIES['housing']])
+        housing_growth_text = f"{housing_growth:.1f}%" if housing_growth is not None else "N/A"
 
         # Create figure data
         fig = go.Figure()
@@ -166,23 +334,19 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
         merged_data = []
         all_years = set()
 
+        # Axis title for the view (set even when no expense is selected)
+        if view_option == 'percent':
+            y_axis_title = "Percent Change (%)"
+        elif view_option == 'adjusted':
+            y_axis_title = "Inflation-Adjusted Value (2020 $)"
+        else:
+            y_axis_title = "Expenses ($)"
+
         for label, df in filtered_expenses.items():
-            expense_col = [col for col in df.columns if col != 'observation_date'][0]
+            expense_col = value_column(df)
 
             # Handle view options
-            display_df = df.copy()
-
-            if view_option == 'percent':
-                if len(df) > 1:
-                    first_val = df[expense_col].iloc[0]
-                    if first_val != 0:  # Avoid division by zero
-                        display_df[expense_col] = ((df[expense_col] - first_val) / first_val) * 100
-                y_axis_title = "Percent Change (%)"
-            elif view_option == 'adjusted':
-                display_df = adjust_for_inflation(df, expense_col)
-                y_axis_title = "Inflation-Adjusted Value (2020 $)"
-            else:
-                y_axis_title = "Expenses ($)"
+            display_df = apply_view(df, view_option)
 
             # Add trace to figure
             fig.add_trace(go.Scatter(
@@ -206,6 +370,21 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
                 # Add value for this expense category
                 year_entry[label] = round(row[expense_col], 2)
 
+        # Dashed trend extensions, colored like the series they extend
+        for index, (key, label) in enumerate((key, label) for key, label in EXPENSE_CATEGORIES.items()
+                                             if label in filtered_expenses):
+            trace = forecast_trace(forecast_fit(key, forecast_model), filtered_expenses[label], view_option,
+                                   f"{label} forecast", DEFAULT_COLORWAY[index % len(DEFAULT_COLORWAY)])
+            if trace is not None:
+                fig.add_trace(trace)
+
+            # Rolling overlay
+            trace = rolling_trace(key, filtered_expenses[label], view_option, rolling_measure, rolling_window, label,
+                                  DEFAULT_COLORWAY[index % len(DEFAULT_COLORWAY)])
+            if trace is not None:
+                fig.add_trace(trace)
+                rolling_axis(fig, rolling_measure, rolling_window)
+
         # Sort years for table
         merged_data.sort(key=lambda x: x['Year'])
 
@@ -242,64 +421,48 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
         return fig, merged_data, table_columns, housing_growth_text
 
     # Callback for Comparative Analysis Charts
-    @app.callback(
+    @dashboard_callback(
         [Output('comparison-chart', 'figure'),
          Output('ratio-chart', 'figure'),
          Output('income-housing-ratio', 'children'),
          Output('min-wage-growth', 'children')],
         [Input('year-slider', 'value'),
          Input('expense-checklist', 'value'),
-         Input('view-radio', 'value')]
+         Input('view-radio', 'value'),
+         Input('forecast-radio', 'value'),
+         Input('rolling-measure', 'value'),
+         Input('rolling-window', 'value')],
+        caches=(trend_fits_for, rolling_analytics_for)
     )
-    def update_comparative_tab(years, selected_expenses, view_option):
+    def update_comparative_tab(years, selected_expenses, view_option, forecast_model='none', rolling_measure='none',
+                               rolling_window=5):
         start_year, end_year = years
 
         # Filter data
-        filtered_income = filter_by_year_range(income_df, start_year, end_year)
-        filtered_min_wage = filter_by_year_range(min_wage_df, start_year, end_year)
-
-        # Map expense selection to dataframes
-        expense_map = {
-            'energy': ('Energy & Gas', energy_gas_df),
-            'healthcare': ('Healthcare', healthcare_df),
-            'housing': ('Housing & Utilities', housing_df),
-            'leisure': ('Leisure Goods', leisure_df)
-        }
+        filtered_income = filter_by_year_range(store['income'], start_year, end_year)
+        filtered_min_wage = filter_by_year_range(store['min_wage'], start_year, end_year)
 
         # Filter selected expenses by year range
-        filtered_expenses = {}
-        for key, (label, df) in expense_map.items():
-            if key in selected_expenses:
-                filtered_df = filter_by_year_range(df, start_year, end_year)
-                filtered_expenses[label] = filtered_df
+        filtered_expenses = filter_expenses(store.datasets, selected_expenses, start_year, end_year)
 
         # Prepare comparative analysis
         comparison_fig = go.Figure()
         ratio_fig = go.Figure()
 
-        # Get income column name
-        income_col = [col for col in filtered_income.columns if col != 'observation_date'][0]
-
-        # Get min wage column name
-        min_wage_col = [col for col in filtered_min_wage.columns if col != 'observation_date'][0]
+        # Get income and min wage column names
+        income_col = value_column(filtered_income)
+        min_wage_col = value_column(filtered_min_wage)
 
         # Calculate min wage growth for KPI
-        if len(filtered_min_wage) > 1:
-            min_wage_growth = calculate_growth_percentage(filtered_min_wage[min_wage_col])
-            min_wage_growth_text = f"{min_wage_growth:.1f}%"
-        else:
-            min_wage_growth_text = "N/A"
+        min_wage_growth = growth_in_range(filtered_min_wage)
+        min_wage_growth_text = f"{min_wage_growth:.1f}%" if min_wage_growth is not None else "N/A"
 
         # Add income trace
-        display_income = filtered_income.copy()
+        display_income = apply_view(filtered_income, view_option)
 
         if view_option == 'percent':
-            if len(filtered_income) > 1:
-                first_val = filtered_income[income_col].iloc[0]
-                display_income[income_col] = ((filtered_income[income_col] - first_val) / first_val) * 100
             y_title = "Percent Change (%)"
         elif view_option == 'adjusted':
-            display_income = adjust_for_inflation(filtered_income, income_col)
             y_title = "Inflation-Adjusted Value (2020 $)"
         else:
             y_title = "Value ($)"
@@ -313,14 +476,7 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
         ))
 
         # Add minimum wage trace
-        display_min_wage = filtered_min_wage.copy()
-
-        if view_option == 'percent':
-            if len(filtered_min_wage) > 1:
-                first_val = filtered_min_wage[min_wage_col].iloc[0]
-                display_min_wage[min_wage_col] = ((filtered_min_wage[min_wage_col] - first_val) / first_val) * 100
-        elif view_option == 'adjusted':
-            display_min_wage = adjust_for_inflation(filtered_min_wage, min_wage_col)
+        display_min_wage = apply_view(filtered_min_wage, view_option)
 
         # Scale min wage to annual full-time equivalent (40hrs * 52 weeks)
         display_min_wage[min_wage_col] = display_min_wage[min_wage_col] * 40 * 52
@@ -341,71 +497,47 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
 
         # Add expense traces
         for label, df in filtered_expenses.items():
-            expense_col = [col for col in df.columns if col != 'observation_date'][0]
-            display_df = df.copy()
-
-            if view_option == 'percent':
-                if len(df) > 1:
-                    first_val = df[expense_col].iloc[0]
-                    display_df[expense_col] = ((df[expense_col] - first_val) / first_val) * 100
-            elif view_option == 'adjusted':
-                display_df = adjust_for_inflation(df, expense_col)
+            display_df = apply_view(df, view_option)
 
             comparison_fig.add_trace(go.Scatter(
                 x=display_df['observation_date'],
-                y=display_df[expense_col],
+                y=display_df[value_column(display_df)],
                 mode='lines',
                 name=label
             ))
 
-            # Calculate income-to-expense ratios
-            if label == 'Housing & Utilities' and len(df) > 0 and len(filtered_income) > 0:
-                # For the KPI, calculate the most recent income-to-housing ratio
-                if len(df) > 0 and len(filtered_income) > 0:
-                    # Get the common years
-                    housing_years = set(df['observation_date'].dt.year)
-                    income_years = set(filtered_income['observation_date'].dt.year)
-                    common_years = sorted(housing_years.intersection(income_years))
-
-                    if common_years:
-                        latest_year = max(common_years)
-                        latest_housing = df[df['observation_date'].dt.year == latest_year][expense_col].iloc[0]
-                        latest_income = \
-                            filtered_income[filtered_income['observation_date'].dt.year == latest_year][
-                                income_col].iloc[0]
-
-                        # Calculate ratio (income divided by annual housing cost)
-                        if latest_housing > 0:
-                            ratio = latest_income / latest_housing
-                            housing_income_ratio = f"{ratio:.2f}"
+            # For the KPI, calculate the most recent income-to-housing ratio
+            if label == EXPENSE_CATEGORIES['housing']:
+                ratio = latest_income_expense_ratio(filtered_income, df)
+                if ratio is not None:
+                    housing_income_ratio = f"{ratio:.2f}"
 
             # Calculate ratio for each year where both income and expense data exist
-            ratio_series = []
-
-            # Initialize lists for years and ratio values
-            year_list = []
-            ratio_list = []
-
-            # Find common years between income and this expense category
-            for year in sorted(set(df['observation_date'].dt.year)):
-                income_year_data = filtered_income[filtered_income['observation_date'].dt.year == year]
-                expense_year_data = df[df['observation_date'].dt.year == year]
-
-                if not income_year_data.empty and not expense_year_data.empty:
-                    year_income = income_year_data[income_col].iloc[0]
-                    year_expense = expense_year_data[expense_col].iloc[0]
-
-                    if year_expense > 0:
-                        ratio = year_income / year_expense
-
-                        year_list.append(year)
-                        ratio_list.append(ratio)
+            year_list, ratio_list = income_expense_ratios(filtered_income, df)
 
             if year_list:
                 ratios_data[label] = ratio_list
                 if not years_list:
                     years_list = year_list
 
+        # Dashed trend extensions (the minimum wage scaled like its line), colored like their series
+        extensions = [('income', filtered_income, "Median Income", 'rgb(0, 128, 0)', 1),
+                      ('min_wage', filtered_min_wage, "Full-time Min. Wage", 'rgb(128, 128, 0)', 40 * 52)]
+        extensions += [(key, filtered_expenses[label], label, DEFAULT_COLORWAY[(index + 2) % len(DEFAULT_COLORWAY)], 1)
+                       for index, (key, label) in enumerate((key, label) for key, label in EXPENSE_CATEGORIES.items()
+                                                            if label in filtered_expenses)]
+        for key, filtered_df, label, color, scale in extensions:
+            trace = forecast_trace(forecast_fit(key, forecast_model), filtered_df, view_option,
+                                   f"{label} forecast", color, scale)
+            if trace is not None:
+                comparison_fig.add_trace(trace)
+
+            # Rolling overlay
+            trace = rolling_trace(key, filtered_df, view_option, rolling_measure, rolling_window, label, color, scale)
+            if trace is not None:
+                comparison_fig.add_trace(trace)
+                rolling_axis(comparison_fig, rolling_measure, rolling_window)
+
         # Update comparison chart layout
         comparison_fig.update_layout(
             title=f"Income vs. Expenses Comparison ({start_year}-{end_year})",
@@ -434,6 +566,25 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
                 name=f"Income-to-{label} Ratio"
             ))
 
+        # Ratios of the income and expense forecasts, from the last year both were observed
+        income_fit = forecast_fit('income', forecast_model)
+        for index, (key, label) in enumerate((key, label) for key, label in EXPENSE_CATEGORIES.items()
+                                             if label in ratios_data):
+            expense_fit = forecast_fit(key, forecast_model)
+            if income_fit is None or expense_fit is None:
+                continue
+            last_common = min(income_fit.last_year, expense_fit.last_year)
+            if years_list[-1] < last_common or last_common >= FORECAST_END_YEAR:
+                continue
+            forecast_years = np.arange(last_common, FORECAST_END_YEAR + 1)
+            ratio_fig.add_trace(go.Scatter(
+                x=[pd.Timestamp(year=year, month=1, day=1) for year in forecast_years.tolist()],
+                y=income_fit.predict(forecast_years) / expense_fit.predict(forecast_years),
+                mode='lines',
+                name=f"Income-to-{label} forecast",
+                line=dict(color=DEFAULT_COLORWAY[index % len(DEFAULT_COLORWAY)], width=2, dash='dash'),
+            ))
+
         ratio_fig.update_layout(
             title=f"Income-to-Expense Ratios ({start_year}-{end_year})",
             xaxis_title="Year",
@@ -454,17 +605,9 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
 
         return comparison_fig, ratio_fig, housing_income_ratio, min_wage_growth_text
 
-    # New callback for income comparison
-    @app.callback(
-        [Output("income-comparison-result", "children"),
-         Output("income-comparison-chart", "figure")],
-        [Input("personal-income-input", "value"),
-         Input("year-slider", "value")]
-    )
-    def update_income_comparison(personal_income, years_range):
-        if not personal_income:
-            return html.Div(), {}
-
+    # The income comparison chart's layout and traces without data, shared by every call
+    @lru_cache(maxsize=1)
+    def income_comparison_figure():
         # Define COLORS dictionary if it doesn't exist in your current scope
         COLORS = {
             "stocks": "#1f77b4",  # Blue
@@ -475,36 +618,116 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
             "leisure": "#8c564b"  # Brown
         }
 
+        # Create the figure
+        fig = go.Figure()
+
+        # Median income trend line, the user's income as a horizontal line and its percentile each year
+        fig.add_trace(go.Scatter(
+            x=[],
+            y=[],
+            mode='lines+markers',
+            name='CA Median Income',
+            line=dict(color=COLORS["stocks"], width=3),
+        ))
+        fig.add_trace(go.Scatter(
+            x=[],
+            y=[],
+            mode='lines',
+            name='Your Income',
+            showlegend=False,
+            line=dict(color=COLORS["inflation"], width=2, dash='dash'),
+        ))
+        fig.add_trace(go.Scatter(
+            x=[],
+            y=[],
+            mode='lines',
+            name='Your Percentile',
+            yaxis='y2',
+            showlegend=False,
+            line=dict(color=COLORS["healthcare"], width=2, dash='dot'),
+            hovertemplate="Percentile: %{y:.0f}<extra></extra>",
+        ))
+
+        # Update layout
+        fig.update_layout(
+            title=f"Your Income vs. California Median Household Income",
+            xaxis_title="Year",
+            yaxis_title="Annual Income ($)",
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            ),
+            margin=dict(l=40, r=40, t=40, b=40),
+            height=300,
+            template="plotly_white",
+            hovermode="x unified",
+            yaxis2=dict(title="Percentile", overlaying='y', side='right', range=[0, 100], showgrid=False,
+                        visible=False),
+        )
+
+        # Add dollar sign format to y-axis
+        fig.update_yaxes(tickprefix="$", tickformat=",")
+
+        return fig.to_plotly_json()
+
+    # The median incomes of a year range, or None when it holds no income data
+    @lru_cache(maxsize=128)
+    def income_comparison_base(version, start_year, end_year):
         # Filter income data based on selected years
-        start_year, end_year = years_range
-        filtered_income = filter_by_year_range(income_df, start_year, end_year)
+        filtered_income = filter_by_year_range(store['income'], start_year, end_year)
+        if filtered_income.empty:
+            return None
 
         # Get latest median income value
-        income_col = [col for col in filtered_income.columns if col != 'observation_date'][0]
+        income_col = value_column(filtered_income)
         latest_income = filtered_income.iloc[-1][income_col]
         latest_year = filtered_income.iloc[-1]['observation_date'].year
 
+        income_years = filtered_income['observation_date'].dt.year.tolist()
+        income_values = filtered_income[income_col].tolist()
+        return latest_income, latest_year, income_years, income_values
+
+    # New callback for income comparison
+    @dashboard_callback(
+        [Output("income-comparison-result", "children"),
+         Output("income-comparison-chart", "figure")],
+        [Input("personal-income-input", "value"),
+         Input("year-slider", "value")],
+        caches=(income_comparison_figure, income_comparison_base, income_distribution_for)
+    )
+    def update_income_comparison(personal_income, years_range):
+        start_year, end_year = years_range
+        base = income_comparison_base(store.version, start_year, end_year)
+        if base is None:
+            if not personal_income:
+                return html.Div(), income_comparison_figure()
+            return html.P(f"No median income data between {start_year} and {end_year} to compare against.",
+                          className="text-muted"), income_comparison_figure()
+        latest_income, latest_year, income_years, income_values = base
+
+        # Without an income the chart goes back to its empty figure with just the range's medians, a full
+        # figure the patches for a typed income can build on
+        if not personal_income:
+            empty_fig = income_comparison_figure()
+            median, *others = empty_fig['data']
+            return html.Div(), dict(empty_fig, data=[dict(median, x=income_years, y=income_values), *others])
+
         # Calculate income comparison metrics
-        income_ratio = (personal_income / latest_income) * 100
-        income_difference = personal_income - latest_income
-
-        # Determine affordability tier and message
-        if income_ratio < 50:
-            tier = "significantly below"
-            tier_class = "text-danger"
-            message = f"Your income is significantly below California's median, which may present affordability challenges in many parts of the state."
-        elif income_ratio < 80:
-            tier = "below"
-            tier_class = "text-warning"
-            message = f"Your income is below California's median, which may limit housing options in higher-cost regions."
-        elif income_ratio < 120:
-            tier = "near"
-            tier_class = "text-info"
-            message = f"Your income is near California's median, providing moderate affordability in many areas."
-        else:
-            tier = "above"
-            tier_class = "text-success"
-            message = f"Your income exceeds California's median, offering greater flexibility in most housing markets."
+        comparison = compare_income(personal_income, latest_income)
+        income_ratio = comparison['ratio_pct']
+        income_difference = comparison['difference']
+
+        # Affordability tier and its message
+        tier = comparison['tier']
+        tier_class, message = INCOME_TIER_DISPLAY[tier]
+
+        # Estimated percentile, now and in each year of the range
+        distribution = income_distribution_for(store.version)
+        percentile = distribution.percentile(personal_income, latest_year)
+        percentile_trend = distribution.percentile_trend(personal_income, income_years)
 
         # Create comparison result component
         comparison_result = html.Div([
@@ -521,53 +744,561 @@ def register_callbacks(app, min_wage_df, energy_gas_df, healthcare_df, housing_d
                 html.Strong(f"{income_ratio:.1f}% "),
                 f"of the state median."
             ]),
+            html.P([
+                f"That is more than about ",
+                html.Strong(f"{percentile:.0f}% "),
+                f"of California households earned in {latest_year} (estimated percentile).",
+            ]),
             html.P(message, className="mt-2 font-italic")
         ])
 
-        # Create comparison chart
-        income_years = filtered_income['observation_date'].dt.year.tolist()
-        income_values = filtered_income[income_col].tolist()
+        return comparison_result, _income_chart_update(income_comparison_figure(), income_years, income_values,
+                                                       personal_income, percentile_trend.round(1).tolist())
 
-        # Create the figure
-        fig = go.Figure()
+    # Household budget tables are built once per dataset version as well
+    @lru_cache(maxsize=2)
+    def household_budget_for(version):
+        return household_budget(store.datasets)
 
-        # Add income trend line
-        fig.add_trace(go.Scatter(
-            x=income_years,
-            y=income_values,
+    # Callback for the Household Budget simulator
+    @dashboard_callback(
+        [Output('household-budget-chart', 'figure'),
+         Output('household-surplus-chart', 'figure'),
+         Output('household-budget-summary', 'children')],
+        [Input('year-slider', 'value'),
+         Input('expense-checklist', 'value'),
+         Input('household-adults', 'value'),
+         Input('household-children', 'value'),
+         Input('household-income-input', 'value')],
+        caches=(household_budget_for,)
+    )
+    def update_household_budget(years, selected_expenses, adults, children, household_income):
+        start_year, end_year = years
+        simulator = household_budget_for(store.version)
+        budget_years, by_category = simulator.budget(adults, children, start_year, end_year, selected_expenses)
+
+        # Compare against the entered income, or the median household income of each year without one
+        if household_income:
+            income = np.full(len(budget_years), float(household_income))
+            income_label = "Your Income"
+        else:
+            median_years, median_values = first_per_year(*series_arrays(store['income']))
+            median_by_year = dict(zip(median_years.tolist(), median_values.tolist()))
+            income = np.array([median_by_year.get(year, np.nan) for year in budget_years.tolist()], dtype=float)
+            income_label = "Median Household Income"
+        _, total, surplus = simulator.surplus(adults, children, start_year, end_year, income, selected_expenses)
+
+        household = f"{adults} adult{'s' if adults != 1 else ''}"
+        if children:
+            household += f" and {children} child{'ren' if children != 1 else ''}"
+
+        # Stacked household spending per category with the income on top
+        budget_fig = go.Figure()
+        for key, values in by_category.items():
+            budget_fig.add_trace(go.Bar(
+                x=budget_years.tolist(),
+                y=values.round(2).tolist(),
+                name=EXPENSE_CATEGORIES[key],
+            ))
+        budget_fig.add_trace(go.Scatter(
+            x=budget_years.tolist(),
+            y=income.tolist(),
             mode='lines+markers',
-            name='CA Median Income',
-            line=dict(color=COLORS["stocks"], width=3),
+            name=income_label,
+            line=dict(color="#1f77b4", width=3),
         ))
+        budget_fig.update_layout(
+            title=f"Household Budget for {household} ({start_year}-{end_year})",
+            xaxis_title="Year",
+            yaxis_title="Annual Spending ($)",
+            barmode='stack',
+            template="plotly_white",
+            hovermode="x unified",
+            yaxis=dict(tickprefix="$", tickformat=","),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        )
 
-        # Add user's income as a horizontal line
-        fig.add_trace(go.Scatter(
-            x=[min(income_years), max(income_years)],
-            y=[personal_income, personal_income],
-            mode='lines',
-            name='Your Income',
-            line=dict(color=COLORS["inflation"], width=2, dash='dash'),
+        # Surplus (green) or deficit (red) left after the selected categories each year
+        surplus_fig = go.Figure(go.Bar(
+            x=budget_years.tolist(),
+            y=surplus.round(2).tolist(),
+            name="Surplus / Deficit",
+            marker_color=["#2ca02c" if value >= 0 else "#d62728" for value in surplus.tolist()],
         ))
+        surplus_fig.update_layout(
+            title=f"Income Left After the Selected Expenses",
+            xaxis_title="Year",
+            yaxis_title="Surplus / Deficit ($)",
+            template="plotly_white",
+            height=300,
+            margin=dict(l=40, r=40, t=40, b=40),
+            yaxis=dict(tickprefix="$", tickformat=","),
+        )
+
+        if not len(budget_years) or np.isnan(income[-1]):
+            summary = html.P(f"No spending and income data between {start_year} and {end_year}.",
+                             className="text-muted")
+            return budget_fig, surplus_fig, summary
+
+        latest_surplus = surplus[-1]
+        deficit_years = int((surplus < 0).sum())
+        summary = html.Div([
+            html.P([
+                f"In {budget_years[-1]}, a household of {household} would spend about ",
+                html.Strong(f"${total[-1]:,.0f}"),
+                f" a year on the selected categories, leaving ",
+                html.Strong(f"${abs(latest_surplus):,.0f} {'surplus' if latest_surplus >= 0 else 'deficit'}",
+                            className="text-success" if latest_surplus >= 0 else "text-danger"),
+                f" against {'your' if household_income else 'the median household'} income of ${income[-1]:,.0f}.",
+            ]),
+            html.P(f"The budget exceeds the income in {deficit_years} of {len(budget_years)} years. "
+                   f"Only the selected expense categories are counted, not total household spending.",
+                   className="text-muted"),
+        ])
+        return budget_fig, surplus_fig, summary
+
+    # Simulations depend only on these parameters (the seed is fixed), so identical requests reuse them
+    @lru_cache(maxsize=32)
+    def projection_for(version, start_year, end_year, keys, horizon, paths):
+        history = {key: series_arrays(filter_by_year_range(store[key], start_year, end_year)) for key in keys}
+        model = fit_growth(history)
+        simulated = simulate_paths(model['last_values'], model['drift'], model['covariance'], horizon, paths,
+                                   seed=PROJECTION_SEED)
+        ratios = {key: ratio_bands(simulated, 0, index) for index, key in enumerate(keys) if key != 'income'}
+        return model, fan_bands(simulated), ratios
+
+    # Callback for the Monte Carlo projection
+    @dashboard_callback(
+        [Output('projection-chart', 'figure'),
+         Output('projection-summary', 'children')],
+        [Input('year-slider', 'value'),
+         Input('expense-checklist', 'value'),
+         Input('projection-horizon', 'value'),
+         Input('projection-paths', 'value')],
+        background=True,
+        running=[(Output('projection-status', 'children'), "Simulating...", "")],
+        caches=(projection_for,)
+    )
+    def update_projection(years, selected_expenses, horizon, paths):
+        # Only this tab uses subplots, so the import stays off the worker startup path
+        from plotly.subplots import make_subplots
+
+        start_year, end_year = years
+        keys = ('income',) + tuple(key for key in EXPENSE_CATEGORIES if key in selected_expenses)
+        try:
+            model, bands, ratios = projection_for(store.version, start_year, end_year, keys, horizon, paths)
+        except ValueError:
+            fig = go.Figure()
+            fig.update_layout(title="Projection", template="plotly_white")
+            message = html.P(f"Not enough data between {start_year} and {end_year} to fit a projection: pick a "
+                             f"range with at least three years of income and expense data.", className="text-muted")
+            return fig, message
+
+        labels = [SERIES_LABELS[key] for key in keys]
+        columns = 2 if len(keys) > 1 else 1
+        rows = -(-len(keys) // columns)
+        fig = make_subplots(rows=rows, cols=columns, subplot_titles=labels, vertical_spacing=0.12)
+        future_years = list(range(model['last_year'], model['last_year'] + horizon + 1))
+        # Percentile rows of the bands: (outer low, inner low, median, inner high, outer high)
+        outer_low, inner_low, median, inner_high, outer_high = range(len(FAN_PERCENTILES))
+
+        for index, key in enumerate(keys):
+            row, col = index // columns + 1, index % columns + 1
+            history = filter_by_year_range(store[key], start_year, end_year)
+            first_series = index == 0
+            fig.add_trace(go.Scatter(
+                x=history['observation_date'].dt.year.tolist(),
+                y=history[value_column(history)].tolist(),
+                mode='lines',
+                name='History',
+                legendgroup='history',
+                showlegend=first_series,
+                line=dict(color="#1f77b4", width=2),
+            ), row=row, col=col)
+            for low, high, name, opacity in [(outer_low, outer_high, "5th-95th percentile", 0.15),
+                                             (inner_low, inner_high, "25th-75th percentile", 0.3)]:
+                fig.add_trace(go.Scatter(
+                    x=future_years + future_years[::-1],
+                    y=bands[high, :, index].round(2).tolist() + bands[low, ::-1, index].round(2).tolist(),
+                    fill='toself',
+                    fillcolor=f"rgba(255, 127, 14, {opacity})",
+                    line=dict(width=0),
+                    hoverinfo='skip',
+                    name=name,
+                    legendgroup=name,
+                    showlegend=first_series,
+                ), row=row, col=col)
+            fig.add_trace(go.Scatter(
+                x=future_years,
+                y=bands[median, :, index].round(2).tolist(),
+                mode='lines',
+                name='Median projection',
+                legendgroup='median',
+                showlegend=first_series,
+                line=dict(color="#ff7f0e", width=2, dash='dash'),
+            ), row=row, col=col)
 
-        # Update layout
         fig.update_layout(
-            title=f"Your Income vs. California Median Household Income",
+            title=f"{paths:,} Simulated Paths, {horizon} Years Ahead (fitted on {start_year}-{end_year})",
+            template="plotly_white",
+            height=320 * rows,
+            legend=dict(orientation="h", yanchor="bottom", y=1.04, xanchor="right", x=1),
+        )
+        fig.update_yaxes(tickformat=",")
+
+        # Where the median path and its 90% band end, and what that means for affordability
+        final_year = future_years[-1]
+        items = []
+        for index, key in enumerate(keys):
+            items.append(html.Li([
+                html.Strong(f"{SERIES_LABELS[key]}: "),
+                f"{bands[median, -1, index]:,.0f} in {final_year} "
+                f"(90% range {bands[outer_low, -1, index]:,.0f}-{bands[outer_high, -1, index]:,.0f}), "
+                f"from {model['last_values'][index]:,.0f} in {model['last_year']}; "
+                f"fitted growth {np.expm1(model['drift'][index]) * 100:.1f}% a year",
+            ]))
+        for key, ratio in ratios.items():
+            items.append(html.Li([
+                html.Strong(f"Income-to-{EXPENSE_CATEGORIES[key]} ratio: "),
+                f"{ratio[median, -1]:.2f} in {final_year} (90% range {ratio[outer_low, -1]:.2f}-"
+                f"{ratio[outer_high, -1]:.2f}), now {ratio[median, 0]:.2f}",
+            ]))
+        summary = html.Div([
+            html.Ul(items),
+            html.P("Growth and volatility are fitted to the selected years and the series are simulated jointly, "
+                   "so the bands show the spread of outcomes if the past pattern continues, not a forecast.",
+                   className="text-muted"),
+        ])
+        return fig, summary
+
+    # Hours of work per expense category, computed once per dataset version
+    @lru_cache(maxsize=2)
+    def work_hours_for(version):
+        return work_hours(store.datasets)
+
+    # Callback for the hours-of-work chart and KPIs
+    @dashboard_callback(
+        [Output('hours-chart', 'figure'),
+         Output('min-wage-housing-hours', 'children'),
+         Output('median-pay-housing-hours', 'children')],
+        [Input('year-slider', 'value'),
+         Input('expense-checklist', 'value')],
+        caches=(work_hours_for,)
+    )
+    def update_work_hours(years, selected_expenses):
+        start_year, end_year = years
+        hours = work_hours_for(store.version)
+        fig = go.Figure()
+        for wage, wage_label, dash in [('min_wage', "minimum wage", 'solid'), ('median_pay', "median pay", 'dot')]:
+            hour_years, by_category = hours.in_range(wage, start_year, end_year, selected_expenses)
+            dates = [pd.Timestamp(year=year, month=1, day=1) for year in hour_years.tolist()]
+            for index, (key, values) in enumerate(by_category.items()):
+                fig.add_trace(go.Scatter(
+                    x=dates,
+                    y=values.round(1),
+                    mode='lines',
+                    name=f"{EXPENSE_CATEGORIES[key]} ({wage_label})",
+                    line=dict(color=DEFAULT_COLORWAY[index % len(DEFAULT_COLORWAY)], width=2, dash=dash),
+                ))
+            if len(by_category) > 1:
+                fig.add_trace(go.Scatter(
+                    x=dates,
+                    y=np.sum(list(by_category.values()), axis=0).round(1),
+                    mode='lines',
+                    name=f"All selected ({wage_label})",
+                    line=dict(color='black', width=3, dash=dash),
+                ))
+        fig.update_layout(
+            title=f"Hours of Work per Year to Pay for Each Category ({start_year}-{end_year})",
             xaxis_title="Year",
-            yaxis_title="Annual Income ($)",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=40, r=40, t=40, b=40),
-            height=300,
+            yaxis_title="Hours of Work",
             template="plotly_white",
-            hovermode="x unified"
+            hovermode="x unified",
+            yaxis=dict(tickformat=','),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         )
 
-        # Add dollar sign format to y-axis
-        fig.update_yaxes(tickprefix="$", tickformat=",")
+        # KPIs: housing in the latest year of the range, like the income-to-housing ratio
+        kpis = []
+        for wage in ('min_wage', 'median_pay'):
+            latest = hours.latest(wage, 'housing', start_year, end_year) if 'housing' in selected_expenses else None
+            kpis.append(f"{latest[1]:,.0f} hrs" if latest is not None else "N/A")
+        return fig, *kpis
+
+    # Affordability attribution cubes, built once per dataset version and set of categories
+    @lru_cache(maxsize=2)
+    def attribution_for(version):
+        return affordability_attribution(store.datasets)
+
+    # Callback for the affordability change waterfall
+    @dashboard_callback(
+        [Output('attribution-chart', 'figure'),
+         Output('attribution-summary', 'children')],
+        [Input('year-slider', 'value'),
+         Input('expense-checklist', 'value')],
+        caches=(attribution_for,)
+    )
+    def update_affordability_attribution(years, selected_expenses):
+        start_year, end_year = years
+        attribution = attribution_for(store.version)
+
+        # The first and last years in the range that income and every category cover
+        covered = attribution.years[(attribution.years >= start_year) & (attribution.years <= end_year)]
+        result = None
+        if len(covered) > 1:
+            start_year, end_year = int(covered[0]), int(covered[-1])
+            result = attribution.between(selected_expenses, start_year, end_year)
+
+        fig = go.Figure()
+        if result is None:
+            fig.update_layout(title="Affordability Change by Factor", template="plotly_white")
+            return fig, html.P("Pick at least one expense category and a range with two or more years of income "
+                               "and expense data to attribute the change in affordability.", className="text-muted")
+
+        contributions = result['contributions']
+        labels = ["Median income" if key == 'income' else EXPENSE_CATEGORIES[key] for key in contributions]
+        fig.add_trace(go.Waterfall(
+            x=[f"{start_year} ratio"] + labels + [f"{end_year} ratio"],
+            y=[result['start_ratio']] + list(contributions.values()) + [result['end_ratio']],
+            measure=['absolute'] + ['relative'] * len(contributions) + ['total'],
+            text=[f"{result['start_ratio']:.2f}"] + [f"{value:+.2f}" for value in contributions.values()]
+            + [f"{result['end_ratio']:.2f}"],
+            textposition='outside',
+            increasing=dict(marker=dict(color="#2ca02c")),
+            decreasing=dict(marker=dict(color="#d62728")),
+            totals=dict(marker=dict(color="#1f77b4")),
+            connector=dict(line=dict(color="rgb(150, 150, 150)", dash='dot')),
+        ))
+        fig.update_layout(
+            title=f"What Moved Income-to-Expense Affordability, {start_year} to {end_year}",
+            yaxis_title="Ratio (Income / Selected Expenses)",
+            template="plotly_white",
+            showlegend=False,
+        )
+
+        # The factor that pulled affordability down the most, and the one that helped most
+        change = result['end_ratio'] - result['start_ratio']
+        items = [html.Li([html.Strong("Change: "),
+                          f"{result['start_ratio']:.2f} to {result['end_ratio']:.2f} ({change:+.2f}), median income "
+                          f"over the total of the selected categories"])]
+        worst = min(contributions, key=contributions.get)
+        best = max(contributions, key=contributions.get)
+        for name, key, shown in [("Largest drag", worst, contributions[worst] < 0),
+                                 ("Largest lift", best, contributions[best] > 0)]:
+            if shown:
+                label = "Median income" if key == 'income' else EXPENSE_CATEGORIES[key]
+                items.append(html.Li([html.Strong(f"{name}: "), f"{label} ({contributions[key]:+.2f})"]))
+        return fig, html.Ul(items)
+
+    # Living wage matrices, built once per dataset version
+    @lru_cache(maxsize=2)
+    def living_wage_for(version):
+        return living_wage(store.datasets)
+
+    # Callback for the living wage tab
+    @dashboard_callback(
+        [Output('living-wage-chart', 'figure'),
+         Output('living-wage-families-chart', 'figure'),
+         Output('living-wage-summary', 'children')],
+        [Input('year-slider', 'value'),
+         Input('living-wage-adults', 'value'),
+         Input('living-wage-children', 'value')],
+        caches=(living_wage_for,)
+    )
+    def update_living_wage(years, adults, children):
+        start_year, end_year = years
+        wages = living_wage_for(store.version)
+        family = f"{adults} adult{'s' if adults > 1 else ''}, {children} child{'ren' if children != 1 else ''}"
+        rows = np.flatnonzero((wages.years >= start_year) & (wages.years <= end_year))
+        dates = [pd.Timestamp(year=year, month=1, day=1) for year in wages.years[rows].tolist()]
+        cell = wages.cell(wages.years[rows[-1]], adults, children) if len(rows) else None
+
+        # Hourly living wage of the chosen family against the minimum wage over the range
+        trend_fig = go.Figure()
+        if cell is not None:
+            column = cell[1]
+            trend_fig.add_trace(go.Scatter(
+                x=dates,
+                y=wages.hourly[rows, column].round(2),
+                mode='lines+markers',
+                name=f"Living wage per adult ({family})",
+                line=dict(color="#d62728", width=3),
+            ))
+            trend_fig.add_trace(go.Scatter(
+                x=dates,
+                y=wages.min_wage[rows],
+                mode='lines',
+                name="Minimum wage",
+                line=dict(color='rgb(128, 128, 0)', width=2, dash='dot'),
+            ))
+        trend_fig.update_layout(
+            title=f"Hourly Living Wage vs. Minimum Wage ({start_year}-{end_year})",
+            xaxis_title="Year",
+            yaxis_title="Dollars per Hour",
+            template="plotly_white",
+            hovermode="x unified",
+            yaxis=dict(tickprefix='$'),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        )
+
+        # Every family type in the latest year of the range
+        families_fig = go.Figure()
+        if cell is not None:
+            row = cell[0]
+            year = int(wages.years[row])
+            families_fig.add_trace(go.Bar(
+                x=[f"{family_adults}A {family_children}C" for family_adults, family_children in wages.families],
+                y=wages.hourly[row].round(2),
+                marker_color=["#d62728" if family == (adults, children) else "#9ecae1" for family in wages.families],
+                name="Living wage per adult",
+                hovertemplate="%{x}: $%{y:.2f} an hour<extra></extra>",
+            ))
+            if not np.isnan(wages.min_wage[row]):
+                families_fig.add_hline(y=wages.min_wage[row], line_dash='dot', line_color='rgb(128, 128, 0)',
+                                       annotation_text=f"Minimum wage ${wages.min_wage[row]:.2f}")
+            families_fig.update_layout(title=f"Hourly Living Wage per Adult by Family Type ({year})")
+        families_fig.update_layout(
+            xaxis_title="Family (adults, children)",
+            yaxis_title="Dollars per Hour",
+            template="plotly_white",
+            yaxis=dict(tickprefix='$'),
+            showlegend=False,
+        )
+
+        if cell is None:
+            return trend_fig, families_fig, html.P(
+                f"No expense data between {start_year} and {end_year} to build a living wage from.",
+                className="text-muted")
+        figures = wages.lookup(year, adults, children)
+        items = [
+            html.Li([html.Strong(f"Living wage ({family}, {year}): "),
+                     f"${figures['annual']:,.0f} a year before tax to cover ${figures['needs']:,.0f} of costs, "
+                     f"or ${figures['hourly']:.2f} an hour for each adult working full time"]),
+        ]
+        if not np.isnan(figures['min_wage_multiple']):
+            items.append(html.Li([html.Strong("Against the minimum wage: "),
+                                  f"{figures['min_wage_multiple']:.2f} times ${wages.min_wage[row]:.2f}"]))
+        if not np.isnan(figures['income_share']):
+            items.append(html.Li([html.Strong("Against the median household income: "),
+                                  f"{figures['income_share']:.0f}% of ${wages.median_income[row]:,.0f}"]))
+        summary = html.Div([
+            html.Ul(items),
+            html.P("Costs cover housing and utilities, energy and healthcare (scaled to the family like the household "
+                   "budget) plus childcare; food, transport and other needs are not in the data, so this is a floor. "
+                   "Childcare (less for each older child) and the combined single or joint tax schedules are rough "
+                   "2020 California figures moved with inflation.",
+                   className="text-muted"),
+        ])
+        return trend_fig, families_fig, summary
+
+    # Growth between every pair of years, built once per dataset version
+    @lru_cache(maxsize=2)
+    def growth_cube_for(version):
+        return dataset_growth_cube(store.datasets)
+
+    # Callback for the growth heatmap
+    @dashboard_callback(
+        [Output('growth-heatmap', 'figure'),
+         Output('growth-heatmap-summary', 'children')],
+        [Input('year-slider', 'value'),
+         Input('heatmap-series', 'value'),
+         Input('view-radio', 'value')],
+        caches=(growth_cube_for,)
+    )
+    def update_growth_heatmap(years, heatmap_series, view_option):
+        start_year, end_year = years
+        label = {**SERIES_LABELS, **INCOME_RATIOS}[heatmap_series]
+        # Inflation cancels out of a ratio, so only dollar series have a real growth
+        real = view_option == 'adjusted' and heatmap_series not in INCOME_RATIOS
+        cube = growth_cube_for(store.version)
+        cube_years, growth = cube.matrix(heatmap_series, real=real)
+
+        # Only the years the series covers, as start years (rows) and end years (columns)
+        covered = ~np.isnan(growth).all(axis=1) | ~np.isnan(growth).all(axis=0)
+        cube_years, growth = cube_years[covered], growth[np.ix_(covered, covered)]
+        fig = go.Figure(go.Heatmap(
+            x=cube_years.tolist(),
+            y=cube_years.tolist(),
+            z=np.round(growth, 1),
+            colorscale='RdBu',
+            zmid=0,
+            colorbar=dict(title="Growth (%)", ticksuffix='%'),
+            hovertemplate="%{y} to %{x}: %{z:,.1f}%<extra></extra>",
+        ))
+
+        # Mark the range picked on the slider, trimmed to the years the series covers like the KPI cards
+        in_range = cube_years[(cube_years >= start_year) & (cube_years <= end_year)]
+        selected = None
+        if len(in_range) > 1:
+            start_year, end_year = int(in_range[0]), int(in_range[-1])
+            selected = cube.growth_between(heatmap_series, start_year, end_year, real)
+        if selected is not None:
+            fig.add_trace(go.Scatter(
+                x=[end_year],
+                y=[start_year],
+                mode='markers',
+                marker=dict(symbol='square-open', size=12, color='black', line=dict(width=2)),
+                name="Selected range",
+                hovertemplate=f"Selected: {start_year} to {end_year}: {selected:,.1f}%<extra></extra>",
+            ))
+
+        fig.update_layout(
+            title=f"{'Real ' if real else ''}Growth in {label} for Every Start and End Year",
+            xaxis_title="End Year",
+            yaxis_title="Start Year",
+            template="plotly_white",
+            height=600,
+            showlegend=False,
+        )
+
+        # The selected range and the extremes across every range
+        items = [html.Li([html.Strong("Selected range: "),
+                          f"{selected:+,.1f}% from {start_year} to {end_year}" if selected is not None
+                          else f"not covered by the data for {start_year} to {end_year}"])]
+        if not np.isnan(growth).all():
+            for name, index in [("Largest growth", np.nanargmax(growth)), ("Smallest growth", np.nanargmin(growth))]:
+                start, end = np.unravel_index(index, growth.shape)
+                items.append(html.Li([html.Strong(f"{name}: "), f"{growth[start, end]:+,.1f}% from "
+                                      f"{cube_years[start]} to {cube_years[end]}"]))
+        return fig, html.Ul(items)
+
+    # Keep the download links pointing at an export of the current selection
+    @dashboard_callback(
+        [Output(f'export-{export_format}', 'href') for export_format in EXPORT_FORMATS],
+        [Input('year-slider', 'value'),
+         Input('expense-checklist', 'value'),
+         Input('view-radio', 'value')]
+    )
+    def update_export_links(years, selected_expenses, view_option):
+        start_year, end_year = years
+        params = {
+            'start': start_year,
+            'end': end_year,
+            'categories': [key for key in EXPENSE_CATEGORIES if key in selected_expenses],
+            'view': view_option,
+        }
+        return [export_url(export_format, params) for export_format in EXPORT_FORMATS]
+
+    return callbacks
+
+
+def build_callbacks(store):
+    """Build the callback functions without a Dash app, for direct calls from benchmarks and scripts"""
+    return register_callbacks(None, store, coalesce=False)
+
+
+def prerender_outputs(callbacks, values):
+    """Run every callback on the given input values and map 'id.property' to its output
 
-        return comparison_result, fig
\ No newline at end of file
+    Background callbacks are not run: their outputs are None, and the browser
+    fills them in by running the callbacks as background jobs on page load.
+    """
+    rendered = {}
+    for func in callbacks.values():
+        if func.background:
+            rendered.update((f"{output.component_id}.{output.component_property}", None) for output in func.outputs)
+            continue
+        args = [values[f"{item.component_id}.{item.component_property}"] for item in func.inputs]
+        for output, result in zip(func.outputs, func(*args)):
+            rendered[f"{output.component_id}.{output.component_property}"] = result
+    return rendered
@@ -0,0 +1,35 @@
+"""Pure cost-of-living computations over NumPy arrays
+
+Nothing here imports Dash, Plotly or pandas: every function takes and returns
+plain arrays and numbers, so the dashboard, the data API and batch scripts or
+notebooks can all share the same arithmetic.
+"""
+from .attribution import AffordabilityAttribution, log_mean
+from .distribution import INCOME_LOG_SIGMA, IncomeDistribution, normal_cdf
+from .forecast import FORECAST_END_YEAR, FORECAST_MODELS, TrendFit, fit_trends
+from .heatmap import GrowthCube, growth_cube
+from .hours import WORK_HOURS_WAGES, WorkHours
+from .household import (CHILD_WEIGHT, HOUSEHOLD_SCALE_EXPONENTS, HouseholdBudget, household_compositions,
+                        scaling_factors)
+from .income import FULL_TIME_HOURS, INCOME_TIERS, compare_income, income_tier, income_tiers, score_incomes
+from .living_wage import (CHILDCARE_COSTS, LIVING_WAGE_CATEGORIES, TAX_BRACKETS, LivingWage, childcare_costs,
+                          living_wage_families, pre_tax_income)
+from .projection import FAN_PERCENTILES, fan_bands, fit_growth, ratio_bands, simulate_paths
+from .rolling import (ROLLING_MEASURES, ROLLING_WINDOWS, RollingAnalytics, moving_average, rolling_cagr,
+                      rolling_volatility, year_grid)
+from .series import (adjust_for_inflation, align_years, apply_view, first_per_year, growth_percentage,
+                     income_expense_ratios, inflation_factors, latest_income_expense_ratio, percent_change,
+                     year_mask)
+
+__all__ = [
+    'AffordabilityAttribution', 'CHILDCARE_COSTS', 'CHILD_WEIGHT', 'FAN_PERCENTILES', 'FORECAST_END_YEAR',
+    'FORECAST_MODELS', 'FULL_TIME_HOURS', 'GrowthCube', 'HOUSEHOLD_SCALE_EXPONENTS', 'HouseholdBudget',
+    'INCOME_LOG_SIGMA', 'INCOME_TIERS', 'IncomeDistribution', 'LIVING_WAGE_CATEGORIES', 'LivingWage',
+    'ROLLING_MEASURES', 'ROLLING_WINDOWS', 'RollingAnalytics', 'TAX_BRACKETS', 'TrendFit', 'WORK_HOURS_WAGES',
+    'WorkHours', 'adjust_for_inflation', 'align_years', 'apply_view', 'childcare_costs', 'compare_income',
+    'fan_bands', 'first_per_year', 'fit_growth', 'fit_trends', 'growth_cube', 'growth_percentage',
+    'household_compositions', 'income_expense_ratios', 'income_tier', 'income_tiers', 'inflation_factors',
+    'latest_income_expense_ratio', 'living_wage_families', 'log_mean', 'moving_average', 'normal_cdf',
+    'percent_change', 'pre_tax_income', 'ratio_bands', 'rolling_cagr', 'rolling_volatility', 'scaling_factors',
+    'score_incomes', 'simulate_paths', 'year_grid', 'year_mask',
+]
@@ -0,0 +1,77 @@
+import numpy as np
+
+from .rolling import year_grid
+
+
+def log_mean(a, b):
+    """Logarithmic mean (a - b) / (ln a - ln b) of positive values, elementwise; a where a equals b"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (a - b) / (np.log(a) - np.log(b))
+    return np.where(a == b, a, mean)
+
+
+class AffordabilityAttribution:
+    """Which factors moved income-to-expense affordability between any two years
+
+    Affordability is median income over the total of a set of expense
+    categories. Its log change splits exactly into the income's log growth minus
+    each category's log growth weighted by its log-mean share of the total
+    (log-mean Divisia weights), so the parts always add up to the whole. The
+    split is computed for every (start, end) pair at once as a (factors, start,
+    end) cube, once per set of categories.
+    """
+
+    def __init__(self, income, expenses):
+        # income and each expense: (years, values); only years every series covers are kept
+        self.categories = list(expenses)
+        years, grid = year_grid({'income': income, **expenses})
+        covered = ~np.isnan(grid).any(axis=0) & (grid > 0).all(axis=0)
+        self.years = years[covered]
+        self.income = grid[0, covered]
+        self.expenses = grid[1:, covered]
+        self._cubes = {}
+
+    def _selected(self, categories):
+        return tuple(key for key in self.categories if key in categories)
+
+    def cube(self, categories):
+        """(1 + categories, start, end) contributions to the log change in affordability, income first
+
+        Category contributions are negative when the category grew, as a rising
+        cost lowers affordability. Entries with start after end are the reverse
+        changes; the diagonal is zero.
+        """
+        selected = self._selected(categories)
+        if selected not in self._cubes:
+            spending = self.expenses[[self.categories.index(key) for key in selected]]
+            total = spending.sum(axis=0)
+            log_income, log_spending = np.log(self.income), np.log(spending)
+            income_change = log_income[np.newaxis, :] - log_income[:, np.newaxis]
+            spending_change = log_spending[:, np.newaxis, :] - log_spending[:, :, np.newaxis]
+            weights = (log_mean(spending[:, np.newaxis, :], spending[:, :, np.newaxis])
+                       / log_mean(total[np.newaxis, :], total[:, np.newaxis]))
+            self._cubes[selected] = np.concatenate([income_change[np.newaxis], -weights * spending_change])
+        return self._cubes[selected]
+
+    def between(self, categories, start_year, end_year):
+        """Affordability in two years and each factor's share of the change, in ratio units, or None
+
+        Returns a dict with start_ratio, end_ratio and contributions, a dict of
+        'income' and each category to the part of end_ratio - start_ratio it
+        explains (its share of the log change).
+        """
+        selected = self._selected(categories)
+        if not selected or start_year not in self.years or end_year not in self.years:
+            return None
+        start, end = np.searchsorted(self.years, [start_year, end_year])
+        total = self.expenses[[self.categories.index(key) for key in selected]].sum(axis=0)
+        start_ratio, end_ratio = self.income[start] / total[start], self.income[end] / total[end]
+        log_parts = self.cube(selected)[:, start, end]
+        log_change = log_parts.sum()
+        scale = (end_ratio - start_ratio) / log_change if log_change else 0.0
+        return {
+            'start_ratio': float(start_ratio),
+            'end_ratio': float(end_ratio),
+            'contributions': {key: float(part * scale) for key, part in zip(('income',) + selected, log_parts)},
+        }
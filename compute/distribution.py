@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+
+from .series import first_per_year
+
+# Spread of log household income. A lognormal with this sigma has a Gini
+# coefficient of about 0.49, close to California's household income Gini; only
+# the median is available per year, so the spread is assumed constant
+INCOME_LOG_SIGMA = 0.93
+
+# Points in each year's CDF table, spanning TABLE_SPAN standard deviations either side of the median
+TABLE_POINTS = 2001
+TABLE_SPAN = 5.0
+
+
+def normal_cdf(z):
+    """Standard normal CDF of each value"""
+    return 0.5 * (1 + np.vectorize(math.erf, otypes=[float])(np.asarray(z, dtype=float) / math.sqrt(2)))
+
+
+class IncomeDistribution:
+    """Household income distribution per year, as precomputed CDF lookup tables
+
+    Each year has an ascending grid of incomes and the share of households
+    earning less than each one, so an income maps to a percentile by binary
+    search and linear interpolation between grid points; nothing is fitted at
+    lookup time. Tables could equally come from bracket data; lognormal builds
+    them from the median alone.
+    """
+
+    def __init__(self, years, incomes, cdf):
+        # years: (n,) ascending; incomes and cdf: (n, points), each row ascending
+        self.years = np.asarray(years)
+        self.incomes = np.asarray(incomes, dtype=float)
+        self.cdf = np.asarray(cdf, dtype=float)
+
+    @classmethod
+    def lognormal(cls, years, medians, sigma=INCOME_LOG_SIGMA, points=TABLE_POINTS, span=TABLE_SPAN):
+        """Lognormal distributions anchored to each year's median household income"""
+        years, medians = first_per_year(years, medians)
+        z = np.linspace(-span, span, points)
+        incomes = np.asarray(medians, dtype=float)[:, np.newaxis] * np.exp(sigma * z)
+        # Every year shares the same CDF row: only the income grid moves with the median
+        cdf = np.broadcast_to(normal_cdf(z), incomes.shape)
+        return cls(years, incomes, cdf)
+
+    def _row(self, year):
+        # The table for the year, or for the closest earlier year (the first one before the table starts)
+        return max(int(np.searchsorted(self.years, year, side='right')) - 1, 0)
+
+    def percentile(self, income, year):
+        """Percent of households earning less than income (a number or an array) in a year"""
+        row = self._row(year)
+        return 100 * np.interp(income, self.incomes[row], self.cdf[row])
+
+    def percentile_trend(self, income, years):
+        """Percentile of one income in each of the given years"""
+        return np.array([self.percentile(income, year) for year in years], dtype=float)
@@ -0,0 +1,106 @@
+import numpy as np
+
+from .series import first_per_year
+
+FORECAST_MODELS = ('linear', 'log-linear', 'holt')
+
+# Year the forecast extensions run to
+FORECAST_END_YEAR = 2030
+
+# Smoothing parameters tried for Holt's method (every alpha, beta pair)
+HOLT_GRID = np.linspace(0.05, 0.95, 19)
+
+
+class TrendFit:
+    """A trend model fitted to one annual series, with its parameters and the history it was fitted on
+
+    Forecasts start from the last observation and follow the model's trend from
+    there, so an extension joins the observed line without a jump.
+    """
+
+    def __init__(self, model, params, years, values):
+        self.model = model
+        self.params = params
+        self.years = years
+        self.values = values
+
+    @property
+    def last_year(self):
+        return int(self.years[-1])
+
+    def step(self, horizon):
+        """Change from the last observation after horizon years: added (linear, Holt) or multiplied (log-linear)"""
+        if self.model == 'linear':
+            return self.params['slope'] * horizon
+        if self.model == 'log-linear':
+            return (1 + self.params['rate']) ** horizon
+        return self.params['trend'] * horizon
+
+    def predict(self, years):
+        """Observed values for observed years and forecasts after the last one"""
+        years = np.asarray(years)
+        horizon = years - self.last_year
+        last_value = self.values[-1]
+        if self.model == 'log-linear':
+            forecast = last_value * self.step(horizon)
+        else:
+            forecast = last_value + self.step(horizon)
+        observed = np.interp(years, self.years, self.values)
+        return np.where(horizon > 0, forecast, observed)
+
+    def extension(self, end_year=FORECAST_END_YEAR):
+        """(years, values) from the last observation to end_year"""
+        years = np.arange(self.last_year, max(end_year, self.last_year) + 1)
+        return years, self.predict(years)
+
+
+def fit_linear(years, values):
+    slope, intercept = np.polyfit(years, values, 1)
+    return {'slope': float(slope), 'intercept': float(intercept)}
+
+
+def fit_log_linear(years, values):
+    """Least-squares line through the log values; rate is the implied compound annual growth"""
+    if (values <= 0).any():
+        return None
+    slope, intercept = np.polyfit(years, np.log(values), 1)
+    return {'rate': float(np.expm1(slope)), 'intercept': float(intercept)}
+
+
+def fit_holt(values, grid=HOLT_GRID):
+    """Holt's linear exponential smoothing with alpha and beta picked by one-step-ahead squared error
+
+    Every (alpha, beta) pair on the grid is run at once as a vector.
+    """
+    alpha, beta = (axis.ravel() for axis in np.meshgrid(grid, grid))
+    level = np.full(alpha.shape, float(values[0]))
+    trend = np.full(alpha.shape, float(values[1] - values[0]))
+    sse = np.zeros(alpha.shape)
+    for value in values[1:]:
+        forecast = level + trend
+        sse += (value - forecast) ** 2
+        new_level = alpha * value + (1 - alpha) * forecast
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    best = int(np.argmin(sse))
+    return {'alpha': float(alpha[best]), 'beta': float(beta[best]), 'level': float(level[best]),
+            'trend': float(trend[best])}
+
+
+def fit_trends(years, values, models=FORECAST_MODELS):
+    """{model: TrendFit} for every model that can be fitted to a series (three or more years needed)"""
+    years, values = first_per_year(years, values)
+    values = np.asarray(values, dtype=float)
+    fits = {}
+    if len(years) < 3:
+        return fits
+    for model in models:
+        if model == 'linear':
+            params = fit_linear(years, values)
+        elif model == 'log-linear':
+            params = fit_log_linear(years, values)
+        else:
+            params = fit_holt(values)
+        if params is not None:
+            fits[model] = TrendFit(model, params, years, values)
+    return fits
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .rolling import year_grid
+from .series import inflation_factors
+
+
+def growth_cube(log_levels):
+    """(series, start, end) percent growth between every pair of years, NaN unless start is before end
+
+    log_levels is a (series, years) array of log values on consecutive years,
+    i.e. each series' cumulative log growth up to an offset: growth between two
+    years is the difference of two entries, so the whole cube is one broadcast.
+    """
+    years = log_levels.shape[1]
+    cube = np.expm1(log_levels[:, np.newaxis, :] - log_levels[:, :, np.newaxis]) * 100
+    cube[:, ~np.triu(np.ones((years, years), dtype=bool), k=1)] = np.nan
+    return cube
+
+
+class GrowthCube:
+    """Growth from every start year to every later end year, for a set of annual series
+
+    Built once from cumulative log levels on one year grid, nominal and in
+    base-year dollars; a heatmap for a series is then a slice. Entries are NaN
+    where a series has no observation in the start or end year.
+    """
+
+    def __init__(self, series, base_year=2020):
+        # series: name -> (years, values)
+        self.names = list(series)
+        self._index = {name: row for row, name in enumerate(self.names)}
+        self.years, levels = year_grid(series)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_levels = np.log(np.where(levels > 0, levels, np.nan))
+        self.growth = growth_cube(log_levels)
+        self.real_growth = growth_cube(log_levels + np.log(inflation_factors(self.years, base_year)))
+
+    def matrix(self, name, start_year=None, end_year=None, real=False):
+        """(years, growth) of one series, growth[i, j] running from years[i] to years[j], optionally in a year range"""
+        first = 0 if start_year is None else int(np.searchsorted(self.years, start_year))
+        last = len(self.years) if end_year is None else int(np.searchsorted(self.years, end_year, side='right'))
+        cube = self.real_growth if real else self.growth
+        return self.years[first:last], cube[self._index[name], first:last, first:last]
+
+    def growth_between(self, name, start_year, end_year, real=False):
+        """Growth of one series from start_year to end_year in percent, or None when it is undefined"""
+        if not len(self.years) or not self.years[0] <= start_year < end_year <= self.years[-1]:
+            return None
+        cube = self.real_growth if real else self.growth
+        value = cube[self._index[name], start_year - self.years[0], end_year - self.years[0]]
+        return None if np.isnan(value) else float(value)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from .income import FULL_TIME_HOURS
+from .rolling import year_grid
+from .series import year_mask
+
+# Hourly wages expense categories are measured against, in the order of WorkHours.hours' first axis
+WORK_HOURS_WAGES = ('min_wage', 'median_pay')
+
+
+class WorkHours:
+    """Hours of work each expense category costs per year, at the minimum wage and at median pay
+
+    Median pay is the median household income spread over a full-time year
+    (FULL_TIME_HOURS). The wages and expenses are laid on one year grid and
+    divided in one broadcast into a (wages, categories, years) array, NaN where
+    a series has no observation.
+    """
+
+    def __init__(self, min_wage, income, expenses):
+        # min_wage: (years, hourly wage); income: (years, annual income);
+        # expenses: category -> (years, annual spending)
+        self.categories = list(expenses)
+        self.years, grid = year_grid({'min_wage': min_wage, 'income': income, **expenses})
+        wages = grid[:2] / np.array([1, FULL_TIME_HOURS])[:, np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.hours = np.where(wages[:, np.newaxis, :] > 0, grid[np.newaxis, 2:, :] / wages[:, np.newaxis, :],
+                                  np.nan)
+
+    def in_range(self, wage, start_year, end_year, categories=None):
+        """(years, {category: hours}) at one wage ('min_wage' or 'median_pay') for the years of a range
+
+        Only years where the wage and every returned category are observed are kept.
+        """
+        rows = [row for row, key in enumerate(self.categories) if categories is None or key in categories]
+        hours = self.hours[WORK_HOURS_WAGES.index(wage)][rows]
+        kept = year_mask(self.years, start_year, end_year) & ~np.isnan(hours).any(axis=0)
+        return self.years[kept], {self.categories[row]: values for row, values in zip(rows, hours[:, kept])}
+
+    def latest(self, wage, category, start_year, end_year):
+        """(year, hours) of one category at one wage in the latest year of a range it is defined, or None"""
+        years, by_category = self.in_range(wage, start_year, end_year, [category])
+        if not len(years):
+            return None
+        return int(years[-1]), float(by_category[category][-1])
@@ -0,0 +1,73 @@
+import numpy as np
+
+from .series import first_per_year
+
+# Household spending on a category is per-capita spending times
+# (adults + CHILD_WEIGHT * children) ** exponent: 1 is strictly per person,
+# lower values mean more of the spending is shared (one home, one car)
+HOUSEHOLD_SCALE_EXPONENTS = {
+    'energy': 0.6,
+    'healthcare': 1.0,
+    'housing': 0.5,
+    'leisure': 0.8,
+}
+
+# What a child counts for relative to an adult
+CHILD_WEIGHT = 0.5
+
+# Household compositions the factor table covers
+MAX_ADULTS = 4
+MAX_CHILDREN = 6
+
+
+def household_compositions(max_adults=MAX_ADULTS, max_children=MAX_CHILDREN):
+    """Every (adults, children) pair with at least one adult"""
+    return [(adults, children) for adults in range(1, max_adults + 1) for children in range(max_children + 1)]
+
+
+def scaling_factors(compositions, exponents, child_weight=CHILD_WEIGHT):
+    """(compositions, categories) array of per-capita to household multipliers"""
+    compositions = np.asarray(compositions, dtype=float)
+    equivalent = compositions[:, 0] + child_weight * compositions[:, 1]
+    return np.power(equivalent[:, np.newaxis], np.array(list(exponents.values()))[np.newaxis, :])
+
+
+class HouseholdBudget:
+    """Household budgets from per-capita spending series, for every household composition
+
+    The per-capita series are aligned on the years they all cover and the
+    scaling factors for every composition are computed up front, so a budget
+    is a slice and a row-times-matrix product.
+    """
+
+    def __init__(self, per_capita, exponents=HOUSEHOLD_SCALE_EXPONENTS, child_weight=CHILD_WEIGHT,
+                 max_adults=MAX_ADULTS, max_children=MAX_CHILDREN):
+        # per_capita: category -> (years, values); categories without an exponent are left out
+        self.categories = [key for key in exponents if key in per_capita]
+        years = None
+        for key in self.categories:
+            key_years, _ = first_per_year(*per_capita[key])
+            years = key_years if years is None else np.intersect1d(years, key_years, assume_unique=True)
+        self.years = years if years is not None else np.array([], dtype=int)
+        self.spending = np.empty((len(self.categories), len(self.years)))
+        for row, key in enumerate(self.categories):
+            key_years, values = first_per_year(*per_capita[key])
+            self.spending[row] = values[np.isin(key_years, self.years)]
+        self.compositions = household_compositions(max_adults, max_children)
+        self._composition_index = {composition: index for index, composition in enumerate(self.compositions)}
+        self.factors = scaling_factors(self.compositions, {key: exponents[key] for key in self.categories},
+                                       child_weight)
+
+    def budget(self, adults, children, start_year, end_year, categories=None):
+        """(years, {category: household spending per year}) for a composition and year range"""
+        factors = self.factors[self._composition_index[(adults, children)]]
+        columns = slice(*np.searchsorted(self.years, [start_year, end_year + 1]))
+        selected = [row for row, key in enumerate(self.categories) if categories is None or key in categories]
+        spending = self.spending[selected, columns] * factors[selected, np.newaxis]
+        return self.years[columns], {self.categories[row]: values for row, values in zip(selected, spending)}
+
+    def surplus(self, adults, children, start_year, end_year, income, categories=None):
+        """(years, total budget, income minus budget) per year; income is a number or an array per year"""
+        years, by_category = self.budget(adults, children, start_year, end_year, categories)
+        total = np.sum(list(by_category.values()), axis=0) if by_category else np.zeros(len(years))
+        return years, total, income - total
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+# (upper bound of income as % of the median, tier) in ascending order
+INCOME_TIERS = (
+    (50, 'significantly below'),
+    (80, 'below'),
+    (120, 'near'),
+    (math.inf, 'above'),
+)
+
+# Hours in a year of full-time work (40 a week, 52 weeks), to turn an hourly wage into annual earnings
+FULL_TIME_HOURS = 2080
+
+_TIER_BOUNDS = np.array([upper for upper, _ in INCOME_TIERS[:-1]])
+_TIER_NAMES = np.array([tier for _, tier in INCOME_TIERS], dtype=object)
+
+
+def income_tier(ratio_pct):
+    """Affordability tier for an income expressed as a percentage of the median"""
+    for upper, tier in INCOME_TIERS:
+        if ratio_pct < upper:
+            return tier
+    return INCOME_TIERS[-1][1]
+
+
+def income_tiers(ratio_pct):
+    """income_tier for an array of percentages of the median"""
+    return _TIER_NAMES[np.searchsorted(_TIER_BOUNDS, ratio_pct, side='right')]
+
+
+def compare_income(personal_income, median_income):
+    """How a personal income compares to the median: ratio (%), difference ($) and tier"""
+    ratio_pct = (personal_income / median_income) * 100
+    return {
+        'ratio_pct': ratio_pct,
+        'difference': personal_income - median_income,
+        'tier': income_tier(ratio_pct),
+    }
+
+
+def score_incomes(incomes, median_income, min_wage=None, expenses=None):
+    """compare_income for an array of incomes, plus how far each goes against the minimum wage and expenses
+
+    min_wage is an hourly wage, compared as full-time annual earnings; expenses
+    maps a category to its latest value. Returns a dict of arrays: ratio_pct,
+    difference, tier, min_wage_multiple (with min_wage) and <category>_ratio,
+    the income-to-expense ratio the dashboard reports for the median (NaN for
+    a non-positive expense).
+    """
+    incomes = np.asarray(incomes, dtype=float)
+    ratio_pct = (incomes / median_income) * 100
+    scores = {
+        'ratio_pct': ratio_pct,
+        'difference': incomes - median_income,
+        'tier': income_tiers(ratio_pct),
+    }
+    if min_wage is not None:
+        scores['min_wage_multiple'] = incomes / (min_wage * FULL_TIME_HOURS)
+    for key, expense in (expenses or {}).items():
+        scores[f'{key}_ratio'] = incomes / expense if expense > 0 else np.full(len(incomes), np.nan)
+    return scores
@@ -0,0 +1,166 @@
+import numpy as np
+
+from .household import HOUSEHOLD_SCALE_EXPONENTS, HouseholdBudget
+from .income import FULL_TIME_HOURS
+from .series import first_per_year, inflation_factors
+
+# Expense categories a living wage has to cover (leisure goods are left out)
+LIVING_WAGE_CATEGORIES = ('energy', 'healthcare', 'housing')
+
+# Family types the living wage is computed for: 1-2 working adults and 0-3 children
+LIVING_WAGE_MAX_ADULTS = 2
+LIVING_WAGE_MAX_CHILDREN = 3
+
+# Yearly childcare cost of each child in 2020 dollars, youngest first, as rough California
+# averages: the youngest is in full-time infant or preschool care, the next in preschool
+# or part-time care, and any others are of school age with before- and after-school care.
+# Other years follow the dashboard's flat inflation rate
+CHILDCARE_COSTS = (12000, 8000, 5000)
+
+# (lower bound of yearly pre-tax income, marginal rate) in 2020 dollars: payroll,
+# federal and California income tax combined into one illustrative schedule per
+# filing status. Like childcare, the bounds move with inflation. The combined rate
+# is not monotonic on purpose: Social Security's 6.2% stops at its 2020 wage base of
+# $137,700 per earner, leaving Medicare's 1.45% (plus 0.9% above $200,000 single or
+# $250,000 joint), and that drop is larger than the federal step from 22% to 24%
+SINGLE_TAX_BRACKETS = (
+    (0, 0.0865),  # payroll 7.65% + California 1%
+    (20000, 0.2265),  # payroll 7.65% + federal 12% + California 3%
+    (50000, 0.2565),  # payroll 7.65% + federal 12% + California 6%
+    (100000, 0.3895),  # payroll 7.65% + federal 22% + California 9.3%
+    (137700, 0.3275),  # Medicare 1.45% + federal 22% + California 9.3%
+    (200000, 0.3565),  # Medicare 2.35% + federal 24% + California 9.3%
+)
+
+# Married filing jointly, two earners with equal wages: the federal and California
+# brackets are about twice as wide as single ones, and each earner reaches the
+# Social Security wage base at half the household income
+JOINT_TAX_BRACKETS = (
+    (0, 0.0865),  # payroll 7.65% + California 1%
+    (40000, 0.2265),  # payroll 7.65% + federal 12% + California 3%
+    (100000, 0.2565),  # payroll 7.65% + federal 12% + California 6%
+    (200000, 0.3895),  # payroll 7.65% + federal 22% + California 9.3%
+    (250000, 0.3985),  # payroll 8.55% + federal 22% + California 9.3%
+    (275400, 0.3365),  # Medicare 2.35% + federal 22% + California 9.3%
+    (400000, 0.3565),  # Medicare 2.35% + federal 24% + California 9.3%
+)
+
+# Working adults -> the tax schedule their household files under
+TAX_BRACKETS = {1: SINGLE_TAX_BRACKETS, 2: JOINT_TAX_BRACKETS}
+
+# Pre-tax income the schedule is tabulated up to; higher incomes are extrapolated at the top rate
+_TAX_TABLE_TOP = 10_000_000
+
+
+def after_tax_table(brackets=SINGLE_TAX_BRACKETS, top=_TAX_TABLE_TOP):
+    """(pre-tax, after-tax) incomes at each bracket bound, the points of a piecewise linear schedule"""
+    bounds = np.array([lower for lower, _ in brackets] + [top], dtype=float)
+    rates = np.array([rate for _, rate in brackets])
+    after_tax = np.concatenate([[0.0], np.cumsum(np.diff(bounds) * (1 - rates))]) + bounds[0]
+    return bounds, after_tax
+
+
+def pre_tax_income(after_tax, years, brackets=SINGLE_TAX_BRACKETS, base_year=2020):
+    """Pre-tax income leaving the given after-tax income in each year; after_tax is (years, ...)
+
+    The schedule is piecewise linear, so it is inverted exactly by interpolating
+    between its bracket points, after moving each year's amounts into base-year
+    dollars (where the brackets are set) and back. Past the table's last point
+    every extra dollar is taxed at the top rate.
+    """
+    to_base = inflation_factors(years, base_year).reshape((-1,) + (1,) * (np.ndim(after_tax) - 1))
+    pre_tax, post_tax = after_tax_table(brackets)
+    after_tax = np.asarray(after_tax) * to_base
+    beyond = pre_tax[-1] + (after_tax - post_tax[-1]) / (1 - brackets[-1][1])
+    return np.where(after_tax > post_tax[-1], beyond, np.interp(after_tax, post_tax, pre_tax)) / to_base
+
+
+def childcare_costs(children, costs=CHILDCARE_COSTS):
+    """Yearly childcare cost in 2020 dollars for each number of children, youngest first
+
+    Children beyond the cost table cost as much as its last entry.
+    """
+    children = np.asarray(children)
+    per_child = np.array([costs[min(child, len(costs) - 1)] for child in range(int(children.max(initial=0)))])
+    return np.concatenate([[0], np.cumsum(per_child)])[children]
+
+
+def living_wage_families(max_adults=LIVING_WAGE_MAX_ADULTS, max_children=LIVING_WAGE_MAX_CHILDREN):
+    """Every (adults, children) family type the living wage covers"""
+    return [(adults, children) for adults in range(1, max_adults + 1) for children in range(max_children + 1)]
+
+
+class LivingWage:
+    """Living wage per year and family type, as precomputed (years, families) matrices
+
+    A family's yearly needs are its household spending on the living-wage
+    categories (per-capita series scaled like the household budget simulator)
+    plus childcare for each child. The pre-tax income covering them after tax,
+    under the schedule for the family's number of earners, is the annual
+    living wage, and split over full-time hours for each adult it
+    gives the hourly wage every adult has to earn. Minimum wage and median income
+    comparisons are computed for the same cells, so every lookup is an index.
+    """
+
+    def __init__(self, per_capita, min_wage=None, income=None, families=None, childcare=CHILDCARE_COSTS,
+                 brackets=TAX_BRACKETS, base_year=2020):
+        # per_capita: category -> (years, values); min_wage (hourly) and income (yearly): (years, values)
+        self.families = families or living_wage_families()
+        self._family_index = {family: column for column, family in enumerate(self.families)}
+        budget = HouseholdBudget({key: per_capita[key] for key in LIVING_WAGE_CATEGORIES if key in per_capita},
+                                 {key: HOUSEHOLD_SCALE_EXPONENTS[key] for key in LIVING_WAGE_CATEGORIES},
+                                 max_adults=max(adults for adults, _ in self.families),
+                                 max_children=max(children for _, children in self.families))
+        self.years = budget.years
+        self._year_index = {year: row for row, year in enumerate(self.years.tolist())}
+
+        family_rows = [budget.compositions.index(family) for family in self.families]
+        spending = budget.spending.T @ budget.factors[family_rows].T
+        children = np.array([children for _, children in self.families])
+        care = childcare_costs(children, childcare) / inflation_factors(self.years, base_year)[:, np.newaxis]
+        self.needs = spending + care
+        # brackets: working adults -> tax schedule, applied to each group of family columns
+        adults = np.array([adults for adults, _ in self.families])
+        self.annual = np.empty_like(self.needs)
+        for earners in np.unique(adults):
+            columns = adults == earners
+            self.annual[:, columns] = pre_tax_income(self.needs[:, columns], self.years, brackets[earners], base_year)
+        self.hourly = self.annual / (adults * FULL_TIME_HOURS)
+
+        # Comparisons, NaN in years without a minimum wage or median income observation
+        self.min_wage = self._on_years(min_wage)
+        self.median_income = self._on_years(income)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.min_wage_multiple = self.hourly / self.min_wage[:, np.newaxis]
+            self.income_share = self.annual / self.median_income[:, np.newaxis] * 100
+
+    def _on_years(self, series):
+        # A (years, values) series laid on the living wage's years
+        on_years = np.full(len(self.years), np.nan)
+        if series is not None:
+            years, values = first_per_year(*series)
+            _, rows, matches = np.intersect1d(self.years, years, assume_unique=True, return_indices=True)
+            on_years[rows] = values[matches]
+        return on_years
+
+    def cell(self, year, adults, children):
+        """(row, column) of a year and family type in the matrices, or None when it is not covered"""
+        row = self._year_index.get(int(year))
+        column = self._family_index.get((adults, children))
+        if row is None or column is None:
+            return None
+        return row, column
+
+    def lookup(self, year, adults, children):
+        """Living wage figures for one year and family type as a dict, or None when it is not covered"""
+        cell = self.cell(year, adults, children)
+        if cell is None:
+            return None
+        return {
+            'year': int(year),
+            'needs': float(self.needs[cell]),
+            'annual': float(self.annual[cell]),
+            'hourly': float(self.hourly[cell]),
+            'min_wage_multiple': float(self.min_wage_multiple[cell]),
+            'income_share': float(self.income_share[cell]),
+        }
@@ -0,0 +1,65 @@
+import numpy as np
+
+from .series import first_per_year
+
+# Percentiles across simulated paths drawn as fan chart bands, outermost pair first
+FAN_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def fit_growth(series):
+    """Fit the drift and covariance of annual log growth jointly, over the years every series covers
+
+    series maps a name to (years, values). Returns a dict with the names, the
+    last common year and each series' value in it, the mean annual log growth
+    per series and the covariance matrix of the annual log growth. Gaps between
+    observed years are spread evenly over the years they span.
+    """
+    names = list(series)
+    if not names:
+        raise ValueError("no series to fit")
+    years = None
+    for name in names:
+        name_years, _ = first_per_year(*series[name])
+        years = name_years if years is None else np.intersect1d(years, name_years, assume_unique=True)
+    if len(years) < 3:
+        raise ValueError("at least three years common to every series are needed to fit growth")
+    values = np.empty((len(names), len(years)))
+    for row, name in enumerate(names):
+        name_years, name_values = first_per_year(*series[name])
+        values[row] = name_values[np.isin(name_years, years)]
+    if (values <= 0).any():
+        raise ValueError("growth can only be fitted to positive values")
+
+    growth = np.diff(np.log(values), axis=1) / np.diff(years)
+    return {
+        'names': names,
+        'last_year': int(years[-1]),
+        'last_values': values[:, -1],
+        'drift': growth.mean(axis=1),
+        'covariance': np.atleast_2d(np.cov(growth)),
+    }
+
+
+def simulate_paths(last_values, drift, covariance, horizon, paths, seed=None):
+    """Simulated values as a (paths, horizon + 1, series) array; step 0 holds the last observed values
+
+    Each year's log growth is drawn from a multivariate normal with the fitted
+    drift and covariance, so series that moved together historically move
+    together in every path.
+    """
+    rng = np.random.default_rng(seed)
+    growth = rng.multivariate_normal(drift, covariance, size=(paths, horizon))
+    simulated = np.empty((paths, horizon + 1, len(last_values)))
+    simulated[:, 0] = last_values
+    simulated[:, 1:] = last_values * np.exp(np.cumsum(growth, axis=1))
+    return simulated
+
+
+def fan_bands(simulated, percentiles=FAN_PERCENTILES):
+    """Percentiles across paths as a (percentiles, horizon + 1, series) array"""
+    return np.percentile(simulated, percentiles, axis=0)
+
+
+def ratio_bands(simulated, numerator, denominator, percentiles=FAN_PERCENTILES):
+    """Percentiles across paths of one series divided by another, as a (percentiles, horizon + 1) array"""
+    return np.percentile(simulated[:, :, numerator] / simulated[:, :, denominator], percentiles, axis=0)
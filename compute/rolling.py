@@ -0,0 +1,101 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .series import adjust_for_inflation, first_per_year, year_mask
+
+ROLLING_MEASURES = ('moving-average', 'cagr', 'volatility')
+
+# Window lengths (years) computed up front; other lengths are computed on first use
+ROLLING_WINDOWS = (3, 5, 10)
+
+
+def year_grid(series):
+    """(years, matrix): every series on one run of consecutive years, NaN where a series has no observation
+
+    series maps a name to (years, values); matrix rows follow its order.
+    """
+    annual = [first_per_year(*series[name]) for name in series]
+    observed = [years for years, _ in annual if len(years)]
+    if not observed:
+        return np.array([], dtype=int), np.empty((len(annual), 0))
+    years = np.arange(min(years[0] for years in observed), max(years[-1] for years in observed) + 1)
+    matrix = np.full((len(annual), len(years)), np.nan)
+    for row, (name_years, values) in enumerate(annual):
+        matrix[row, name_years - years[0]] = values
+    return years, matrix
+
+
+def moving_average(matrix, window):
+    """Mean of the last window years at each year, per row"""
+    averages = np.full(matrix.shape, np.nan)
+    if window <= matrix.shape[1]:
+        averages[:, window - 1:] = sliding_window_view(matrix, window, axis=1).mean(axis=2)
+    return averages
+
+
+def rolling_cagr(matrix, window):
+    """Compound annual growth over the last window years at each year, in percent, per row"""
+    rates = np.full(matrix.shape, np.nan)
+    if window < matrix.shape[1]:
+        start, end = matrix[:, :-window], matrix[:, window:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates[:, window:] = np.where(start > 0, (np.power(end / start, 1 / window) - 1) * 100, np.nan)
+    return rates
+
+
+def rolling_volatility(matrix, window):
+    """Standard deviation of the last window year-over-year growth rates at each year, in percent, per row"""
+    volatility = np.full(matrix.shape, np.nan)
+    if window < matrix.shape[1]:
+        start, end = matrix[:, :-1], matrix[:, 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(start > 0, (end / start - 1) * 100, np.nan)
+        volatility[:, window:] = sliding_window_view(growth, window, axis=1).std(axis=2, ddof=1)
+    return volatility
+
+
+ROLLING_FUNCTIONS = {
+    'moving-average': moving_average,
+    'cagr': rolling_cagr,
+    'volatility': rolling_volatility,
+}
+
+
+class RollingAnalytics:
+    """Rolling moving averages, CAGR and volatility for a set of annual series
+
+    The series are laid on one year grid and every measure is computed for the
+    whole grid at once with sliding windows, both in nominal terms and in
+    inflation-adjusted (base-year) dollars. A value at a year covers the window
+    ending there and is NaN until the series has a full window behind it, so
+    a year range always shows the same rolling values whatever year it starts in.
+    """
+
+    def __init__(self, series, windows=ROLLING_WINDOWS, base_year=2020):
+        # series: name -> (years, values)
+        self.names = list(series)
+        self._index = {name: row for row, name in enumerate(self.names)}
+        self.years, self.matrix = year_grid(series)
+        self.real_matrix = adjust_for_inflation(self.matrix, self.years, base_year)
+        self._results = {}
+        for measure in ROLLING_MEASURES:
+            for window in windows:
+                for real in (False, True):
+                    self.values(measure, window, real)
+
+    def values(self, measure, window, real=False):
+        """(series, years) array of a measure over the whole grid"""
+        if measure not in ROLLING_FUNCTIONS:
+            raise ValueError(f"unknown rolling measure: {measure}")
+        if window < 2:
+            raise ValueError("rolling windows must span at least two years")
+        key = (measure, window, real)
+        if key not in self._results:
+            self._results[key] = ROLLING_FUNCTIONS[measure](self.real_matrix if real else self.matrix, window)
+        return self._results[key]
+
+    def series(self, name, measure, window, start_year, end_year, real=False):
+        """(years, values) of a measure for one series in a year range, leaving out years it is undefined"""
+        row = self.values(measure, window, real)[self._index[name]]
+        shown = year_mask(self.years, start_year, end_year) & ~np.isnan(row)
+        return self.years[shown], row[shown]
@@ -0,0 +1,91 @@
+import numpy as np
+
+# Simplified inflation: a flat 2.5% a year instead of actual CPI data
+INFLATION_RATE = 0.025
+
+VIEW_OPTIONS = ('actual', 'percent', 'adjusted')
+
+
+def year_mask(years, start_year, end_year):
+    """Boolean mask selecting the observations from start_year to end_year inclusive"""
+    years = np.asarray(years)
+    return (years >= start_year) & (years <= end_year)
+
+
+def growth_percentage(values):
+    """Percentage growth from the first to the last value (0 with fewer than two values or a zero start)"""
+    if len(values) < 2:
+        return 0
+    first_val = values[0]
+    last_val = values[-1]
+    if first_val == 0:
+        return 0
+    return ((last_val - first_val) / first_val) * 100
+
+
+def percent_change(values):
+    """Values as percent change from the first one (unchanged with fewer than two values or a zero start)"""
+    values = np.asarray(values)
+    if len(values) > 1:
+        first_val = values[0]
+        if first_val != 0:
+            return ((values - first_val) / first_val) * 100
+    return values.copy()
+
+
+def inflation_factors(years, base_year=2020):
+    """Multipliers converting each year's dollars to base_year dollars"""
+    return np.power(1 + INFLATION_RATE, base_year - np.asarray(years))
+
+
+def adjust_for_inflation(values, years, base_year=2020):
+    """Values converted to base_year dollars"""
+    return np.asarray(values) * inflation_factors(years, base_year)
+
+
+def apply_view(values, years, view_option, base_year=2020):
+    """Values transformed for a dashboard view option: 'actual', 'percent' or 'adjusted'"""
+    if view_option == 'percent':
+        return percent_change(values)
+    if view_option == 'adjusted':
+        return adjust_for_inflation(values, years, base_year)
+    return np.array(values)
+
+
+def first_per_year(years, values):
+    """(years, values) keeping the first observation of each calendar year, sorted by year"""
+    unique_years, first_index = np.unique(np.asarray(years), return_index=True)
+    return unique_years, np.asarray(values)[first_index]
+
+
+def align_years(left_years, left_values, right_years, right_values):
+    """(years, left, right): the first value per year of two series, for the years both cover"""
+    left_years, left_values = first_per_year(left_years, left_values)
+    right_years, right_values = first_per_year(right_years, right_values)
+    years, left_index, right_index = np.intersect1d(left_years, right_years, assume_unique=True,
+                                                    return_indices=True)
+    return years, left_values[left_index], right_values[right_index]
+
+
+def income_expense_ratios(income_years, income_values, expense_years, expense_values):
+    """Income divided by expense for each year both series cover (skipping non-positive expenses)
+
+    Returns (years, ratios) as lists.
+    """
+    if len(income_years) == 0 or len(expense_years) == 0:
+        return [], []
+    years, income, expense = align_years(income_years, income_values, expense_years, expense_values)
+    positive = expense > 0
+    return years[positive].tolist(), (income[positive] / expense[positive]).tolist()
+
+
+def latest_income_expense_ratio(income_years, income_values, expense_years, expense_values):
+    """Income-to-expense ratio in the latest year both series cover, or None"""
+    if len(income_years) == 0 or len(expense_years) == 0:
+        return None
+    years, income, expense = align_years(income_years, income_values, expense_years, expense_values)
+    if len(years) == 0:
+        return None
+    if expense[-1] > 0:
+        return float(income[-1] / expense[-1])
+    return None
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+# Directory holding the FRED CSV exports (override to point the dashboard at other data)
+DATA_DIR = os.environ.get('DASHBOARD_DATA_DIR', 'data')
+
+# State whose files sit directly in the data directory; other states live in
+# two-letter subdirectories (e.g. data/TX/) holding the same set of files
+DEFAULT_STATE = os.environ.get('DASHBOARD_STATE', 'CA')
+
+# Dataset key -> CSV file exported from FRED
+DATASET_FILES = {
+    'min_wage': 'CaliMinWage.csv',
+    'energy': 'energyGasPC.csv',
+    'healthcare': 'healthCarePC.csv',
+    'housing': 'housingUtliPC.csv',
+    'leisure': 'leisureGoodsPC.csv',
+    'income': 'medianHouseIncomeCal.csv',
+}
+
+# Extra per-capita expense series beyond the real four (e.g. from scripts/synth_fred.py for scale
+# testing) sit next to them as extra_<name>.csv files and load under the key extra_<name>
+EXTRA_EXPENSE_PREFIX = 'extra_'
+
+
+def load_dataset(path):
+    """Load one FRED CSV and convert its observation_date column to datetime"""
+    df = pd.read_csv(path)
+    df['observation_date'] = pd.to_datetime(df['observation_date'])
+    return df
+
+
+def dataset_files(data_dir=DATA_DIR):
+    """Dataset key -> file name for the data directory: DATASET_FILES plus any extra expense series"""
+    extra = {name[:-len('.csv')]: name for name in sorted(os.listdir(data_dir))
+             if name.startswith(EXTRA_EXPENSE_PREFIX) and name.endswith('.csv')}
+    return {**DATASET_FILES, **extra}
+
+
+def load_datasets(data_dir=DATA_DIR):
+    """Load every dataset in the data directory, keyed like DATASET_FILES (extra expense series after them)"""
+    return {key: load_dataset(os.path.join(data_dir, file_name))
+            for key, file_name in dataset_files(data_dir).items()}
+
+
+def has_datasets(directory):
+    """Check whether a directory holds the full set of dataset files"""
+    return all(os.path.isfile(os.path.join(directory, file_name)) for file_name in DATASET_FILES.values())
+
+
+def discover_states(data_dir=DATA_DIR):
+    """Map state code -> data directory for every state with a full set of dataset files"""
+    states = {}
+    if has_datasets(data_dir):
+        states[DEFAULT_STATE] = data_dir
+    for entry in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, entry)
+        if len(entry) == 2 and entry.isalpha() and entry.isupper() and os.path.isdir(path) and has_datasets(path):
+            states.setdefault(entry, path)
+    return states
+
+
+def state_data_dir(data_dir, state):
+    """Return the directory holding one state's dataset files"""
+    states = discover_states(data_dir)
+    if state not in states:
+        raise KeyError(f"no datasets for state {state!r} in {data_dir}")
+    return states[state]
+
+
+def dataset_version(data_dir=DATA_DIR):
+    """Fingerprint the dataset files so caches can tell when the data changed"""
+    digest = hashlib.sha1()
+    for file_name in sorted(dataset_files(data_dir).values()):
+        stat = os.stat(os.path.join(data_dir, file_name))
+        digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+class DataStore:
+    """The loaded datasets together with the version they were loaded from"""
+
+    def __init__(self, data_dir=DATA_DIR, state=DEFAULT_STATE):
+        self.root_dir = data_dir
+        self.state = state
+        self.data_dir = state_data_dir(data_dir, state)
+        self._lock = threading.Lock()
+        # Version and datasets are swapped together so readers never see a mix
+        self._snapshot = (dataset_version(self.data_dir), load_datasets(self.data_dir))
+
+    @classmethod
+    def from_datasets(cls, datasets, version='in-memory', state=DEFAULT_STATE):
+        """Wrap already loaded datasets in a store (no files to watch, refresh is a no-op)"""
+        store = cls.__new__(cls)
+        store.root_dir = store.data_dir = None
+        store.state = state
+        store._lock = threading.Lock()
+        store._snapshot = (version, datasets)
+        return store
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    @property
+    def datasets(self):
+        return self._snapshot[1]
+
+    def __getitem__(self, key):
+        return self._snapshot[1][key]
+
+    def refresh(self):
+        """Reload the datasets if the files on disk changed; return True when reloaded"""
+        if self.data_dir is None:
+            return False
+        version = dataset_version(self.data_dir)
+        if version == self.version:
+            return False
+        with self._lock:
+            if version != self.version:
+                self._snapshot = (version, load_datasets(self.data_dir))
+        return True
@@ -0,0 +1,24 @@
+"""Input values the dashboard starts with
+
+Kept apart from app.py so scripts that drive the dashboard over HTTP can
+build callback payloads without importing the app (and loading its data).
+"""
+
+# The layout is prerendered for these values
+DEFAULT_INPUTS = {
+    'year-slider.value': [1990, 2020],
+    'expense-checklist.value': ['energy', 'healthcare', 'housing'],
+    'view-radio.value': 'actual',
+    'forecast-radio.value': 'none',
+    'rolling-measure.value': 'none',
+    'rolling-window.value': 5,
+    'personal-income-input.value': 60000,
+    'household-adults.value': 2,
+    'household-children.value': 1,
+    'household-income-input.value': None,
+    'projection-horizon.value': 10,
+    'projection-paths.value': 5000,
+    'heatmap-series.value': 'housing',
+    'living-wage-adults.value': 1,
+    'living-wage-children.value': 1,
+}
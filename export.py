@@ -0,0 +1,316 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import pandas as pd
+from flask import Blueprint, Response, jsonify, request, send_file, url_for
+
+from analysis import SERIES_LABELS, apply_view, filter_by_year_range, value_column
+from api import API_PREFIX, ApiError, parse_params, store_year_bounds
+from data_store import discover_states, load_datasets
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+# Exports covering more states than this run as background jobs instead of streaming directly
+MAX_STREAMED_STATES = 3
+
+# Finished export files are kept this long (seconds) before they are cleaned up
+EXPORT_JOB_TTL = 3600
+
+EXPORT_COLUMNS = ['state', 'series', 'label', 'series_id', 'observation_date', 'value']
+
+
+def export_url(export_format, params):
+    """Link to the streaming export endpoint for the given dashboard selections"""
+    query = {key: ','.join(value) if isinstance(value, (list, tuple)) else value
+             for key, value in params.items()}
+    return f"{API_PREFIX}/export.{export_format}?{urlencode(query)}"
+
+
+def parse_states(args, store):
+    """Validate the states parameter; defaults to the dashboard's own state"""
+    available = discover_states(store.root_dir)
+    states = args.get('states')
+    if states is None:
+        return (store.state,)
+    states = tuple(dict.fromkeys(item.strip().upper() for item in states.split(',') if item.strip()))
+    unknown = [state for state in states if state not in available]
+    if unknown or not states:
+        raise ApiError(f"unknown states: {', '.join(unknown) or '(none given)'}")
+    return states
+
+
+def iter_export_frames(store, params, states, on_chunk=None):
+    """Yield the filtered, view-transformed data one (state, series) chunk at a time
+
+    Only one state's datasets are held in memory at once, so memory use does not
+    grow with the number of states exported.
+    """
+    p = dict(params)
+    available = discover_states(store.root_dir)
+    for state in states:
+        datasets = store.datasets if state == store.state else load_datasets(available[state])
+        for key in ('income', 'min_wage') + p['categories']:
+            filtered_df = filter_by_year_range(datasets[key], p['start'], p['end'])
+            display_df = apply_view(filtered_df, p['view'], p['base_year'])
+            col = value_column(display_df)
+            yield pd.DataFrame({
+                'state': state,
+                'series': key,
+                'label': SERIES_LABELS[key],
+                'series_id': col,
+                'observation_date': display_df['observation_date'].values,
+                'value': display_df[col].values,
+            }, columns=EXPORT_COLUMNS)
+            if on_chunk is not None:
+                on_chunk()
+        del datasets
+
+
+def stream_csv(frames):
+    """Encode export chunks as CSV, yielding bytes as each chunk is written"""
+    yield (','.join(EXPORT_COLUMNS) + '\n').encode()
+    for frame in frames:
+        yield frame.to_csv(header=False, index=False, date_format='%Y-%m-%d').encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(frames):
+    """Encode export chunks as Parquet, one row group per chunk"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ApiError("Parquet export requires the pyarrow package", status=501)
+
+    schema = pa.schema([('state', pa.string()), ('series', pa.string()), ('label', pa.string()),
+                        ('series_id', pa.string()), ('observation_date', pa.timestamp('ms')),
+                        ('value', pa.float64())])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for frame in frames:
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_xlsx(frames):
+    """Encode export chunks as an Excel workbook, spooled through a temporary file"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ApiError("Excel export requires the openpyxl package", status=501)
+
+    # Write-only mode streams rows to disk instead of keeping the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Export')
+    sheet.append(EXPORT_COLUMNS)
+    for frame in frames:
+        for row in frame.itertuples(index=False):
+            sheet.append([row.state, row.series, row.label, row.series_id,
+                          row.observation_date.to_pydatetime(), None if pd.isna(row.value) else row.value])
+
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            block = spool.read(64 * 1024)
+            if not block:
+                break
+            yield block
+
+
+STREAM_WRITERS = {
+    'csv': stream_csv,
+    'parquet': stream_parquet,
+    'xlsx': stream_xlsx,
+}
+
+
+class ExportJob:
+    """A background export and its progress"""
+
+    def __init__(self, export_format, params, states):
+        self.id = uuid.uuid4().hex
+        self.format = export_format
+        self.params = params
+        self.states = states
+        self.status = 'queued'
+        self.chunks_done = 0
+        self.chunks_total = len(states) * (2 + len(dict(params)['categories']))
+        self.path = None
+        self.error = None
+        self.finished_at = None
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'format': self.format,
+            'status': self.status,
+            'progress': self.chunks_done / self.chunks_total if self.chunks_total else 1.0,
+            'error': self.error,
+        }
+
+
+class ExportJobs:
+    """Runs large exports on a small thread pool and writes them to a spool directory"""
+
+    def __init__(self, store, max_workers=2):
+        self.store = store
+        self.directory = tempfile.mkdtemp(prefix='dashboard-exports-')
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, export_format, params, states):
+        self._prune()
+        job = ExportJob(export_format, params, states)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.status = 'running'
+        path = os.path.join(self.directory, f"{job.id}.{EXPORT_FORMATS[job.format][1]}")
+
+        def advance():
+            job.chunks_done += 1
+
+        try:
+            frames = iter_export_frames(self.store, job.params, job.states, on_chunk=advance)
+            with open(path, 'wb') as output:
+                for block in STREAM_WRITERS[job.format](frames):
+                    output.write(block)
+            job.path = path
+            job.status = 'done'
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = 'failed'
+        job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget finished jobs older than EXPORT_JOB_TTL and delete their files"""
+        cutoff = time.time() - EXPORT_JOB_TTL
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            if job.path and os.path.exists(job.path):
+                os.remove(job.path)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def register_export(server, store):
+    """Register the streaming export endpoints and background export jobs on the Flask server"""
+    blueprint = Blueprint('export_v1', __name__, url_prefix=API_PREFIX)
+    jobs = ExportJobs(store)
+    atexit.register(jobs.shutdown)
+
+    def parse_export_request(export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise ApiError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        return parse_params(request.args, store_year_bounds(store)), parse_states(request.args, store)
+
+    def job_response(job, status=200):
+        body = {**job.summary(), 'status_url': url_for('export_v1.export_status', job_id=job.id)}
+        if job.status == 'done':
+            body['download_url'] = url_for('export_v1.export_download', job_id=job.id)
+        return jsonify(body), status
+
+    @blueprint.route('/export.<export_format>')
+    def export(export_format):
+        params, states = parse_export_request(export_format)
+        if len(states) > MAX_STREAMED_STATES:
+            # Too large to stream inline: hand it to a background job and point at its status
+            job = jobs.submit(export_format, params, states)
+            body, status = job_response(job, 202)
+            body.headers['Location'] = url_for('export_v1.export_status', job_id=job.id)
+            return body, status
+
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        blocks = STREAM_WRITERS[export_format](iter_export_frames(store, params, states))
+        # Pull the first block now so missing optional dependencies surface as a proper error
+        first_block = next(blocks)
+
+        def generate():
+            yield first_block
+            yield from blocks
+
+        filename = f"cost-of-living-{'-'.join(states)}-{dict(params)['view']}.{extension}"
+        return Response(generate(), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+    @blueprint.route('/exports', methods=['POST'])
+    def export_job():
+        export_format = request.args.get('format', 'csv')
+        params, states = parse_export_request(export_format)
+        job = jobs.submit(export_format, params, states)
+        return job_response(job, 202)
+
+    @blueprint.route('/exports/<job_id>')
+    def export_status(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'unknown export job'}), 404
+        return job_response(job)
+
+    @blueprint.route('/exports/<job_id>/download')
+    def export_download(job_id):
+        job = jobs.get(job_id)
+        if job is None or job.status != 'done':
+            return jsonify({'error': 'export is not ready'}), 404
+        mimetype, extension = EXPORT_FORMATS[job.format]
+        return send_file(job.path, mimetype=mimetype, as_attachment=True,
+                         download_name=f"cost-of-living-export.{extension}")
+
+    server.register_blueprint(blueprint)
+    return jobs
@@ -0,0 +1,153 @@
+import gc
+import os
+import threading
+import tracemalloc
+from collections import Counter, deque
+from functools import wraps
+
+from flask import jsonify
+
+# Invocations per callback whose retained memory is kept for the growth check
+GROWTH_WINDOW = 50
+
+# A callback is flagged when its retained memory grows faster than this over the window
+GROWTH_BYTES_PER_CALL = 1024
+
+# Source lines listed per callback in reports
+TOP_LINES = 10
+
+
+def _slope(values):
+    """Least-squares slope of values against their index"""
+    count = len(values)
+    mean_x = (count - 1) / 2
+    mean_y = sum(values) / count
+    numerator = sum((index - mean_x) * (value - mean_y) for index, value in enumerate(values))
+    denominator = sum((index - mean_x) ** 2 for index in range(count))
+    return numerator / denominator if denominator else 0.0
+
+
+class _MemoryStats:
+    """Allocation history of one callback"""
+
+    def __init__(self):
+        self.calls = 0
+        self.peak_max = 0
+        self.peak_total = 0
+        self.settled = 0
+        self.retained_total = 0
+        # Cumulative retained bytes after each of the latest invocations
+        self.retained = deque(maxlen=GROWTH_WINDOW)
+        # Retained bytes per allocating source line, summed over all invocations
+        self.lines = Counter()
+
+
+class CallbackMemoryTracker:
+    """Records peak and retained allocations per callback invocation with tracemalloc
+
+    Tracked invocations run one at a time because tracemalloc's counters are
+    process-wide; this is a diagnostic mode, not something to leave on under load.
+    Peak is the high-water mark above the starting level during the call. What
+    an invocation retained is only known once its result has been serialized and
+    dropped, so it is settled at the start of the next tracked call, after a
+    garbage collection, and attributed to the source lines that allocated it.
+    """
+
+    def __init__(self, frames=1):
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._stats = {}
+        # The invocation whose retained memory is settled by the next tracked call
+        self._pending = None
+        self._mark = None
+        self._snapshot = None
+        # Keep tracemalloc's own snapshot bookkeeping out of the line attribution
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    @classmethod
+    def from_env(cls):
+        """Build a tracker when DASHBOARD_TRACE_MEMORY is set (its value is the traceback depth); otherwise None"""
+        frames = os.environ.get('DASHBOARD_TRACE_MEMORY')
+        if not frames:
+            return None
+        return cls(frames=max(1, int(frames)))
+
+    def start(self):
+        """Start tracing; call once the app is warmed up
+
+        Until then tracked callbacks run untraced, so startup allocations (data,
+        the prerendered layout, Plotly's lazily loaded validators) are never
+        traced and snapshots stay small.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def wrap(self, name, func):
+        """Wrap a callback to measure the memory each invocation allocates and retains"""
+        stats = self._stats.setdefault(name, _MemoryStats())
+
+        @wraps(func)
+        def tracked(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return func(*args, **kwargs)
+            with self._lock:
+                gc.collect()
+                self._settle()
+                start, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _, peak = tracemalloc.get_traced_memory()
+                    stats.calls += 1
+                    stats.peak_max = max(stats.peak_max, peak - start)
+                    stats.peak_total += peak - start
+                    self._pending = stats
+
+        return tracked
+
+    def _settle(self):
+        """Charge the memory traced since the previous tracked call to that call's callback"""
+        current, _ = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        stats = self._pending
+        if stats is not None and self._snapshot is not None:
+            stats.settled += 1
+            stats.retained_total += current - self._mark
+            stats.retained.append(stats.retained_total)
+            for diff in snapshot.compare_to(self._snapshot, 'lineno'):
+                if diff.size_diff:
+                    frame = diff.traceback[0]
+                    stats.lines[f"{frame.filename}:{frame.lineno}"] += diff.size_diff
+        self._mark, self._snapshot = current, snapshot
+
+    def summary(self):
+        """Per-callback peak / retained allocation figures, growth flag and top retaining source lines"""
+        result = {}
+        with self._lock:
+            for name, stats in sorted(self._stats.items()):
+                if not stats.calls:
+                    continue
+                retained = list(stats.retained)
+                slope = _slope(retained) if len(retained) == GROWTH_WINDOW else 0.0
+                result[name] = {
+                    'calls': stats.calls,
+                    'peak_bytes_mean': round(stats.peak_total / stats.calls),
+                    'peak_bytes_max': stats.peak_max,
+                    'retained_bytes_mean': round(stats.retained_total / stats.settled) if stats.settled else None,
+                    'retained_bytes': stats.retained_total,
+                    'retained_growth_bytes_per_call': round(slope),
+                    'growing': slope > GROWTH_BYTES_PER_CALL,
+                    'top_lines': [{'line': line, 'retained_bytes': size}
+                                  for line, size in stats.lines.most_common(TOP_LINES) if size > 0],
+                }
+        return result
+
+
+def register_memory_tracking(server, tracker):
+    """Expose the memory tracker's per-callback report at /metrics/memory.json"""
+
+    @server.route('/metrics/memory.json')
+    def memory_summary():
+        current, peak = tracemalloc.get_traced_memory()
+        return jsonify({'traced_bytes': current, 'traced_peak_bytes': peak, 'callbacks': tracker.summary()})
@@ -0,0 +1,225 @@
+import bisect
+import threading
+import time
+from functools import wraps
+
+from flask import Response, jsonify, request
+
+from singleflight import normalize_key
+
+# Histogram bucket upper bounds (Prometheus "le" labels)
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Distinct input keys remembered per callback before cardinality stops growing
+MAX_TRACKED_KEYS = 100_000
+
+UPDATE_PATH = '/_dash-update-component'
+
+
+class Histogram:
+    """Fixed-bucket histogram in the shape Prometheus expects"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket that contains it"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Beyond the last bucket we only know the lower bound
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def prometheus_lines(self, name, labels):
+        cumulative = 0
+        for upper, bucket_count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += bucket_count
+            yield f'{name}_bucket{{{labels},le="{upper}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class _CallbackStats:
+    """Everything recorded for one callback"""
+
+    def __init__(self):
+        self.wall = Histogram(SECONDS_BUCKETS)
+        self.cpu = Histogram(SECONDS_BUCKETS)
+        self.output_bytes = Histogram(BYTES_BUCKETS)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lookups = {}  # lru cache name -> [hits, misses]
+        self.errors = 0
+        self.keys = set()
+
+
+class CallbackMetrics:
+    """Per-callback latency, CPU, payload size, cache and input-cardinality metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _get(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, _CallbackStats())
+        return stats
+
+    def instrument(self, name, func, hit_probe=None, caches=None):
+        """Wrap a callback to record its timings; hit_probe() reports whether the call was a cache hit
+
+        caches maps a name to each functools.lru_cache the callback reads; the
+        change in their cache_info() over a call is recorded as its lookups.
+        Caches are process-wide, so lookups by calls running at the same time
+        can be counted against each other.
+        """
+        stats = self._get(name)
+        caches = dict(caches or {})
+
+        @wraps(func)
+        def instrumented(*args, **kwargs):
+            before = [cache.cache_info() for cache in caches.values()]
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+                hit = hit_probe() if hit_probe is not None else False
+                key = hash(normalize_key(name, args, kwargs))
+                with self._lock:
+                    stats.wall.observe(wall)
+                    stats.cpu.observe(cpu)
+                    if hit:
+                        stats.cache_hits += 1
+                    else:
+                        stats.cache_misses += 1
+                    if len(stats.keys) < MAX_TRACKED_KEYS:
+                        stats.keys.add(key)
+                for (cache_name, cache), info in zip(caches.items(), before):
+                    after = cache.cache_info()
+                    self.record_cache(name, cache_name, after.hits - info.hits, after.misses - info.misses)
+
+        return instrumented
+
+    def record_cache(self, name, cache_name, hits, misses):
+        """Count lookups a callback made in one of its lru caches"""
+        if not hits and not misses:
+            return
+        stats = self._get(name)
+        with self._lock:
+            counts = stats.lookups.setdefault(cache_name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def record_output_bytes(self, name, size):
+        stats = self._get(name)
+        with self._lock:
+            stats.output_bytes.observe(size)
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        families = [
+            ('dash_callback_wall_seconds', 'histogram', "Wall-clock time per callback invocation", 'wall'),
+            ('dash_callback_cpu_seconds', 'histogram', "Thread CPU time per callback invocation", 'cpu'),
+            ('dash_callback_output_bytes', 'histogram', "Serialized callback response size", 'output_bytes'),
+        ]
+        lines = []
+        with self._lock:
+            stats_items = sorted(self._stats.items())
+            for metric, kind, help_text, attribute in families:
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+                for name, stats in stats_items:
+                    lines += getattr(stats, attribute).prometheus_lines(metric, f'callback="{name}"')
+            lines += ["# HELP dash_callback_cache_total Callback results shared from a coalesced call (hit) or computed (miss)",
+                      "# TYPE dash_callback_cache_total counter"]
+            for name, stats in stats_items:
+                lines.append(f'dash_callback_cache_total{{callback="{name}",result="hit"}} {stats.cache_hits}')
+                lines.append(f'dash_callback_cache_total{{callback="{name}",result="miss"}} {stats.cache_misses}')
+            lines += ["# HELP dash_callback_lru_cache_total Lookups in the lru caches a callback reads, by cache",
+                      "# TYPE dash_callback_lru_cache_total counter"]
+            for name, stats in stats_items:
+                for cache_name, (hits, misses) in sorted(stats.lookups.items()):
+                    labels = f'callback="{name}",cache="{cache_name}"'
+                    lines.append(f'dash_callback_lru_cache_total{{{labels},result="hit"}} {hits}')
+                    lines.append(f'dash_callback_lru_cache_total{{{labels},result="miss"}} {misses}')
+            lines += ["# HELP dash_callback_errors_total Callback invocations that raised",
+                      "# TYPE dash_callback_errors_total counter"]
+            lines += [f'dash_callback_errors_total{{callback="{name}"}} {stats.errors}' for name, stats in stats_items]
+            lines += ["# HELP dash_callback_input_keys Distinct normalized input combinations seen",
+                      "# TYPE dash_callback_input_keys gauge"]
+            lines += [f'dash_callback_input_keys{{callback="{name}"}} {len(stats.keys)}' for name, stats in stats_items]
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Compact per-callback summary (milliseconds and bytes)"""
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        result = {}
+        with self._lock:
+            for name, stats in sorted(self._stats.items()):
+                calls = stats.wall.count
+                lookups = stats.cache_hits + stats.cache_misses
+                lru_hits = sum(hits for hits, _ in stats.lookups.values())
+                lru_lookups = lru_hits + sum(misses for _, misses in stats.lookups.values())
+                result[name] = {
+                    'calls': calls,
+                    'errors': stats.errors,
+                    'wall_ms': {'mean': ms(stats.wall.sum / calls) if calls else None,
+                                'p50': ms(stats.wall.quantile(0.5)), 'p95': ms(stats.wall.quantile(0.95)),
+                                'p99': ms(stats.wall.quantile(0.99))},
+                    'cpu_ms_mean': ms(stats.cpu.sum / calls) if calls else None,
+                    'output_bytes_mean': (round(stats.output_bytes.sum / stats.output_bytes.count)
+                                          if stats.output_bytes.count else None),
+                    'cache_hit_ratio': round(stats.cache_hits / lookups, 4) if lookups else None,
+                    'lru_cache_hit_ratio': round(lru_hits / lru_lookups, 4) if lru_lookups else None,
+                    'input_keys': len(stats.keys),
+                }
+        return result
+
+
+def register_metrics(app, metrics):
+    """Expose /metrics (Prometheus) and /metrics.json, and record callback response sizes"""
+    server = app.server
+    names = {}
+
+    @server.after_request
+    def record_output_size(response):
+        if request.path.endswith(UPDATE_PATH) and response.status_code == 200:
+            output = (request.get_json(silent=True) or {}).get('output')
+            name = names.get(output)
+            if name is None and output in app.callback_map:
+                name = names[output] = app.callback_map[output]['callback'].__name__
+            if name is not None:
+                metrics.record_output_bytes(name, response.calculate_content_length() or 0)
+        return response
+
+    @server.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+    @server.route('/metrics.json')
+    def metrics_summary():
+        return jsonify(metrics.summary())
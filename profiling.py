@@ -0,0 +1,262 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import abort, jsonify, request
+
+# Libraries whose frames are summarized separately in every report
+HOTSPOT_LIBRARIES = ('pandas', 'plotly')
+
+PROFILE_MODES = ('cprofile', 'sampling')
+
+# Seconds between stack samples in sampling mode
+SAMPLE_INTERVAL = 0.001
+
+
+def _short_path(filename):
+    """Shorten a source path to 'package/module.py' for installed libraries"""
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.relpath(filename) if os.path.isabs(filename) else filename
+
+
+def _library_of(path):
+    """Return which hotspot library a (shortened) source path belongs to, if any"""
+    for library in HOTSPOT_LIBRARIES:
+        if path.startswith(library + os.sep) or f"{os.sep}{library}{os.sep}" in path:
+            return library
+    return None
+
+
+class _StackSampler:
+    """Samples one thread's Python stack from a background thread"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, _short_path(code.co_filename), frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        # The sampler needs the GIL to take a sample, so hand it over more often while profiling
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def folded(self):
+        """Collapsed stacks, one 'frame;frame;frame count' line each (flamegraph.pl, speedscope)"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ';'.join(f"{name} ({path}:{line})".replace(';', ',') for name, path, line in stack)
+            lines.append(f"{frames} {count}\n")
+        return ''.join(lines)
+
+
+def cprofile_summary(profile, limit=15):
+    """Text report of the top functions overall and the top pandas / Plotly hotspots"""
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats('cumulative').print_stats(limit)
+
+    rows = {library: [] for library in HOTSPOT_LIBRARIES}
+    for (filename, line, function), (_, calls, own_time, cum_time, _) in stats.stats.items():
+        path = _short_path(filename)
+        library = _library_of(path)
+        if library:
+            rows[library].append((own_time, cum_time, calls, f"{function} ({path}:{line})"))
+    for library, library_rows in rows.items():
+        out.write(f"\nTop {library} hotspots by own time:\n")
+        for own_time, cum_time, calls, where in sorted(library_rows, reverse=True)[:limit]:
+            out.write(f"  {own_time * 1000:9.2f} ms own  {cum_time * 1000:9.2f} ms cum  {calls:7d} calls  {where}\n")
+    return out.getvalue()
+
+
+def sampling_summary(sampler, limit=15):
+    """Text report of the frames most often on top of the stack, overall and per library"""
+    total = sum(sampler.stacks.values())
+    own = Counter()
+    # Time spent inside each library, attributed to the first frame that entered it
+    entered = {library: Counter() for library in HOTSPOT_LIBRARIES}
+    for stack, count in sampler.stacks.items():
+        name, path, line = stack[-1]
+        own[f"{name} ({path}:{line})"] += count
+        seen = set()
+        for name, path, line in stack:
+            library = _library_of(path)
+            if library and library not in seen:
+                seen.add(library)
+                entered[library][f"{name} ({path}:{line})"] += count
+
+    out = io.StringIO()
+    out.write(f"{total} samples every {sampler.interval * 1000:.1f} ms\n\nTop frames by own samples:\n")
+    for frame, count in own.most_common(limit):
+        out.write(f"  {count / max(total, 1):7.1%}  {frame}\n")
+    for library, frames in entered.items():
+        out.write(f"\nTop {library} entry points by inclusive samples:\n")
+        for frame, count in frames.most_common(limit):
+            out.write(f"  {count / max(total, 1):7.1%}  {frame}\n")
+    return out.getvalue()
+
+
+class CallbackProfiler:
+    """Profiles the next N invocations of a callback when an admin asks for it"""
+
+    def __init__(self, admin_token, directory='profiles', keep=50):
+        self.admin_token = admin_token
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._armed = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler when DASHBOARD_PROFILE_TOKEN is set; otherwise None (profiling off)"""
+        token = os.environ.get('DASHBOARD_PROFILE_TOKEN')
+        if not token:
+            return None
+        return cls(token, directory=os.environ.get('DASHBOARD_PROFILE_DIR', 'profiles'),
+                   keep=int(os.environ.get('DASHBOARD_PROFILE_KEEP', 50)))
+
+    def is_admin(self, token):
+        return bool(token) and hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def arm(self, name, count=1, mode='cprofile'):
+        """Profile the next count invocations of the named callback"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(PROFILE_MODES)}")
+        with self._lock:
+            self._armed[name] = [count, mode]
+
+    def armed(self):
+        with self._lock:
+            return {name: {'remaining': count, 'mode': mode} for name, (count, mode) in self._armed.items()}
+
+    def _claim(self, name):
+        """Claim one armed invocation of name; returns its mode, or None if not armed"""
+        with self._lock:
+            armed = self._armed.get(name)
+            if armed is None:
+                return None
+            armed[0] -= 1
+            if armed[0] <= 0:
+                del self._armed[name]
+            return armed[1]
+
+    def wrap(self, name, func):
+        """Wrap a callback; while nothing is armed this costs a single dict check"""
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            if not self._armed:
+                return func(*args, **kwargs)
+            mode = self._claim(name)
+            if mode is None:
+                return func(*args, **kwargs)
+            return self._run_profiled(name, mode, func, args, kwargs)
+
+        return profiled
+
+    def _run_profiled(self, name, mode, func, args, kwargs):
+        stem = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{name}")
+        start = time.perf_counter()
+        if mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                profile.dump_stats(f"{stem}.prof")
+                self._write_report(stem, name, mode, time.perf_counter() - start, cprofile_summary(profile))
+
+        sampler = _StackSampler(threading.get_ident())
+        try:
+            with sampler:
+                return func(*args, **kwargs)
+        finally:
+            with open(f"{stem}.folded", 'w') as folded:
+                folded.write(sampler.folded())
+            self._write_report(stem, name, mode, time.perf_counter() - start, sampling_summary(sampler))
+
+    def _write_report(self, stem, name, mode, elapsed, summary):
+        with open(f"{stem}.txt", 'w') as report:
+            report.write(f"callback: {name}\nmode: {mode}\nwall time: {elapsed * 1000:.1f} ms\n\n{summary}")
+        self._rotate()
+
+    def _rotate(self):
+        """Keep only the newest `keep` profiles (each profile is a report plus its data file)"""
+        reports = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith('.txt')),
+                         key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in reports[self.keep:]:
+            stem = entry.path[:-len('.txt')]
+            for extension in ('.txt', '.prof', '.folded'):
+                if os.path.exists(stem + extension):
+                    os.remove(stem + extension)
+
+    def reports(self):
+        """Newest-first list of profile reports on disk"""
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith('.txt')),
+                         key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return [entry.name[:-len('.txt')] for entry in entries]
+
+
+def register_profiling(server, profiler):
+    """Let admins arm the profiler with a header or query flag and browse the reports"""
+
+    def admin_token():
+        return request.headers.get('X-Admin-Token') or request.args.get('admin_token')
+
+    @server.before_request
+    def arm_from_request():
+        # e.g. X-Profile-Callback: update_comparative_tab, X-Profile-Count: 5, X-Profile-Mode: sampling
+        name = request.headers.get('X-Profile-Callback') or request.args.get('profile_callback')
+        if not name:
+            return None
+        if not profiler.is_admin(admin_token()):
+            abort(403)
+        try:
+            count = int(request.headers.get('X-Profile-Count') or request.args.get('profile_count') or 1)
+            profiler.arm(name, count, request.headers.get('X-Profile-Mode')
+                         or request.args.get('profile_mode') or 'cprofile')
+        except ValueError as exc:
+            return jsonify({'error': str(exc)}), 400
+        return None
+
+    @server.route('/admin/profiles')
+    def list_profiles():
+        if not profiler.is_admin(admin_token()):
+            abort(403)
+        return jsonify({'armed': profiler.armed(), 'directory': profiler.directory, 'reports': profiler.reports()})
+
+    @server.route('/admin/profiles/<stem>')
+    def show_profile(stem):
+        if not profiler.is_admin(admin_token()):
+            abort(403)
+        if stem not in profiler.reports():
+            abort(404)
+        with open(os.path.join(profiler.directory, f"{stem}.txt")) as report:
+            return report.read(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
@@ -0,0 +1,270 @@
+"""Compute the dashboard's KPIs, ratios and growth figures for a grid of scenarios
+
+A scenario is a (state, start year, end year, view, categories) selection, the
+same choice a user makes in the dashboard. Each result row holds:
+
+- income_growth_pct, min_wage_growth_pct and <category>_growth_pct: growth
+  over the range, like the KPI cards (empty with fewer than two observations)
+- <category>_income_ratio: income / expense in the latest year both cover,
+  like the income-to-housing KPI
+- <series>_end_value: the last value shown in the chart for the view
+
+Category columns are only filled for the categories in the scenario. The grid
+comes from a CSV/Parquet file with state, start and end columns (view and
+categories optional, categories joined with '+') or is built from flags:
+
+    python -m scripts.batch --out kpis.parquet --window 10
+    python -m scripts.batch --out kpis.csv --states CA TX --years 1990 2024 --every-subset
+    python -m scripts.batch --out kpis.parquet --grid scenarios.csv --workers 8
+
+Scenarios are sent to a process pool in chunks grouped by state, and each
+worker caches its per-range series statistics, so grids sharing ranges across
+views and category subsets cost little more than the distinct ranges they cover.
+"""
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+import compute
+from analysis import EXPENSE_CATEGORIES, series_arrays
+from data_store import DATA_DIR, discover_states, load_datasets
+
+VIEWS = ('actual', 'percent', 'adjusted')
+
+# Separator between category keys in the categories column
+CATEGORY_SEPARATOR = '+'
+
+# Scenarios sent to a worker at a time
+CHUNK_SIZE = 5000
+
+SCENARIO_COLUMNS = ['state', 'start', 'end', 'view', 'categories']
+RESULT_COLUMNS = SCENARIO_COLUMNS + [
+    'income_growth_pct', 'min_wage_growth_pct', 'income_end_value', 'min_wage_end_value',
+] + [f"{key}_{measure}" for key in EXPENSE_CATEGORIES for measure in ('growth_pct', 'income_ratio', 'end_value')]
+
+_state_dirs = {}
+
+
+def _init_worker(state_dirs):
+    _state_dirs.update(state_dirs)
+
+
+@lru_cache(maxsize=None)
+def _state_series(state):
+    return {key: series_arrays(df) for key, df in load_datasets(_state_dirs[state]).items()}
+
+
+@lru_cache(maxsize=None)
+def _series_range(state, key, start, end):
+    years, values = _state_series(state)[key]
+    mask = compute.year_mask(years, start, end)
+    return years[mask], values[mask]
+
+
+@lru_cache(maxsize=None)
+def _growth(state, key, start, end):
+    _, values = _series_range(state, key, start, end)
+    return compute.growth_percentage(values) if len(values) > 1 else math.nan
+
+
+@lru_cache(maxsize=None)
+def _end_value(state, key, start, end, view):
+    years, values = _series_range(state, key, start, end)
+    if not len(values):
+        return math.nan
+    return compute.apply_view(values, years, view)[-1]
+
+
+@lru_cache(maxsize=None)
+def _income_ratio(state, key, start, end):
+    ratio = compute.latest_income_expense_ratio(*_series_range(state, 'income', start, end),
+                                                *_series_range(state, key, start, end))
+    return math.nan if ratio is None else ratio
+
+
+def scenario_row(state, start, end, view, categories):
+    """Result values for one scenario, in RESULT_COLUMNS order"""
+    selected = set(categories.split(CATEGORY_SEPARATOR)) if categories else set()
+    row = [state, start, end, view, categories,
+           _growth(state, 'income', start, end), _growth(state, 'min_wage', start, end),
+           _end_value(state, 'income', start, end, view), _end_value(state, 'min_wage', start, end, view)]
+    for key in EXPENSE_CATEGORIES:
+        if key in selected:
+            row += [_growth(state, key, start, end), _income_ratio(state, key, start, end),
+                    _end_value(state, key, start, end, view)]
+        else:
+            row += [math.nan, math.nan, math.nan]
+    return row
+
+
+def _run_chunk(chunk):
+    return pd.DataFrame([scenario_row(*scenario) for scenario in chunk], columns=RESULT_COLUMNS)
+
+
+def year_pairs(first, last, window=None, step=1):
+    """(start, end) ranges: every pair from first to last, or windows of a fixed length"""
+    starts = range(first, last + 1, step)
+    if window is not None:
+        return [(start, start + window) for start in starts if start + window <= last]
+    return [(start, end) for start in starts for end in range(start, last + 1)]
+
+
+def category_subsets(every_subset=False):
+    """Category selections: all categories, or every subset (including none)"""
+    keys = list(EXPENSE_CATEGORIES)
+    if not every_subset:
+        return [CATEGORY_SEPARATOR.join(keys)]
+    return [CATEGORY_SEPARATOR.join(subset) for size in range(len(keys) + 1)
+            for subset in itertools.combinations(keys, size)]
+
+
+def data_span(state_dir):
+    """First and last year on the dashboard's year slider for a state's data"""
+    datasets = load_datasets(state_dir)
+    years = pd.concat([datasets[key]['observation_date'].dt.year for key in ('min_wage', 'income')])
+    return int(years.min()), int(years.max())
+
+
+def build_grid(states, years, views, subsets, window=None, step=1):
+    """Scenario grid for every combination of states, year ranges, views and category subsets"""
+    rows = [(state, start, end, view, subset)
+            for state in states
+            for start, end in year_pairs(*years[state], window, step)
+            for view in views
+            for subset in subsets]
+    return pd.DataFrame(rows, columns=SCENARIO_COLUMNS)
+
+
+def read_grid(path):
+    """Scenario grid from a CSV or Parquet file; a missing view means actual and missing categories all"""
+    grid = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path, dtype={'categories': str})
+    missing = {'state', 'start', 'end'} - set(grid.columns)
+    if missing:
+        raise ValueError(f"grid file is missing columns: {', '.join(sorted(missing))}")
+    grid['view'] = grid['view'].fillna('actual') if 'view' in grid else 'actual'
+    if 'categories' not in grid:
+        grid['categories'] = category_subsets()[0]
+    # An empty categories cell selects no categories
+    grid['categories'] = grid['categories'].fillna('')
+    grid['start'] = grid['start'].astype(int)
+    grid['end'] = grid['end'].astype(int)
+    return grid[SCENARIO_COLUMNS]
+
+
+def validate_grid(grid, state_dirs):
+    """Raise ValueError for scenarios naming unknown states, views or categories"""
+    unknown_states = set(grid['state']) - set(state_dirs)
+    if unknown_states:
+        raise ValueError(f"no datasets for states: {', '.join(sorted(unknown_states))}")
+    unknown_views = set(grid['view']) - set(VIEWS)
+    if unknown_views:
+        raise ValueError(f"unknown views: {', '.join(sorted(unknown_views))}")
+    keys = {key for subset in grid['categories'].unique() if subset for key in subset.split(CATEGORY_SEPARATOR)}
+    unknown_keys = keys - set(EXPENSE_CATEGORIES)
+    if unknown_keys:
+        raise ValueError(f"unknown categories: {', '.join(sorted(unknown_keys))}")
+
+
+def chunks(grid, size=CHUNK_SIZE):
+    """Scenario tuples in chunks that each hold a single state, so workers load few states"""
+    for _, group in grid.groupby('state', sort=False):
+        scenarios = list(group.itertuples(index=False, name=None))
+        for index in range(0, len(scenarios), size):
+            yield scenarios[index:index + size]
+
+
+class ResultWriter:
+    """Appends result chunks to a CSV or Parquet file as they arrive"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self.rows = 0
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run(grid, state_dirs, out, workers=None):
+    """Compute every scenario in the grid and write the results; returns the row count"""
+    writer = ResultWriter(out)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state_dirs,)) as pool:
+            for frame in pool.map(_run_chunk, chunks(grid)):
+                writer.write(frame)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', required=True, help="result file (.parquet or .csv)")
+    parser.add_argument('--grid', help="CSV or Parquet file of scenarios instead of the flags below")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--states', nargs='*', help="state codes (default: every state in the data directory)")
+    parser.add_argument('--years', nargs=2, type=int, metavar=('FIRST', 'LAST'),
+                        help="year span to build ranges in (default: each state's slider span)")
+    parser.add_argument('--window', type=int, help="only ranges of this many years, e.g. 10 for decades")
+    parser.add_argument('--step', type=int, default=1, help="years between range starts")
+    parser.add_argument('--views', nargs='*', choices=VIEWS, default=list(VIEWS))
+    parser.add_argument('--every-subset', action='store_true',
+                        help="one scenario per category subset instead of all categories together")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    if args.out.endswith('.parquet'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output requires the pyarrow package")
+    elif not args.out.endswith('.csv'):
+        parser.error("--out must end in .parquet or .csv")
+
+    state_dirs = discover_states(args.data_dir)
+    started = time.perf_counter()
+    try:
+        if args.grid:
+            grid = read_grid(args.grid)
+        else:
+            states = args.states or list(state_dirs)
+            unknown = set(states) - set(state_dirs)
+            if unknown:
+                parser.error(f"no datasets for states: {', '.join(sorted(unknown))}")
+            years = {state: tuple(args.years) if args.years else data_span(state_dirs[state]) for state in states}
+            grid = build_grid(states, years, args.views, category_subsets(args.every_subset), args.window, args.step)
+        validate_grid(grid, state_dirs)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    print(f"{len(grid)} scenarios across {grid['state'].nunique()} states", flush=True)
+    rows = run(grid, state_dirs, args.out, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"wrote {rows} rows to {args.out} in {elapsed:.1f}s ({rows / elapsed:,.0f} scenarios/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
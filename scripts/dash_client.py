@@ -0,0 +1,57 @@
+"""Helpers for driving the Dash callback endpoint without a browser"""
+from defaults import DEFAULT_INPUTS
+
+UPDATE_URL = '/_dash-update-component'
+
+
+def callback_name(app, output_key):
+    """Return the Python function name registered for a callback output key"""
+    return app.callback_map[output_key]['callback'].__name__
+
+
+def build_payload(app, output_key, values=None, changed=None):
+    """Build the JSON body the Dash renderer POSTs to fire one callback"""
+    values = {**DEFAULT_INPUTS, **(values or {})}
+    entry = app.callback_map[output_key]
+    outputs = [{'id': output.component_id, 'property': output.component_property}
+               for output in entry['output']]
+    inputs = [{'id': item['id'], 'property': item['property'],
+               'value': values.get(f"{item['id']}.{item['property']}")}
+              for item in entry['inputs']]
+    return {
+        'output': output_key,
+        'outputs': outputs if len(outputs) > 1 else outputs[0],
+        'inputs': inputs,
+        'changedPropIds': list(changed or []),
+        'state': [],
+    }
+
+
+def initial_payloads(app, values=None):
+    """Return (callback name, payload) pairs for every callback fired on page load"""
+    return [(callback_name(app, key), build_payload(app, key, values))
+            for key in app.callback_map]
+
+
+def output_ids(output_key):
+    """Split a callback output key ('..a.figure...b.data..' or 'a.figure') into (id, property) pairs"""
+    if output_key.startswith('..'):
+        parts = output_key[2:-2].split('...')
+    else:
+        parts = [output_key]
+    return [tuple(part.rsplit('.', 1)) for part in parts]
+
+
+def dependency_payload(dependency, values, changed=None):
+    """Build an update POST body from a /_dash-dependencies entry, for servers in another process"""
+    outputs = [{'id': component_id, 'property': prop} for component_id, prop in output_ids(dependency['output'])]
+    inputs = [{'id': item['id'], 'property': item['property'],
+               'value': values.get(f"{item['id']}.{item['property']}")}
+              for item in dependency['inputs']]
+    return {
+        'output': dependency['output'],
+        'outputs': outputs if dependency['output'].startswith('..') else outputs[0],
+        'inputs': inputs,
+        'changedPropIds': list(changed or []),
+        'state': [],
+    }
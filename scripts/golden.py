@@ -0,0 +1,297 @@
+"""Check that an optimized compute path produces the same outputs as the callbacks
+
+Runs a reference engine and a candidate engine over an exhaustive grid of
+inputs: every slider year pair, every expense subset (including none), every
+view, a spread of personal incomes, a few households and projection settings.
+It compares every output of every callback: figure trace data and titles,
+table rows and columns, and KPI strings and components. Numbers are compared
+with a tolerance, and each difference is reported with the inputs and path
+that produced it.
+
+An engine is a factory `module:function` that takes a DataStore and returns
+{callback name: callable}, like callbacks.build_callbacks. Callbacks the
+candidate does not provide are skipped.
+
+    python -m scripts.golden compare --candidate mymodule:build_engine --workers 8
+    python -m scripts.golden record --out /tmp/golden.jsonl.gz --year-step 3
+    python -m scripts.golden check --golden /tmp/golden.jsonl.gz
+
+record/check compare across commits: record on the old commit, check on the new.
+"""
+import argparse
+import base64
+import gzip
+import importlib
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis import EXPENSE_CATEGORIES
+from data_store import DATA_DIR, DEFAULT_STATE, DataStore
+
+VIEWS = ('actual', 'percent', 'adjusted')
+FORECASTS = ('none', 'linear', 'log-linear', 'holt')
+ROLLING_MEASURES = ('none', 'moving-average', 'cagr', 'volatility')
+ROLLING_WINDOWS = (5,)
+INCOMES = (0, 1, 25000, 60000, 95000, 150000, 1000000)
+HOUSEHOLD_ADULTS = (1, 2)
+HOUSEHOLD_CHILDREN = (0, 2)
+HOUSEHOLD_INCOMES = (None, 60000)
+PROJECTION_HORIZONS = (5, 20)
+PROJECTION_PATHS = (1000,)
+HEATMAP_SERIES = ('income', 'housing', 'income-to-housing')
+LIVING_WAGE_ADULTS = (1, 2)
+LIVING_WAGE_CHILDREN = (0, 3)
+
+# Cases sent to a worker at a time
+CHUNK_SIZE = 64
+
+# Differences printed before the rest are only counted
+MAX_REPORTED = 200
+
+_engines = {}
+
+
+def load_engine(spec, store):
+    """Build the engine named by 'module:function' for the store"""
+    module_name, _, function_name = spec.partition(':')
+    factory = getattr(importlib.import_module(module_name), function_name or 'build_callbacks')
+    return factory(store)
+
+
+def year_pairs(store, step=1):
+    """Every (start, end) pair on the year slider, thinned to every step-th year if asked"""
+    first = min(store['min_wage']['observation_date'].dt.year.min(), store['income']['observation_date'].dt.year.min())
+    last = max(store['min_wage']['observation_date'].dt.year.max(), store['income']['observation_date'].dt.year.max())
+    first, last = int(first), int(last)
+    years = sorted(set(range(first, last + 1, step)) | {first, last})
+    return [[start, end] for start, end in itertools.combinations_with_replacement(years, 2)]
+
+
+def input_grid(store, year_step=1):
+    """Values to sweep for every callback input"""
+    subsets = [list(subset) for size in range(len(EXPENSE_CATEGORIES) + 1)
+               for subset in itertools.combinations(EXPENSE_CATEGORIES, size)]
+    return {
+        'year-slider.value': year_pairs(store, year_step),
+        'expense-checklist.value': subsets,
+        'view-radio.value': list(VIEWS),
+        'forecast-radio.value': list(FORECASTS),
+        'rolling-measure.value': list(ROLLING_MEASURES),
+        'rolling-window.value': list(ROLLING_WINDOWS),
+        'personal-income-input.value': list(INCOMES),
+        'household-adults.value': list(HOUSEHOLD_ADULTS),
+        'household-children.value': list(HOUSEHOLD_CHILDREN),
+        'household-income-input.value': list(HOUSEHOLD_INCOMES),
+        'projection-horizon.value': list(PROJECTION_HORIZONS),
+        'projection-paths.value': list(PROJECTION_PATHS),
+        'heatmap-series.value': list(HEATMAP_SERIES),
+        'living-wage-adults.value': list(LIVING_WAGE_ADULTS),
+        'living-wage-children.value': list(LIVING_WAGE_CHILDREN),
+    }
+
+
+def cases(reference, grid, only=None):
+    """Yield (callback name, args) for every combination of each callback's inputs"""
+    for name, func in reference.items():
+        if only and name not in only:
+            continue
+        dimensions = [grid[f"{item.component_id}.{item.component_property}"] for item in func.inputs]
+        for args in itertools.product(*dimensions):
+            yield name, list(args)
+
+
+def case_key(name, args):
+    return f"{name}{json.dumps(args, separators=(',', ':'))}"
+
+
+def normalize(value):
+    """Plain JSON-compatible structure of a callback output, with typed arrays decoded"""
+    import plotly
+
+    return _decode(json.loads(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder)))
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if set(value) == {'dtype', 'bdata'} or set(value) == {'dtype', 'bdata', 'shape'}:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            return array.tolist()
+        # Templates are styling only and identical across engines; leave them out of the comparison
+        return {key: _decode(item) for key, item in value.items() if key != 'template'}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def run_case(engine, reference, name, args):
+    """Normalized outputs of one callback call, keyed by 'id.property', or the error it raised"""
+    try:
+        result = engine[name](*args)
+    except Exception as exc:
+        return {'error': type(exc).__name__}
+    outputs = reference[name].outputs
+    if len(outputs) == 1:
+        result = [result]
+    return {f"{output.component_id}.{output.component_property}": normalize(item)
+            for output, item in zip(outputs, result)}
+
+
+def differences(expected, actual, rel_tol, abs_tol, path=''):
+    """Yield 'path: expected != actual' for every mismatch between two normalized outputs"""
+    if _is_number(expected) and _is_number(actual):
+        if math.isnan(expected) and math.isnan(actual):
+            return
+        if not math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=abs_tol):
+            yield f"{path}: {expected!r} != {actual!r}"
+    elif isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                yield f"{path}.{key}: missing"
+            elif key not in expected:
+                yield f"{path}.{key}: unexpected"
+            else:
+                yield from differences(expected[key], actual[key], rel_tol, abs_tol, f"{path}.{key}")
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            yield f"{path}: length {len(expected)} != {len(actual)}"
+        else:
+            for index, (left, right) in enumerate(zip(expected, actual)):
+                yield from differences(left, right, rel_tol, abs_tol, f"{path}[{index}]")
+    elif expected != actual:
+        yield f"{path}: {_short(expected)} != {_short(actual)}"
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _short(value, limit=80):
+    text = json.dumps(value)
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _init_worker(data_dir, state, specs):
+    store = DataStore(data_dir, state)
+    for spec in specs:
+        _engines[spec] = load_engine(spec, store)
+
+
+def _compare_chunk(chunk, reference_spec, candidate_spec, rel_tol, abs_tol):
+    reference, candidate = _engines[reference_spec], _engines[candidate_spec]
+    found = []
+    compared = 0
+    for name, args in chunk:
+        if name not in candidate:
+            continue
+        compared += 1
+        expected = run_case(reference, reference, name, args)
+        actual = run_case(candidate, reference, name, args)
+        found += [(case_key(name, args), line) for line in differences(expected, actual, rel_tol, abs_tol)]
+    return compared, found
+
+
+def _record_chunk(chunk, reference_spec):
+    reference = _engines[reference_spec]
+    return [(case_key(name, args), run_case(reference, reference, name, args)) for name, args in chunk]
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _pool(args, specs):
+    return ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                               initargs=(args.data_dir, args.state, specs))
+
+
+def compare(args, all_cases):
+    total, found = 0, []
+    with _pool(args, [args.reference, args.candidate]) as pool:
+        results = pool.map(_compare_chunk, _chunks(all_cases), itertools.repeat(args.reference),
+                           itertools.repeat(args.candidate), itertools.repeat(args.rel_tol),
+                           itertools.repeat(args.abs_tol))
+        for count, chunk_found in results:
+            total += count
+            for key, line in chunk_found:
+                if len(found) < MAX_REPORTED:
+                    print(f"{key}{line}")
+                found.append(key)
+    return total, found
+
+
+def record(args, all_cases):
+    total = 0
+    with _pool(args, [args.reference]) as pool, gzip.open(args.out, 'wt') as output:
+        for chunk in pool.map(_record_chunk, _chunks(all_cases), itertools.repeat(args.reference)):
+            for key, outputs in chunk:
+                output.write(json.dumps({'case': key, 'outputs': outputs}) + '\n')
+                total += 1
+    print(f"recorded {total} cases to {args.out}")
+
+
+def check(args):
+    store = DataStore(args.data_dir, args.state)
+    candidate = load_engine(args.candidate, store)
+    reference = load_engine('callbacks:build_callbacks', store)
+    total, found = 0, []
+    with gzip.open(args.golden, 'rt') as golden:
+        for line in golden:
+            entry = json.loads(line)
+            name, _, raw_args = entry['case'].partition('[')
+            if name not in candidate or (args.only and name not in args.only):
+                continue
+            actual = run_case(candidate, reference, name, json.loads('[' + raw_args))
+            total += 1
+            for difference in differences(entry['outputs'], actual, args.rel_tol, args.abs_tol):
+                if len(found) < MAX_REPORTED:
+                    print(f"{entry['case']}{difference}")
+                found.append(entry['case'])
+    return total, found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('compare', 'record', 'check'))
+    parser.add_argument('--reference', default='callbacks:build_callbacks', help="reference engine factory")
+    parser.add_argument('--candidate', default='callbacks:build_callbacks', help="engine under test")
+    parser.add_argument('--golden', help="recorded outputs to check against (check mode)")
+    parser.add_argument('--out', help="file to record outputs to (record mode)")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--state', default=DEFAULT_STATE)
+    parser.add_argument('--year-step', type=int, default=1, help="only use every n-th slider year (default: all)")
+    parser.add_argument('--only', nargs='*', help="callback names to include")
+    parser.add_argument('--rel-tol', type=float, default=1e-9)
+    parser.add_argument('--abs-tol', type=float, default=1e-9)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    if args.mode == 'check':
+        if not args.golden:
+            parser.error("check needs --golden")
+        total, found = check(args)
+    else:
+        store = DataStore(args.data_dir, args.state)
+        all_cases = list(cases(load_engine(args.reference, store), input_grid(store, args.year_step), args.only))
+        print(f"{len(all_cases)} cases", flush=True)
+        if args.mode == 'record':
+            if not args.out:
+                parser.error("record needs --out")
+            record(args, all_cases)
+            return 0
+        total, found = compare(args, all_cases)
+
+    failed = len(set(found))
+    print(f"{total} cases compared, {failed} with differences ({len(found)} differing values)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
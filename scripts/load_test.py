@@ -0,0 +1,308 @@
+"""Load-test the dashboard by replaying interaction sessions against its HTTP endpoints
+
+Each simulated user loops over sessions: a page load (the index page, layout
+and dependency requests), then a random mix of slider drags, checklist
+toggles, view switches, newly typed incomes (the debounced input sends only
+the finished value) and household size changes. Every interaction fires the
+callbacks listening to the changed input as _dash-update-component POSTs,
+exactly like the browser renderer does.
+
+Without --url the app is served in this process on a free local port, so no
+external service is needed (client and server then share one interpreter, so
+run `python app.py` and pass --url to measure the server alone):
+
+    python -m scripts.load_test --users 8 --duration 30
+    python -m scripts.load_test --url http://127.0.0.1:8050 --users 16 --think 0.2
+
+The report gives throughput, p50/p95/p99 latency and error rate per callback
+and page-load request; --json saves it.
+"""
+import argparse
+import http.client
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from scripts.dash_client import UPDATE_URL, dependency_payload, output_ids
+
+# Relative weights of the interactions a session is made of
+INTERACTIONS = {'slider': 4, 'checklist': 2, 'view': 2, 'income': 1, 'household': 1, 'forecast': 1, 'rolling': 1}
+
+EXPENSES = ('energy', 'healthcare', 'housing', 'leisure')
+VIEWS = ('actual', 'percent', 'adjusted')
+FORECASTS = ('none', 'linear', 'log-linear', 'holt')
+ROLLING_MEASURES = ('none', 'moving-average', 'cagr', 'volatility')
+ROLLING_WINDOWS = (3, 5, 10)
+
+PAGE_LOAD = ('/', '/_dash-layout', '/_dash-dependencies')
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per request name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        def percentile(ordered, q):
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        rows = {}
+        with self._lock:
+            for name, samples in sorted(self.latencies.items()):
+                ordered = sorted(samples)
+                errors = self.errors.get(name, 0)
+                rows[name] = {
+                    'requests': len(samples),
+                    'throughput_rps': round(len(samples) / elapsed, 2),
+                    'errors': errors,
+                    'error_rate': round(errors / len(samples), 4),
+                    'mean_ms': round(statistics.fmean(samples) * 1000, 2),
+                    'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+                    'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+                    'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+                }
+        total = sum(row['requests'] for row in rows.values())
+        errors = sum(row['errors'] for row in rows.values())
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'endpoints': rows,
+        }
+
+
+class Client:
+    """One keep-alive HTTP connection to the dashboard"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.prefix = parts.path.rstrip('/')
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def request(self, method, path, body=None):
+        """Send one request; returns (status, body bytes), with status 0 on connection errors"""
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self.connection.request(method, self.prefix + path,
+                                    body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return 0, b''
+
+
+def find_component(layout, component_id):
+    """Props of the component with the given id in a /_dash-layout tree"""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            props = node.get('props', {})
+            if props.get('id') == component_id:
+                return props
+            stack.extend(value for value in props.values() if isinstance(value, (list, dict)))
+    return None
+
+
+class Session:
+    """One user's control values and the interactions that change them"""
+
+    def __init__(self, rng, slider_min, slider_max, defaults):
+        self.rng = rng
+        self.slider_min, self.slider_max = slider_min, slider_max
+        self.values = dict(defaults)
+
+    def slider(self):
+        """Drag one handle of the year range a few times (one update per mouse release)"""
+        for _ in range(self.rng.randint(1, 3)):
+            start, end = self.values['year-slider.value']
+            if self.rng.random() < 0.5:
+                start = self.rng.randint(self.slider_min, end)
+            else:
+                end = self.rng.randint(start, self.slider_max)
+            self.values['year-slider.value'] = [start, end]
+            yield 'year-slider.value'
+
+    def checklist(self):
+        selected = list(self.values['expense-checklist.value'])
+        expense = self.rng.choice(EXPENSES)
+        if expense in selected and len(selected) > 1:
+            selected.remove(expense)
+        elif expense not in selected:
+            selected.append(expense)
+        self.values['expense-checklist.value'] = selected
+        yield 'expense-checklist.value'
+
+    def view(self):
+        self.values['view-radio.value'] = self.rng.choice(
+            [view for view in VIEWS if view != self.values['view-radio.value']])
+        yield 'view-radio.value'
+
+    def forecast(self):
+        self.values['forecast-radio.value'] = self.rng.choice(
+            [model for model in FORECASTS if model != self.values['forecast-radio.value']])
+        yield 'forecast-radio.value'
+
+    def rolling(self):
+        """Pick another rolling overlay or window length"""
+        if self.rng.random() < 0.5:
+            self.values['rolling-measure.value'] = self.rng.choice(
+                [measure for measure in ROLLING_MEASURES if measure != self.values['rolling-measure.value']])
+            yield 'rolling-measure.value'
+        else:
+            self.values['rolling-window.value'] = self.rng.choice(
+                [window for window in ROLLING_WINDOWS if window != self.values['rolling-window.value']])
+            yield 'rolling-window.value'
+
+    def income(self):
+        """Type a new income; the input is debounced, so only the finished value is sent"""
+        self.values['personal-income-input.value'] = self.rng.randrange(15, 400) * 1000
+        yield 'personal-income-input.value'
+
+    def household(self):
+        """Change the simulated household's size"""
+        if self.rng.random() < 0.5:
+            self.values['household-adults.value'] = self.rng.randint(1, 4)
+            yield 'household-adults.value'
+        else:
+            self.values['household-children.value'] = self.rng.randint(0, 6)
+            yield 'household-children.value'
+
+    def interactions(self, count):
+        """Yield the changed prop id of every update in count random interactions"""
+        names, weights = zip(*INTERACTIONS.items())
+        for name in self.rng.choices(names, weights, k=count):
+            yield from getattr(self, name)()
+
+
+def run_user(base_url, recorder, stop, seed, think, interactions, dependencies, names, slider_range, defaults):
+    rng = random.Random(seed)
+    client = Client(base_url)
+
+    def timed(name, method, path, body=None):
+        start = time.perf_counter()
+        status, content = client.request(method, path, body)
+        ok = status == 200 or (status == 204 and method == 'POST')
+        recorder.record(name, time.perf_counter() - start, ok)
+        return content
+
+    while not stop.is_set():
+        for path in PAGE_LOAD:
+            timed(f"GET {path}", 'GET', path)
+        session = Session(rng, *slider_range, defaults)
+        for changed in session.interactions(interactions):
+            if stop.is_set():
+                break
+            for dependency in dependencies:
+                if any(f"{item['id']}.{item['property']}" == changed for item in dependency['inputs']):
+                    payload = dependency_payload(dependency, session.values, [changed])
+                    timed(names[dependency['output']], 'POST', UPDATE_URL, payload)
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+
+
+def serve_in_process():
+    """Serve the dashboard on a free local port in a background thread; returns its base URL"""
+    from werkzeug.serving import make_server
+
+    import app as dashboard
+
+    # Per-request access logs would swamp the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, dashboard.app.server, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", dashboard
+
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['elapsed_s']} s: {report['throughput_rps']} req/s, "
+          f"{report['errors']} errors ({report['error_rate']:.2%})\n")
+    print(f"{'request':<34} {'count':>7} {'req/s':>8} {'err %':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in report['endpoints'].items():
+        print(f"{name:<34} {row['requests']:>7} {row['throughput_rps']:>8} {row['error_rate']:>6.1%} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="base URL of a running dashboard (default: serve it in this process)")
+    parser.add_argument('--users', type=int, default=8, help="concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run")
+    parser.add_argument('--think', type=float, default=0.0, help="mean think time between interactions (s)")
+    parser.add_argument('--interactions', type=int, default=20, help="interactions per session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        base_url, dashboard = args.url.rstrip('/'), None
+    else:
+        base_url, dashboard = serve_in_process()
+
+    # Discover the callbacks and the slider's range the same way the browser does
+    client = Client(base_url)
+    status, body = client.request('GET', '/_dash-dependencies')
+    if status != 200:
+        parser.error(f"could not fetch {base_url}/_dash-dependencies (status {status})")
+    dependencies = json.loads(body)
+    layout = json.loads(client.request('GET', '/_dash-layout')[1])
+    slider = find_component(layout, 'year-slider')
+    defaults = {f"{component_id}.value": find_component(layout, component_id).get('value')
+                for component_id in ('year-slider', 'expense-checklist', 'view-radio', 'forecast-radio',
+                                     'rolling-measure', 'rolling-window', 'personal-income-input', 'household-adults',
+                                     'household-children', 'household-income-input', 'projection-horizon',
+                                     'projection-paths', 'heatmap-series', 'living-wage-adults',
+                                     'living-wage-children')}
+
+    # Label callbacks by function name when the app is local, by their first output otherwise
+    names = {}
+    for dependency in dependencies:
+        key = dependency['output']
+        if dashboard is not None and key in dashboard.app.callback_map:
+            names[key] = dashboard.app.callback_map[key]['callback'].__name__
+        else:
+            names[key] = '.'.join(output_ids(key)[0])
+
+    recorder = Recorder()
+    stop = threading.Event()
+    users = [threading.Thread(target=run_user, daemon=True,
+                              args=(base_url, recorder, stop, args.seed * 1000 + index, args.think,
+                                    args.interactions, dependencies, names,
+                                    (slider['min'], slider['max']), defaults))
+             for index in range(args.users)]
+    started = time.perf_counter()
+    for user in users:
+        user.start()
+    time.sleep(args.duration)
+    stop.set()
+    for user in users:
+        user.join()
+
+    report = recorder.report(time.perf_counter() - started)
+    report.update({'url': base_url if args.url else 'in-process', 'users': args.users, 'think_s': args.think})
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
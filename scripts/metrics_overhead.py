@@ -0,0 +1,106 @@
+"""Benchmark the cost of callback instrumentation
+
+Runs every callback on the default inputs with and without CallbackMetrics
+(single-flight disabled on both so only instrumentation differs), rotating
+the order every round to cancel out drift, and reports the relative overhead. A second
+uninstrumented set gives the measurement noise. Exits non-zero when the
+measured overhead exceeds the budget by more than that noise, or when the
+wrapper's own per-call cost is over the budget.
+
+Run from the repository root:
+
+    python -m scripts.metrics_overhead --rounds 30
+"""
+import argparse
+import statistics
+import time
+from functools import lru_cache
+
+import dash
+
+from callbacks import register_callbacks
+from data_store import DataStore
+from defaults import DEFAULT_INPUTS
+from metrics import CallbackMetrics
+
+# Instrumentation must stay below this share of callback time
+OVERHEAD_BUDGET = 0.01
+
+
+def callback_args(func):
+    return [DEFAULT_INPUTS[f"{item.component_id}.{item.component_property}"] for item in func.inputs]
+
+
+def time_call(func):
+    """Seconds one call of a callback on the default inputs takes"""
+    args = callback_args(func)
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def median_round(times):
+    """Sum over callbacks of each one's median call time"""
+    return sum(statistics.median(samples) for samples in times.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=30)
+    args = parser.parse_args()
+    store = DataStore()
+
+    # A second uninstrumented set measures how far two identical sets differ by chance
+    variants = {
+        'plain': register_callbacks(dash.Dash(__name__), store, coalesce=False),
+        'control': register_callbacks(dash.Dash(__name__), store, coalesce=False),
+        'instrumented': register_callbacks(dash.Dash(__name__), store, coalesce=False, metrics=CallbackMetrics()),
+    }
+    names = list(variants['plain'])
+    for callbacks in variants.values():  # warm up
+        for name in names:
+            time_call(callbacks[name])
+
+    # Variant -> callback name -> seconds per round
+    times = {variant: {name: [] for name in names} for variant in variants}
+    order = list(variants)
+    for round_index in range(args.rounds):
+        for name in names:
+            # Rotate which variant goes first so none profits from another warming caches
+            for variant in order[round_index % 3:] + order[:round_index % 3]:
+                times[variant][name].append(time_call(variants[variant][name]))
+
+    # Per-callback medians are robust to the occasional GC pause or scheduler hiccup
+    plain_median = median_round(times['plain'])
+    instrumented_median = median_round(times['instrumented'])
+    overhead = instrumented_median / plain_median - 1
+    noise = abs(median_round(times['control']) / plain_median - 1)
+    plain = variants['plain']
+
+    # Direct measurement of the wrapper itself (with an lru cache to count), independent of callback noise
+    metrics = CallbackMetrics()
+
+    @lru_cache(maxsize=1)
+    def table(key):
+        return key
+
+    noop = metrics.instrument('noop', lambda *values: table(0), caches={'table': table})
+    calls = 100_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        noop([1990, 2020], ['energy', 'housing'], 'actual')
+    per_call = (time.perf_counter() - start) / calls
+    wrapper_share = per_call * len(plain) / plain_median
+
+    print(f"round without metrics: {plain_median * 1000:.2f} ms")
+    print(f"round with metrics:    {instrumented_median * 1000:.2f} ms")
+    print(f"measured overhead:     {overhead:+.2%} (budget {OVERHEAD_BUDGET:.0%}, noise {noise:.2%})")
+    print(f"wrapper cost per call: {per_call * 1e6:.1f} us ({wrapper_share:.3%} of a round)")
+    if overhead - noise > OVERHEAD_BUDGET:
+        raise SystemExit("measured instrumentation overhead exceeds budget")
+    if wrapper_share > OVERHEAD_BUDGET:
+        raise SystemExit("instrumentation wrapper cost exceeds budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Demonstrate request coalescing under a burst of identical page loads
+
+Fires the initial callbacks of N simulated visitors at the same moment, once
+against the dashboard app (single-flight on) and once against an identical
+app with coalescing disabled, and reports CPU seconds spent per burst.
+
+Run from the repository root:
+
+    python -m scripts.singleflight_burst --visitors 32 --bursts 5
+"""
+import argparse
+import threading
+import time
+
+import dash
+
+import app as dashboard
+from callbacks import register_callbacks
+from scripts.dash_client import UPDATE_URL, initial_payloads
+
+
+def build_uncoalesced_app():
+    """Create a copy of the dashboard app with single-flight disabled"""
+    plain = dash.Dash(__name__)
+    plain.layout = dashboard.app.layout
+    register_callbacks(plain, dashboard.store, coalesce=False)
+    return plain
+
+
+def run_burst(dash_app, visitors):
+    """Send the initial callbacks of every visitor concurrently; return (cpu s, wall s, errors)"""
+    payloads = initial_payloads(dash_app)
+    barrier = threading.Barrier(visitors + 1)
+    errors = []
+
+    def visitor():
+        client = dash_app.server.test_client()
+        barrier.wait()
+        for _, payload in payloads:
+            response = client.post(UPDATE_URL, json=payload)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=visitor) for _ in range(visitors)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--visitors', type=int, default=32, help="simultaneous page loads per burst")
+    parser.add_argument('--bursts', type=int, default=5, help="bursts to average over")
+    args = parser.parse_args()
+
+    apps = {'single-flight off': build_uncoalesced_app(), 'single-flight on': dashboard.app}
+    results = {}
+    for label, dash_app in apps.items():
+        run_burst(dash_app, 1)  # warm up imports and Plotly validators
+        samples = [run_burst(dash_app, args.visitors) for _ in range(args.bursts)]
+        cpu = sum(sample[0] for sample in samples) / len(samples)
+        wall = sum(sample[1] for sample in samples) / len(samples)
+        errors = sum(sample[2] for sample in samples)
+        results[label] = cpu
+        print(f"{label:>18}: {cpu:.3f} CPU s/burst, {wall:.3f} wall s/burst, {errors} errors")
+
+    off, on = results['single-flight off'], results['single-flight on']
+    if on > 0:
+        print(f"CPU per burst reduced {off / on:.1f}x for {args.visitors} simultaneous visitors")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Report where dashboard worker startup time goes
+
+Imports app in a fresh interpreter with -X importtime and reports the import
+time per top-level package (and the slowest individual modules), the app's own
+startup phases (data load, callback and route registration) and the layout
+prerender the first request starts in the background, i.e. how long until a
+worker can serve its first page.
+
+Run from the repository root:
+
+    python -m scripts.startup_profile --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Runs in the child interpreter; prints one JSON line of wall-clock timings
+DRIVER = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.start_layout_warmup().join()
+ready = time.perf_counter()
+print(json.dumps({'import': imported - started, 'ready': ready - started, **app.startup_timings}))
+"""
+
+
+def profile_once():
+    """Import the app in a child interpreter; returns (timings, {module: (self us, cumulative us, depth)})"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', DRIVER],
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, modules
+
+
+def by_package(modules):
+    """Total self import time per top-level package, in seconds"""
+    totals = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        totals[name.split('.')[0]] += self_us
+    return {package: total / 1e6 for package, total in totals.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help="fresh interpreters to average over")
+    parser.add_argument('--top', type=int, default=15, help="packages and modules to list")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    runs = [profile_once() for _ in range(args.runs)]
+    phases = {key: statistics.median(timings[key] for timings, _ in runs) for key in runs[0][0]}
+    packages = defaultdict(list)
+    for _, modules in runs:
+        for package, seconds in by_package(modules).items():
+            packages[package].append(seconds)
+    packages = {package: statistics.median(values) for package, values in packages.items()}
+    # The slowest single modules, from the last run (first-level imports only, to avoid double counting)
+    modules = runs[-1][1]
+    slowest = sorted(((cumulative / 1e6, name) for name, (_, cumulative, depth) in modules.items() if depth <= 1),
+                     reverse=True)[:args.top]
+
+    print(f"median of {args.runs} runs\n")
+    print(f"import app                 {phases['import'] * 1000:8.1f} ms")
+    for phase in ('data_load', 'callback_registration', 'route_registration', 'layout_prerender'):
+        if phase in phases:
+            print(f"  {phase:<24} {phases[phase] * 1000:8.1f} ms")
+    print(f"ready for first page       {phases['ready'] * 1000:8.1f} ms  (import + background prerender)\n")
+    print("import time by package (self time):")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {package}")
+    print("\nslowest top-level imports (cumulative):")
+    for seconds, name in slowest:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'phases_s': phases, 'packages_s': packages,
+                       'slowest_imports_s': {name: seconds for seconds, name in slowest}}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Generate synthetic FRED-shaped datasets for scale testing
+
+Writes the same six CSV files as data/ (observation_date plus one series-id
+column each), plus extra expense series when more than the real four expense
+categories are asked for, for N states, in the multi-state layout the DataStore reads: the
+default state's files in the output directory itself and every other state in
+a two-letter subdirectory. Series follow realistic trends (stepwise minimum
+wage increases, compounding PCE growth with an energy price cycle, income with
+recession dips), keep the real files' coverage mismatches (minimum wage starts
+first, then income, then PCE) and drop a few observations to leave gaps.
+
+Run from the repository root, then point anything at the output directory:
+
+    python -m scripts.synth_fred --out /tmp/synth --states 50 --years 57 --frequency monthly
+    python -m scripts.synth_fred --out /tmp/wide --states 5 --categories 40
+    DASHBOARD_DATA_DIR=/tmp/synth python app.py
+    python -m pytest benchmarks/bench_callbacks.py --data-dir /tmp/synth --sizes 1
+"""
+import argparse
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from analysis import EXPENSE_CATEGORIES
+from data_store import DATASET_FILES, DEFAULT_STATE, EXTRA_EXPENSE_PREFIX
+
+STATE_CODES = (
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS',
+    'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC',
+    'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+)
+
+# Frequency name -> (pandas date_range frequency, observations per year); dates mark period starts
+FREQUENCIES = {'annual': ('YS', 1), 'quarterly': ('QS', 4), 'monthly': ('MS', 12)}
+
+# Dataset key -> (FRED series id pattern, first year of the real series, 1997 level, yearly growth, volatility)
+SERIES = {
+    'min_wage': ('STTMINWG{state}', 1968, 5.15, 0.035, 0.0),
+    'income': ('MEHOINUS{state}A646N', 1984, 39000, 0.035, 0.02),
+    'energy': ('{state}PCEPCGAS', 1997, 450, 0.04, 0.12),
+    'healthcare': ('{state}PCEPCHLTHCARE', 1997, 2900, 0.05, 0.01),
+    'housing': ('{state}PCEPCHOUSUTL', 1997, 4200, 0.045, 0.015),
+    'leisure': ('{state}PCEPCRECGD', 1997, 770, 0.03, 0.03),
+}
+
+# Span of the real files (first minimum wage observation to the last of every series)
+REAL_FIRST_YEAR, REAL_LAST_YEAR = 1968, 2024
+
+RECESSION_YEARS = (1980, 1981, 1990, 1991, 2001, 2008, 2009, 2020)
+
+
+def state_codes(count):
+    """The first count state codes, the default state first; made-up codes beyond the 51 real ones"""
+    codes = [DEFAULT_STATE] + [code for code in STATE_CODES if code != DEFAULT_STATE]
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    codes += [a + b for a in letters for b in letters if a + b not in codes]
+    if count > len(codes):
+        raise ValueError(f"at most {len(codes)} two-letter state codes are available")
+    return codes[:count]
+
+
+def extra_series(count, seed=0):
+    """SERIES-style specs for count extra expense categories (extra_01, extra_02, ...), PCE-like
+
+    Each category's level, growth and volatility depend only on its number and
+    the seed, so a wider run keeps the categories of a narrower one.
+    """
+    specs = {}
+    for number in range(1, count + 1):
+        rng = np.random.default_rng([seed, number])
+        specs[f"{EXTRA_EXPENSE_PREFIX}{number:02d}"] = (
+            f"{{state}}PCEPCEXTRA{number:02d}", 1997, round(rng.lognormal(np.log(1000), 0.8)),
+            rng.uniform(0.02, 0.06), rng.uniform(0.005, 0.05))
+    return specs
+
+
+def coverage_start(real_start, first_year, last_year):
+    """First year of a series, keeping the real files' relative coverage over any span"""
+    share = (real_start - REAL_FIRST_YEAR) / (REAL_LAST_YEAR - REAL_FIRST_YEAR)
+    return first_year + round(share * (last_year - first_year))
+
+
+def _trend(key, spec, years, periods, rng):
+    """National-level series values at the given fractional years"""
+    _, _, level, growth, volatility = spec
+    elapsed = years - 1997
+    if key == 'min_wage':
+        # Minimum wages move in steps: a raise every one to four years, flat in between
+        first = np.floor(years[0])
+        raise_years = np.concatenate([[first], first + np.cumsum(rng.integers(1, 5, size=len(years)))])
+        stepped = raise_years[np.searchsorted(raise_years, years, side='right') - 1]
+        return level * np.power(1 + growth, stepped - 1997)
+
+    values = level * np.power(1 + growth, elapsed)
+    if key == 'energy':
+        # Fuel prices swing on a multi-year cycle on top of their trend
+        values *= 1 + 0.2 * np.sin(2 * np.pi * elapsed / 7 + rng.uniform(0, 2 * np.pi))
+    if key == 'income':
+        values *= np.where(np.isin(np.floor(years), RECESSION_YEARS), 0.97, 1.0)
+    # Noise is per observation, so spread a year's volatility over its periods
+    noise = rng.normal(0, volatility / np.sqrt(periods), size=len(years))
+    return values * np.exp(noise)
+
+
+def generate_state(state, first_year, last_year, frequency='annual', gap_rate=0.02, seed=0, extra=0):
+    """Build one state's datasets, keyed like DATASET_FILES plus extra expense series, as FRED-shaped DataFrames"""
+    rng = np.random.default_rng([seed, zlib.crc32(state.encode())])
+    # Richer and poorer states: one cost level per state, incomes partly tracking it
+    cost_level = rng.lognormal(0, 0.15)
+    income_level = cost_level ** 0.7 * rng.lognormal(0, 0.08)
+
+    pandas_frequency, periods = FREQUENCIES[frequency]
+
+    datasets = {}
+    for key, spec in {**SERIES, **extra_series(extra, seed)}.items():
+        start = coverage_start(spec[1], first_year, last_year)
+        dates = pd.date_range(f"{start}-01-01", f"{last_year}-12-31", freq=pandas_frequency)
+        years = (dates.year + (dates.dayofyear - 1) / 365.25).to_numpy()
+        values = _trend(key, spec, years, periods, rng)
+        values = values * (income_level if key in ('income', 'min_wage') else cost_level)
+        if key == 'min_wage':
+            values = np.round(values, 2)
+        else:
+            values = np.round(values).astype(int)
+
+        # Missing observations, never the first or last so the coverage bounds stay put
+        keep = rng.random(len(dates)) >= gap_rate
+        keep[0] = keep[-1] = True
+        datasets[key] = pd.DataFrame({'observation_date': dates[keep],
+                                      spec[0].format(state=state): values[keep]})
+    return datasets
+
+
+def write_state(datasets, directory):
+    os.makedirs(directory, exist_ok=True)
+    for key, df in datasets.items():
+        # Extra expense series are written under their key, where the DataStore looks for them
+        file_name = DATASET_FILES.get(key, f"{key}.csv")
+        df.to_csv(os.path.join(directory, file_name), index=False, date_format='%Y-%m-%d')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', required=True, help="output directory (the DataStore data directory)")
+    parser.add_argument('--states', type=int, default=5, help="number of states (default: 5)")
+    parser.add_argument('--years', type=int, default=REAL_LAST_YEAR - REAL_FIRST_YEAR + 1,
+                        help="years covered by the longest series (default: 57, as in data/)")
+    parser.add_argument('--last-year', type=int, default=REAL_LAST_YEAR)
+    parser.add_argument('--frequency', choices=FREQUENCIES, default='annual')
+    parser.add_argument('--categories', type=int, default=len(EXPENSE_CATEGORIES),
+                        help=f"expense categories per state; those beyond the real {len(EXPENSE_CATEGORIES)} "
+                             f"are extra series (default: {len(EXPENSE_CATEGORIES)})")
+    parser.add_argument('--gap-rate', type=float, default=0.02, help="share of observations dropped")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.categories < len(EXPENSE_CATEGORIES):
+        parser.error(f"--categories must be at least {len(EXPENSE_CATEGORIES)}, the real categories")
+    extra = args.categories - len(EXPENSE_CATEGORIES)
+
+    first_year = args.last_year - args.years + 1
+
+    rows = 0
+    for index, state in enumerate(state_codes(args.states)):
+        datasets = generate_state(state, first_year, args.last_year, args.frequency, args.gap_rate, args.seed,
+                                  extra)
+        write_state(datasets, args.out if index == 0 else os.path.join(args.out, state))
+        rows += sum(len(df) for df in datasets.values())
+    print(f"wrote {args.states} states x {len(DATASET_FILES) + extra} series, {first_year}-{args.last_year} "
+          f"{args.frequency}: {rows:,} rows to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
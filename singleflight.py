@@ -0,0 +1,100 @@
+import threading
+from functools import wraps
+
+
+def normalize_key(name, args, kwargs=None, version=None, trigger=None):
+    """Build a hashable key from a callback name, its input values, the dataset version and the trigger"""
+    parts = [name, version, trigger]
+    for value in list(args) + sorted((kwargs or {}).items()):
+        parts.append(_normalize_value(value))
+    return tuple(parts)
+
+
+def _normalize_value(value):
+    """Turn Dash input values into hashable, order-normalized equivalents"""
+    if isinstance(value, (list, tuple)):
+        items = tuple(_normalize_value(item) for item in value)
+        # Checklist selections are order-insensitive, slider ranges are not
+        if items and all(isinstance(item, str) for item in items):
+            return tuple(sorted(items))
+        return items
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize_value(item)) for key, item in value.items()))
+    return value
+
+
+class _Call:
+    """An in-progress computation that concurrent requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with identical inputs into one computation
+
+    version() returns the dataset version a call would read. It is part of the
+    key, so a call still running when the data reloads is not shared with the
+    callers that arrive after the reload. trigger() returns the inputs that
+    fired a call; it is part of the key too, since a callback that patches
+    only what changed returns different results for the same inputs.
+    """
+
+    def __init__(self, enabled=True, version=None, trigger=None):
+        self.enabled = enabled
+        self.version = version
+        self.trigger = trigger
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._local = threading.local()
+        self.stats = {'computed': 0, 'shared': 0}
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func once per key; callers arriving while it runs share its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['computed'] += 1
+            else:
+                self.stats['shared'] += 1
+        self._local.shared = not leader
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # Forget the call before waking waiters so later requests recompute
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def last_call_shared(self):
+        """Whether this thread's most recent call reused another request's result"""
+        return getattr(self._local, 'shared', False)
+
+    def wrap(self, func):
+        """Decorate func so identical concurrent invocations are coalesced"""
+        @wraps(func)
+        def coalesced(*args, **kwargs):
+            if not self.enabled:
+                self._local.shared = False
+                return func(*args, **kwargs)
+            version = self.version() if self.version is not None else None
+            trigger = self.trigger() if self.trigger is not None else None
+            return self.do(normalize_key(func.__name__, args, kwargs, version, trigger), func, *args, **kwargs)
+
+        return coalesced
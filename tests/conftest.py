@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'data')
+
+# The modules live at the repository root and read their data directory at import time
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DASHBOARD_DATA_DIR', DATA_DIR)
+
+from data_store import DataStore  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def store():
+    return DataStore(DATA_DIR)
+
+
+
+@pytest.fixture(scope='session')
+def slider_years(store):
+    """(first, last) year of the dashboard's year slider"""
+    years = [store[key]['observation_date'].dt.year for key in ('min_wage', 'income')]
+    return int(min(year.min() for year in years)), int(max(year.max() for year in years))
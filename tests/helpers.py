@@ -0,0 +1,7 @@
+import numpy as np
+
+
+def geometric(start_year, years, first, rate):
+    """(years, values) of a series growing by rate a year"""
+    span = np.arange(start_year, start_year + years)
+    return span, first * (1 + rate) ** np.arange(years)
@@ -0,0 +1,125 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import api
+from analysis import filter_by_year_range
+from api import API_PREFIX, register_api
+
+
+@pytest.fixture(scope='module')
+def client(store):
+    server = Flask(__name__)
+    register_api(server, store)
+    return server.test_client()
+
+
+@pytest.mark.parametrize('endpoint', ['series', 'kpis', 'ratios'])
+def test_endpoints_answer_and_revalidate(client, endpoint):
+    response = client.get(f"{API_PREFIX}/{endpoint}?start=1990&end=2020", headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['params']['start'] == 1990 and payload['params']['end'] == 2020
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    repeat = client.get(f"{API_PREFIX}/{endpoint}?start=1990&end=2020",
+                        headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.headers['ETag'] == etag
+    assert not repeat.data
+
+
+def test_series_payload(client, store):
+    payload = client.get(f"{API_PREFIX}/series?start=2000&end=2010&categories=housing").get_json()
+    assert [series['key'] for series in payload['series']] == ['income', 'min_wage', 'housing']
+    housing = payload['series'][-1]
+    assert len(housing['values']) == len(filter_by_year_range(store['housing'], 2000, 2010))
+    assert all('2000' <= date[:4] <= '2010' for date in housing['dates'])
+
+
+def test_compressed_bodies_carry_the_encoding_in_their_etag(client):
+    url = f"{API_PREFIX}/series"
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'].endswith('-gzip"')
+    assert json.loads(gzip.decompress(compressed.data))['series']
+    identity = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.headers['ETag'] != compressed.headers['ETag']
+    # Either validator is current for a client accepting gzip
+    for etag in (compressed.headers['ETag'], identity.headers['ETag']):
+        repeat = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert repeat.status_code == 304 and repeat.headers['ETag'] == etag
+
+
+def test_small_bodies_are_not_tagged_as_compressed(client):
+    gzip_response = client.get(f"{API_PREFIX}/kpis", headers={'Accept-Encoding': 'gzip'})
+    identity_response = client.get(f"{API_PREFIX}/kpis", headers={'Accept-Encoding': 'identity'})
+    assert len(identity_response.data) < api.MIN_COMPRESS_BYTES
+    assert 'Content-Encoding' not in gzip_response.headers
+    assert gzip_response.data == identity_response.data
+    assert gzip_response.headers['ETag'] == identity_response.headers['ETag']
+
+
+def test_stale_etags_get_a_full_response(client):
+    response = client.get(f"{API_PREFIX}/kpis", headers={'If-None-Match': '"not-the-current-etag"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('query', [
+    'start=abc',
+    'start=2020&end=1990',
+    'categories=housing,rent',
+    'view=monthly',
+    'base_year=soon',
+    'base_year=100000',
+    'base_year=-5000',
+])
+def test_bad_parameters_are_rejected(client, query):
+    response = client.get(f"{API_PREFIX}/kpis?{query}")
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_adjusted_view_accepts_base_years_in_the_data(client):
+    response = client.get(f"{API_PREFIX}/series?view=adjusted&base_year=1990&start=1990&end=2000")
+    assert response.status_code == 200
+    values = [value for series in response.get_json()['series'] for value in series['values']]
+    assert all(value is None or abs(value) < 1e9 for value in values)
+
+
+def test_affordability_scores(client):
+    response = client.post(f"{API_PREFIX}/affordability?start=1990&end=2020",
+                           json={'incomes': [20000, 75000, 200000]})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-store'
+    payload = response.get_json()
+    assert payload['count'] == 3
+    assert payload['scores']['tier'][0] == 'significantly below'
+    assert payload['baseline']['year'] <= 2020
+    assert set(payload['baseline']['expenses']) == {'energy', 'healthcare', 'housing', 'leisure'}
+
+    csv = client.post(f"{API_PREFIX}/affordability?start=1990&end=2020", data="income\n20000\n75000\n200000\n",
+                      content_type='text/csv')
+    assert csv.get_json()['scores'] == payload['scores']
+
+
+@pytest.mark.parametrize('body', [b'{"incomes": []}', b'{"incomes": ["a"]}', b'not json', b'[1, NaN]'])
+def test_affordability_rejects_bad_incomes(client, body):
+    response = client.post(f"{API_PREFIX}/affordability", data=body, content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_affordability_without_income_data_in_range(client):
+    response = client.post(f"{API_PREFIX}/affordability?start=1970&end=1980", json=[50000])
+    assert response.status_code == 400
+
+
+def test_affordability_limits_the_batch_size(client, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_SCORED_INCOMES', 5)
+    response = client.post(f"{API_PREFIX}/affordability", json=list(range(1, 7)))
+    assert response.status_code == 413
+    assert client.post(f"{API_PREFIX}/affordability", json=list(range(1, 6))).status_code == 200
@@ -0,0 +1,55 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import compute
+from analysis import EXPENSE_CATEGORIES, affordability_attribution
+from helpers import geometric
+
+
+def test_log_mean():
+    assert compute.log_mean(3.0, 3.0) == pytest.approx(3.0)
+    assert compute.log_mean(1.0, np.e) == pytest.approx((np.e - 1) / 1)
+    a, b = np.array([1.0, 2.0, 10.0]), np.array([4.0, 2.0, 1.0])
+    np.testing.assert_allclose(compute.log_mean(a, b), compute.log_mean(b, a))
+    assert ((np.minimum(a, b) <= compute.log_mean(a, b)) & (compute.log_mean(a, b) <= np.maximum(a, b))).all()
+
+
+def test_attribution_contributions_sum_to_the_change():
+    income = geometric(2000, 12, 50000, 0.03)
+    expenses = {'housing': geometric(2000, 12, 12000, 0.06), 'energy': geometric(2002, 8, 2000, -0.01)}
+    attribution = compute.AffordabilityAttribution(income, expenses)
+    np.testing.assert_array_equal(attribution.years, np.arange(2002, 2010))
+    for categories in (['housing'], ['energy'], ['housing', 'energy']):
+        cube = attribution.cube(categories)
+        # Log contributions add up to the log change of the ratio, in both directions
+        total = attribution.expenses[[attribution.categories.index(key) for key in categories]].sum(axis=0)
+        log_ratio = np.log(attribution.income / total)
+        np.testing.assert_allclose(cube.sum(axis=0), log_ratio[np.newaxis, :] - log_ratio[:, np.newaxis],
+                                   atol=1e-12)
+        for start_year, end_year in itertools.permutations(range(2002, 2010), 2):
+            result = attribution.between(categories, start_year, end_year)
+            assert sum(result['contributions'].values()) == pytest.approx(
+                result['end_ratio'] - result['start_ratio'], abs=1e-9)
+    result = attribution.between(['housing'], 2002, 2009)
+    assert result['contributions']['income'] > 0 > result['contributions']['housing']
+
+
+def test_attribution_outside_the_covered_years():
+    attribution = compute.AffordabilityAttribution(geometric(2000, 5, 100.0, 0.1),
+                                                   {'housing': geometric(2000, 5, 10.0, 0.0)})
+    assert attribution.between([], 2000, 2004) is None
+    assert attribution.between(['housing'], 1990, 2004) is None
+    assert attribution.between(['housing'], 2000, 2004)['contributions']['housing'] == pytest.approx(0)
+
+
+def test_attribution_on_the_datasets(store):
+    attribution = affordability_attribution(store.datasets)
+    years = attribution.years.tolist()
+    for size in range(1, len(EXPENSE_CATEGORIES) + 1):
+        for categories in itertools.combinations(EXPENSE_CATEGORIES, size):
+            for start_year, end_year in [(years[0], years[-1]), (years[-1], years[0]), (years[3], years[-4])]:
+                result = attribution.between(categories, start_year, end_year)
+                assert sum(result['contributions'].values()) == pytest.approx(
+                    result['end_ratio'] - result['start_ratio'], abs=1e-9)
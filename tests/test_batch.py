@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import compute
+from analysis import EXPENSE_CATEGORIES, series_arrays
+from data_store import DEFAULT_STATE
+from scripts import batch
+
+
+def test_year_pairs_and_category_subsets():
+    assert batch.year_pairs(2000, 2002) == [(2000, 2000), (2000, 2001), (2000, 2002), (2001, 2001), (2001, 2002),
+                                            (2002, 2002)]
+    assert batch.year_pairs(2000, 2010, window=5, step=5) == [(2000, 2005), (2005, 2010)]
+    assert batch.category_subsets() == ['+'.join(EXPENSE_CATEGORIES)]
+    subsets = batch.category_subsets(every_subset=True)
+    assert len(subsets) == 2 ** len(EXPENSE_CATEGORIES) and subsets[0] == ''
+
+
+def test_batch_run_matches_the_datasets(store, tmp_path):
+    out = str(tmp_path / 'kpis.csv')
+    assert batch.main(['--out', out, '--years', '1990', '2020', '--window', '10', '--step', '10',
+                       '--views', 'actual', '--every-subset', '--workers', '1']) == 0
+    results = pd.read_csv(out, keep_default_na=False, na_values=[''])
+    assert len(results) == 3 * 2 ** len(EXPENSE_CATEGORIES)
+    assert list(results.columns) == batch.RESULT_COLUMNS
+    years, values = series_arrays(store['income'])
+    income = values[compute.year_mask(years, 1990, 2000)]
+    decade = results[(results['start'] == 1990) & (results['end'] == 2000)]
+    np.testing.assert_allclose(decade['income_growth_pct'], compute.growth_percentage(income))
+    np.testing.assert_allclose(decade['income_end_value'], income[-1])
+    # Category columns are only filled for the selected categories
+    housing_only = decade[decade['categories'] == 'housing']
+    assert housing_only['housing_growth_pct'].notna().all()
+    assert housing_only['energy_growth_pct'].isna().all()
+
+
+def test_grid_files_are_validated(tmp_path):
+    path = tmp_path / 'grid.csv'
+    path.write_text("state,start,end\n" f"{DEFAULT_STATE},1990,2000\n")
+    grid = batch.read_grid(str(path))
+    assert grid.iloc[0].tolist() == [DEFAULT_STATE, 1990, 2000, 'actual', '+'.join(EXPENSE_CATEGORIES)]
+    state_dirs = {DEFAULT_STATE: None}
+    batch.validate_grid(grid, state_dirs)
+    for column, value in [('state', 'ZZ'), ('view', 'monthly'), ('categories', 'housing+rent')]:
+        with pytest.raises(ValueError):
+            batch.validate_grid(grid.assign(**{column: value}), state_dirs)
+    (tmp_path / 'bad.csv').write_text("state,start\nCA,1990\n")
+    with pytest.raises(ValueError):
+        batch.read_grid(str(tmp_path / 'bad.csv'))
@@ -0,0 +1,262 @@
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import dash
+import plotly
+import pytest
+from dash import html
+
+from analysis import EXPENSE_CATEGORIES
+from callbacks import build_callbacks, prerender_outputs, register_callbacks
+from defaults import DEFAULT_INPUTS
+from scripts.golden import input_grid
+
+
+@pytest.fixture(scope='module')
+def callbacks(store):
+    return build_callbacks(store)
+
+
+@pytest.fixture(scope='module')
+def defaults(store):
+    """One value for every callback input: the first one the golden harness sweeps"""
+    return {key: values[0] for key, values in input_grid(store, year_step=10).items()}
+
+
+def slider_ranges(first, last):
+    """Year ranges across the whole slider: a coarse sweep, single years and ranges without income data"""
+    sweep = sorted(set(range(first, last + 1, 10)) | {first, last})
+    ranges = [[start, end] for start, end in itertools.combinations_with_replacement(sweep, 2)]
+    return ranges + [[first, first + 2], [1970, 1980], [1983, 1984], [last - 1, last], [last, last]]
+
+
+def call(func, values):
+    return func(*[values[f"{item.component_id}.{item.component_property}"] for item in func.inputs])
+
+
+def test_every_callback_over_the_slider_span(callbacks, defaults, slider_years):
+    for years in slider_ranges(*slider_years):
+        for expenses in ([], list(EXPENSE_CATEGORIES)):
+            values = {**defaults, 'year-slider.value': years, 'expense-checklist.value': expenses,
+                      'personal-income-input.value': 60000, 'forecast-radio.value': 'holt',
+                      'rolling-measure.value': 'cagr'}
+            for name, func in callbacks.items():
+                outputs = call(func, values)
+                assert len(outputs) == len(func.outputs), (name, years, expenses)
+                # Every output has to serialize the way Dash sends it
+                plotly.io.json.to_json_plotly(list(outputs))
+
+
+@pytest.mark.parametrize('income', [None, 0, 60000])
+@pytest.mark.parametrize('years', [[1968, 1983], [1970, 1980], [2024, 2025]])
+def test_income_comparison_without_income_data(callbacks, income, years):
+    result, fig = callbacks['update_income_comparison'](income, years)
+    assert len(fig['data']) == 3
+    assert all(not len(trace['x']) for trace in fig['data'])
+    if income:
+        assert isinstance(result, html.P) and "No median income data" in result.children
+    else:
+        assert isinstance(result, html.Div) and result.children is None
+
+
+def test_income_comparison_with_income_data(callbacks):
+    result, fig = callbacks['update_income_comparison'](60000, [1990, 2020])
+    median, income_line, percentile = fig['data']
+    assert len(median['x']) == len(percentile['y']) > 0
+    assert list(income_line['y']) == [60000, 60000]
+    assert fig['layout']['yaxis2']['visible']
+
+
+def test_income_comparison_without_income_shows_the_medians(callbacks):
+    result, fig = callbacks['update_income_comparison'](None, [1990, 2020])
+    median, income_line, percentile = fig['data']
+    assert len(median['x']) == len(median['y']) > 0
+    assert not len(income_line['x']) and not len(percentile['x'])
+    assert not fig['layout']['yaxis2']['visible']
+
+
+@pytest.mark.parametrize('adults, children', [(1, 0), (2, 3)])
+def test_household_budget_families(callbacks, defaults, adults, children):
+    values = {**defaults, 'year-slider.value': [1990, 2020], 'household-adults.value': adults,
+              'household-children.value': children}
+    budget_fig, surplus_fig, _ = call(callbacks['update_household_budget'], values)
+    assert len(budget_fig['data'][0]['x']) == len(surplus_fig['data'][0]['x']) > 0
+
+
+def test_projection_needs_three_years(callbacks, defaults):
+    values = {**defaults, 'year-slider.value': [2000, 2001]}
+    fig, summary = call(callbacks['update_projection'], values)
+    assert "Not enough data" in summary.children
+
+
+@pytest.mark.parametrize('forecast', ['none', 'linear', 'log-linear', 'holt'])
+def test_forecasts_extend_ranges_that_reach_the_last_year(callbacks, defaults, store, forecast):
+    last_year = int(store['income']['observation_date'].dt.year.max())
+    for years, extended in [([1990, last_year], forecast != 'none'), ([1990, last_year - 5], False)]:
+        values = {**defaults, 'year-slider.value': years, 'forecast-radio.value': forecast,
+                  'rolling-measure.value': 'none'}
+        fig = call(callbacks['update_income_tab'], values)[0]
+        names = [trace['name'] for trace in fig['data']]
+        assert any(name.startswith('Forecast') for name in names) == extended, (years, names)
+
+
+@pytest.mark.parametrize('view', ['actual', 'percent', 'adjusted'])
+@pytest.mark.parametrize('measure', ['none', 'moving-average', 'volatility'])
+def test_views_and_overlays_on_ranges_without_income(callbacks, defaults, view, measure):
+    values = {**defaults, 'year-slider.value': [1970, 1980], 'view-radio.value': view,
+              'forecast-radio.value': 'linear', 'rolling-measure.value': measure}
+    for name in ('update_income_tab', 'update_expenses_tab', 'update_comparative_tab', 'update_growth_heatmap'):
+        call(callbacks[name], values)
+    fig, rows, _, growth = call(callbacks['update_income_tab'], values)
+    assert rows == [] and growth == "N/A"
+
+
+def test_growth_heatmap_marks_the_selected_range(callbacks, defaults):
+    values = {**defaults, 'year-slider.value': [1990, 2020], 'heatmap-series.value': 'income',
+              'view-radio.value': 'actual'}
+    fig, _ = call(callbacks['update_growth_heatmap'], values)
+    heatmap, selected = fig['data']
+    assert (selected['x'][0], selected['y'][0]) == (2020, 1990)
+    # The marked cell agrees with the income growth KPI
+    growth = call(callbacks['update_income_tab'], values)[3]
+    assert f"{growth.rstrip('%')}%" in selected['hovertemplate']
+
+    fig, summary = call(callbacks['update_growth_heatmap'], {**values, 'year-slider.value': [1970, 1980]})
+    assert len(fig['data']) == 1
+    assert "not covered" in str(summary.children[0])
+
+
+def test_work_hours_are_not_available_without_data(callbacks, defaults):
+    values = {**defaults, 'year-slider.value': [1968, 1970], 'expense-checklist.value': ['housing']}
+    *_, housing_ratio, _ = call(callbacks['update_comparative_tab'], values)
+    assert housing_ratio == "N/A"
+    _, min_wage_hours, median_pay_hours = call(callbacks['update_work_hours'], values)
+    assert median_pay_hours == "N/A"
+
+
+@pytest.mark.parametrize('adults, children', [(1, 0), (2, 3)])
+def test_living_wage_families(callbacks, defaults, adults, children):
+    values = {**defaults, 'year-slider.value': [1990, 2020], 'living-wage-adults.value': adults,
+              'living-wage-children.value': children}
+    trend_fig, families_fig, _ = call(callbacks['update_living_wage'], values)
+    assert len(families_fig['data'][0]['x']) == 8
+
+
+def test_attribution_needs_income_and_expenses_in_range(callbacks, defaults):
+    values = {**defaults, 'year-slider.value': [1968, 1970], 'expense-checklist.value': ['housing']}
+    _, summary = call(callbacks['update_affordability_attribution'], values)
+    assert isinstance(summary, html.P)
+
+
+def test_prerendered_outputs_cover_every_output(callbacks, defaults):
+    rendered = prerender_outputs(callbacks, defaults)
+    assert set(rendered) == {f"{output.component_id}.{output.component_property}"
+                             for func in callbacks.values() for output in func.outputs}
+    fig, rows, columns, growth = call(callbacks['update_income_tab'], defaults)
+    assert rendered['income-growth-value.children'] == growth
+
+
+def find_component(layout, component_id):
+    """The component with the given id in a serialized Dash layout, or None"""
+    if isinstance(layout, dict):
+        if layout.get('props', {}).get('id') == component_id:
+            return layout
+        children = layout.get('props', {}).get('children')
+        return find_component(children, component_id) if children is not None else None
+    if isinstance(layout, list):
+        for child in layout:
+            found = find_component(child, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+@pytest.fixture(scope='module')
+def dash_app():
+    app_module = pytest.importorskip('app')
+    return app_module.app
+
+
+def test_every_callback_over_http(dash_app):
+    from scripts.dash_client import initial_payloads, UPDATE_URL
+
+    client = dash_app.server.test_client()
+    for years in ([1968, 1975], [1990, 2020]):
+        for name, payload in initial_payloads(dash_app, {'year-slider.value': years,
+                                                         'projection-paths.value': 1000}):
+            response = client.post(UPDATE_URL, json={**payload, 'changedPropIds': ['year-slider.value']})
+            assert response.status_code in (200, 204), (name, years)
+
+
+@pytest.mark.parametrize('income', [None, 60000])
+@pytest.mark.parametrize('years', [[1970, 1980], [1990, 2020]])
+def test_income_comparison_over_http(dash_app, income, years):
+    from scripts.dash_client import UPDATE_URL, build_payload
+
+    output = next(key for key in dash_app.callback_map if 'income-comparison-chart' in key)
+    payload = build_payload(dash_app, output, {'personal-income-input.value': income, 'year-slider.value': years},
+                            changed=['personal-income-input.value'])
+    response = dash_app.server.test_client().post(UPDATE_URL, json=payload)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('changed, median_sent', [(['personal-income-input.value'], False),
+                                                   (['year-slider.value'], True)])
+def test_income_patch_leaves_the_medians_when_only_the_income_changed(dash_app, changed, median_sent):
+    from scripts.dash_client import UPDATE_URL, build_payload
+
+    output = next(key for key in dash_app.callback_map if 'income-comparison-chart' in key)
+    payload = build_payload(dash_app, output, {'personal-income-input.value': 75000}, changed=changed)
+    response = dash_app.server.test_client().post(UPDATE_URL, json=payload).get_json()
+    patch = response['response']['income-comparison-chart']['figure']
+    locations = [operation['location'] for operation in patch['operations']]
+    assert ['data', 1, 'y'] in locations
+    assert (['data', 0, 'y'] in locations) == median_sent
+
+
+def test_layout_ships_prerendered_outputs(dash_app):
+    layout = dash_app.server.test_client().get('/_dash-layout').get_json()
+    assert find_component(layout, 'income-growth-value')['props']['children'].endswith('%')
+    assert find_component(layout, 'income-chart')['props']['figure']['data']
+
+
+def test_layout_warmup_starts_with_the_first_request():
+    code = ("import threading, app\n"
+            "before = [thread.name for thread in threading.enumerate()]\n"
+            "app.app.server.test_client().get('/')\n"
+            "app.layout_warmup.join()\n"
+            "print(before, 'layout_prerender' in app.startup_timings)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "['MainThread'] True"
+
+
+def test_projection_runs_as_a_background_job(store, tmp_path):
+    diskcache = pytest.importorskip('diskcache')
+    from scripts.dash_client import UPDATE_URL, build_payload
+
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = html.Div()
+    manager = dash.DiskcacheManager(diskcache.Cache(str(tmp_path)))
+    callbacks = register_callbacks(app, store, background_manager=manager)
+
+    # The prerendered layout leaves the simulation to the page load
+    rendered = prerender_outputs(callbacks, DEFAULT_INPUTS)
+    assert rendered['projection-chart.figure'] is None and rendered['projection-summary.children'] is None
+    client = app.server.test_client()
+    output = next(key for key in app.callback_map if 'projection-chart' in key)
+    dependency = next(item for item in client.get('/_dash-dependencies').get_json() if item['output'] == output)
+    assert not dependency['prevent_initial_call']
+
+    payload = build_payload(app, output, {'projection-paths.value': 1000}, changed=['year-slider.value'])
+    job = client.post(UPDATE_URL, json=payload).get_json()
+    for _ in range(600):
+        body = client.post(f"{UPDATE_URL}?cacheKey={job['cacheKey']}&job={job['job']}", json=payload).get_json()
+        if body and 'response' in body:
+            break
+        time.sleep(0.1)
+    assert body['response']['projection-chart']['figure']['data']
+
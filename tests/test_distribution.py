@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import compute
+
+
+def test_normal_cdf_is_monotonic_and_symmetric():
+    z = np.linspace(-8, 8, 321)
+    cdf = compute.normal_cdf(z)
+    assert (np.diff(cdf) >= 0).all()
+    assert cdf[0] >= 0 and cdf[-1] <= 1
+    np.testing.assert_allclose(cdf + cdf[::-1], 1, atol=1e-12)
+    assert compute.normal_cdf(0) == pytest.approx(0.5)
+
+
+def test_income_percentiles_are_monotonic_and_centered_on_the_median():
+    years = np.array([2000, 2001, 2002])
+    distribution = compute.IncomeDistribution.lognormal(years, np.array([50000.0, 52000.0, 55000.0]))
+    assert (np.diff(distribution.cdf, axis=1) >= 0).all()
+    assert (np.diff(distribution.incomes, axis=1) > 0).all()
+    incomes = np.geomspace(100, 1e8, 400)
+    percentiles = distribution.percentile(incomes, 2001)
+    assert (np.diff(percentiles) >= 0).all()
+    assert 0 <= percentiles[0] and percentiles[-1] <= 100
+    assert distribution.percentile(52000, 2001) == pytest.approx(50, abs=0.01)
+    # Years outside the table use the closest table year
+    assert distribution.percentile(50000, 1990) == pytest.approx(50, abs=0.01)
+    assert distribution.percentile(55000, 2010) == pytest.approx(50, abs=0.01)
+    np.testing.assert_allclose(distribution.percentile_trend(55000, years),
+                               [distribution.percentile(55000, year) for year in years])
@@ -0,0 +1,76 @@
+import io
+import time
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from analysis import filter_by_year_range
+import api
+from api import API_PREFIX, register_api
+from export import register_export
+
+
+@pytest.fixture(scope='module')
+def client(store):
+    server = Flask(__name__)
+    register_api(server, store)
+    jobs = register_export(server, store)
+    yield server.test_client()
+    jobs.shutdown()
+
+
+def test_csv_export(client, store):
+    response = client.get(f"{API_PREFIX}/export.csv?start=2000&end=2010&categories=energy,housing&view=percent")
+    assert response.status_code == 200
+    assert 'attachment' in response.headers['Content-Disposition']
+    frame = pd.read_csv(io.BytesIO(response.data))
+    assert list(frame['series'].unique()) == ['income', 'min_wage', 'energy', 'housing']
+    expected_rows = sum(len(filter_by_year_range(store[key], 2000, 2010))
+                        for key in ('income', 'min_wage', 'energy', 'housing'))
+    assert len(frame) == expected_rows
+    # The percent view starts every series at zero
+    assert (frame.groupby('series')['value'].first() == 0).all()
+
+
+def test_parquet_and_excel_exports(client):
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('openpyxl')
+    parquet = client.get(f"{API_PREFIX}/export.parquet?start=2000&end=2010")
+    assert parquet.status_code == 200
+    frame = pd.read_parquet(io.BytesIO(parquet.data))
+    assert set(frame['series']) == {'income', 'min_wage', 'energy', 'healthcare', 'housing', 'leisure'}
+    excel = client.get(f"{API_PREFIX}/export.xlsx?start=2000&end=2010")
+    assert excel.status_code == 200
+    assert excel.data[:2] == b'PK'
+
+
+@pytest.mark.parametrize('url', [f"{API_PREFIX}/export.pdf", f"{API_PREFIX}/export.csv?states=ZZ",
+                                 f"{API_PREFIX}/export.csv?start=2020&end=2000"])
+def test_bad_export_requests_are_rejected(client, url):
+    assert client.get(url).status_code == 400
+
+
+def test_background_export_job(client):
+    response = client.post(f"{API_PREFIX}/exports?format=csv&start=2000&end=2005")
+    assert response.status_code == 202
+    status_url = response.get_json()['status_url']
+    for _ in range(200):
+        status = client.get(status_url).get_json()
+        if status['status'] in ('done', 'failed'):
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'done'
+    download = client.get(status['download_url'])
+    assert download.status_code == 200
+    assert download.data.startswith(b'state,series,label')
+    assert client.get(f"{API_PREFIX}/exports/unknown").status_code == 404
+
+
+def test_exports_share_the_api_year_bounds(client, store, monkeypatch):
+    bounds, scans = api.year_bounds(store.datasets), []
+    monkeypatch.setattr(api, 'year_bounds', lambda datasets: scans.append(1) or bounds)
+    api._year_bounds_for.cache_clear()
+    for url in ('export.csv', 'export.csv?view=percent', 'kpis', 'export.csv'):
+        assert client.get(f"{API_PREFIX}/{url}").status_code == 200
+    assert len(scans) == 1
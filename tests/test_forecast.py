@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import compute
+from helpers import geometric
+
+
+def test_trend_fits_recover_exact_trends():
+    years = np.arange(2000, 2010)
+    linear = compute.fit_trends(years, 1000 + 50.0 * (years - 2000))['linear']
+    assert linear.params['slope'] == pytest.approx(50)
+    extension_years, extension = linear.extension(2015)
+    assert extension_years[0] == 2009 and extension_years[-1] == 2015
+    np.testing.assert_allclose(extension, 1000 + 50.0 * (extension_years - 2000))
+
+    _, values = geometric(2000, 10, 100.0, 0.04)
+    log_linear = compute.fit_trends(years, values)['log-linear']
+    assert log_linear.params['rate'] == pytest.approx(0.04)
+    assert log_linear.predict([2011])[0] == pytest.approx(values[-1] * 1.04 ** 2)
+
+    holt = compute.fit_trends(years, 1000 + 50.0 * (years - 2000))['holt']
+    assert holt.params['trend'] == pytest.approx(50)
+    # Every extension starts on the last observation
+    for fit in (linear, log_linear, holt):
+        assert fit.extension()[1][0] == pytest.approx(fit.values[-1])
+        np.testing.assert_allclose(fit.predict(fit.years), fit.values)
+
+
+def test_trend_fits_need_three_years_and_positive_values_for_log_linear():
+    assert compute.fit_trends(np.array([2000, 2001]), np.array([1.0, 2.0])) == {}
+    fits = compute.fit_trends(np.array([2000, 2001, 2002]), np.array([-1.0, 0.0, 1.0]))
+    assert set(fits) == {'linear', 'holt'}
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+import compute
+from helpers import geometric
+
+
+def test_growth_cube_matches_growth_between_two_years():
+    years, values = geometric(2000, 6, 100.0, 0.1)
+    values[2] = np.nan
+    cube = compute.GrowthCube({'series': (years[~np.isnan(values)], values[~np.isnan(values)])})
+    grid_years, growth = cube.matrix('series')
+    np.testing.assert_array_equal(grid_years, years)
+    assert np.isnan(growth[np.tril_indices(len(years))]).all()
+    assert growth[0, 5] == pytest.approx(compute.growth_percentage(values[[0, 5]]))
+    assert growth[1, 3] == pytest.approx(21.0)
+    assert np.isnan(growth[2]).all() and np.isnan(growth[:, 2]).all()
+    assert cube.growth_between('series', 2000, 2005) == pytest.approx(growth[0, 5])
+    assert cube.growth_between('series', 2000, 2002) is None
+    assert cube.growth_between('series', 2005, 2000) is None
+    assert cube.growth_between('series', 1990, 2005) is None
+    # Real growth removes the flat inflation rate
+    real = cube.growth_between('series', 2000, 2001, real=True)
+    assert real == pytest.approx((1.1 / (1 + compute.series.INFLATION_RATE) - 1) * 100)
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+import compute
+
+
+def test_work_hours():
+    min_wage = (np.array([2000, 2001, 2002]), np.array([5.0, 10.0, 0.0]))
+    income = (np.array([2000, 2001]), np.array([41600.0, 52000.0]))
+    housing = (np.array([2000, 2001, 2002]), np.array([1000.0, 2000.0, 3000.0]))
+    hours = compute.WorkHours(min_wage, income, {'housing': housing})
+    years, by_category = hours.in_range('min_wage', 1990, 2010)
+    np.testing.assert_array_equal(years, [2000, 2001])
+    np.testing.assert_allclose(by_category['housing'], [200, 200])
+    years, by_category = hours.in_range('median_pay', 1990, 2010)
+    np.testing.assert_allclose(by_category['housing'], [50, 80])
+    assert hours.latest('min_wage', 'housing', 1990, 2010) == (2001, pytest.approx(200))
+    assert hours.latest('min_wage', 'housing', 2002, 2010) is None
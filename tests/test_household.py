@@ -0,0 +1,19 @@
+import numpy as np
+
+import compute
+from helpers import geometric
+
+
+def test_household_budget_and_surplus():
+    per_capita = {'housing': geometric(2000, 5, 1000.0, 0.1), 'energy': geometric(2001, 5, 100.0, 0.0)}
+    budget = compute.HouseholdBudget(per_capita)
+    years, by_category = budget.budget(1, 0, 1990, 2030)
+    np.testing.assert_array_equal(years, np.arange(2001, 2005))
+    np.testing.assert_allclose(by_category['energy'], 100.0)
+    years, by_category = budget.budget(2, 2, 2002, 2003, ['housing'])
+    np.testing.assert_allclose(by_category['housing'], per_capita['housing'][1][2:4] * 3 ** 0.5)
+    years, total, surplus = budget.surplus(2, 2, 2002, 2003, 5000.0)
+    np.testing.assert_allclose(total, sum(budget.budget(2, 2, 2002, 2003)[1].values()))
+    np.testing.assert_allclose(surplus, 5000.0 - total)
+    years, total, surplus = budget.surplus(1, 0, 2002, 2003, 500.0, [])
+    np.testing.assert_allclose(total, 0.0)
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import compute
+
+
+@pytest.mark.parametrize('ratio_pct, tier', [
+    (0, 'significantly below'),
+    (49.999, 'significantly below'),
+    (50, 'below'),
+    (79.999, 'below'),
+    (80, 'near'),
+    (119.999, 'near'),
+    (120, 'above'),
+    (1e9, 'above'),
+])
+def test_income_tier_boundaries(ratio_pct, tier):
+    assert compute.income_tier(ratio_pct) == tier
+    assert compute.income_tiers(np.array([ratio_pct]))[0] == tier
+
+
+def test_compute_does_not_import_dash_or_pandas():
+    code = "import sys, compute; print(sorted({'dash', 'pandas', 'plotly'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(compute.__path__[0]))
+    assert result.stdout.strip() == '[]'
+
+
+def test_score_incomes_matches_compare_income():
+    incomes = np.array([0, 20000, 40000, 64000, 80000, 96000, 250000])
+    scores = compute.score_incomes(incomes, 80000, min_wage=15, expenses={'housing': 20000, 'energy': 0})
+    for index, income in enumerate(incomes):
+        single = compute.compare_income(income, 80000)
+        assert scores['ratio_pct'][index] == pytest.approx(single['ratio_pct'])
+        assert scores['difference'][index] == pytest.approx(single['difference'])
+        assert scores['tier'][index] == single['tier']
+    np.testing.assert_allclose(scores['min_wage_multiple'], incomes / (15 * compute.FULL_TIME_HOURS))
+    np.testing.assert_allclose(scores['housing_ratio'], incomes / 20000)
+    assert np.isnan(scores['energy_ratio']).all()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import compute
+from analysis import EXPENSE_CATEGORIES, series_arrays
+from compute.living_wage import after_tax_table
+
+
+@pytest.mark.parametrize('adults', [1, 2])
+def test_tax_schedule_round_trips(adults):
+    brackets = compute.TAX_BRACKETS[adults]
+    pre_tax, after_tax = after_tax_table(brackets)
+    assert (np.diff(after_tax) > 0).all()
+    for (lower, rate), bound in zip(brackets, pre_tax):
+        assert lower == bound and 0 < rate < 1
+    incomes = np.linspace(0, 400000, 81)
+    needs = np.interp(incomes, pre_tax, after_tax)[np.newaxis, :]
+    np.testing.assert_allclose(compute.pre_tax_income(needs, np.array([2020]), brackets)[0], incomes, atol=1e-6)
+    # Other years move the brackets with inflation
+    np.testing.assert_allclose(compute.pre_tax_income(needs * 1.025, np.array([2021]), brackets)[0],
+                               incomes * 1.025, atol=1e-6)
+    # Past the table every extra dollar is taxed at the top rate
+    top_rate = brackets[-1][1]
+    beyond = compute.pre_tax_income(after_tax[-1:] + [[0, 1000]], np.array([2020]), brackets)[0]
+    assert beyond[1] - beyond[0] == pytest.approx(1000 / (1 - top_rate))
+
+
+def test_joint_filers_pay_less_than_single_filers_on_the_same_income():
+    incomes = np.linspace(30000, 400000, 38)
+    single = np.interp(incomes, *after_tax_table(compute.TAX_BRACKETS[1]))
+    joint = np.interp(incomes, *after_tax_table(compute.TAX_BRACKETS[2]))
+    assert (joint > single).all()
+
+
+def test_childcare_costs_less_for_older_children():
+    costs = compute.childcare_costs(np.arange(5))
+    assert costs[0] == 0 and costs[1] == compute.CHILDCARE_COSTS[0]
+    np.testing.assert_array_equal(np.diff(costs), [*compute.CHILDCARE_COSTS, compute.CHILDCARE_COSTS[-1]])
+
+
+def test_living_wage(store):
+    per_capita = {key: series_arrays(store[key]) for key in EXPENSE_CATEGORIES}
+    wages = compute.LivingWage(per_capita, series_arrays(store['min_wage']), series_arrays(store['income']))
+    assert wages.families == compute.living_wage_families()
+    adults = np.array([adults for adults, _ in wages.families])
+    np.testing.assert_allclose(wages.hourly, wages.annual / (adults * compute.FULL_TIME_HOURS))
+    assert (wages.annual > wages.needs).all()
+    # Each family type is taxed under its own filing status
+    for column, (family_adults, _) in enumerate(wages.families):
+        np.testing.assert_allclose(wages.annual[:, column],
+                                   compute.pre_tax_income(wages.needs[:, column], wages.years,
+                                                          compute.TAX_BRACKETS[family_adults]))
+    # More children never need less
+    for family_adults in (1, 2):
+        columns = [wages.families.index((family_adults, children)) for children in range(4)]
+        assert (np.diff(wages.annual[:, columns], axis=1) > 0).all()
+    year = int(wages.years[-1])
+    figures = wages.lookup(year, 1, 0)
+    assert figures['hourly'] == pytest.approx(wages.hourly[wages.cell(year, 1, 0)])
+    assert wages.lookup(year, 3, 0) is None
+    assert wages.lookup(1800, 1, 0) is None
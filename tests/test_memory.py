@@ -0,0 +1,41 @@
+import tracemalloc
+
+import pytest
+
+import memory
+from memory import CallbackMemoryTracker, _slope
+
+
+@pytest.fixture
+def tracker():
+    tracker = CallbackMemoryTracker()
+    yield tracker
+    tracemalloc.stop()
+
+
+def test_slope():
+    assert _slope([1, 3, 5, 7]) == pytest.approx(2)
+    assert _slope([4]) == 0.0
+
+
+def test_untraced_calls_are_not_recorded(tracker):
+    tracked = tracker.wrap('callback', lambda: bytearray(10000))
+    tracked()
+    assert tracker.summary() == {}
+
+
+def test_retained_memory_growth_is_flagged(tracker, monkeypatch):
+    # A short window keeps the snapshot per call affordable
+    monkeypatch.setattr(memory, 'GROWTH_WINDOW', 8)
+    leaked = []
+    leaking = tracker.wrap('leaking', lambda: leaked.append(bytearray(64 * 1024)))
+    steady = tracker.wrap('steady', lambda: len(bytearray(64 * 1024)))
+    tracker.start()
+    for _ in range(memory.GROWTH_WINDOW + 1):
+        leaking()
+        steady()
+    summary = tracker.summary()
+    assert summary['leaking']['growing'] and not summary['steady']['growing']
+    assert summary['leaking']['retained_bytes_mean'] >= 64 * 1024
+    assert summary['steady']['peak_bytes_max'] >= 64 * 1024
+    assert 'test_memory.py' in summary['leaking']['top_lines'][0]['line']
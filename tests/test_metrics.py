@@ -0,0 +1,66 @@
+from functools import lru_cache
+
+import pytest
+
+from metrics import SECONDS_BUCKETS, CallbackMetrics, Histogram
+
+
+def test_histogram_quantiles_interpolate_inside_buckets():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.sum == pytest.approx(16.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    # Beyond the last bucket only the lower bound is known
+    assert histogram.quantile(1.0) == 4.0
+    lines = list(histogram.prometheus_lines('metric', 'callback="cb"'))
+    assert lines[-3:] == ['metric_bucket{callback="cb",le="+Inf"} 5', 'metric_sum{callback="cb"} 16.5',
+                          'metric_count{callback="cb"} 5']
+
+
+def test_instrument_records_calls_errors_and_input_keys():
+    metrics = CallbackMetrics()
+
+    def callback(years, fail=False):
+        if fail:
+            raise ValueError(years)
+        return years
+
+    instrumented = metrics.instrument('callback', callback, hit_probe=lambda: False)
+    assert instrumented([1990, 2000]) == [1990, 2000]
+    instrumented([1990, 2000])
+    instrumented([2000, 2010])
+    with pytest.raises(ValueError):
+        instrumented([2000, 2010], fail=True)
+    summary = metrics.summary()['callback']
+    assert summary['calls'] == 4 and summary['errors'] == 1
+    assert summary['input_keys'] == 3
+    assert summary['cache_hit_ratio'] == 0
+    assert summary['wall_ms']['p50'] <= SECONDS_BUCKETS[-1] * 1000
+
+
+def test_instrument_counts_lru_cache_lookups():
+    metrics = CallbackMetrics()
+
+    @lru_cache(maxsize=4)
+    def table(year):
+        return year * 2
+
+    instrumented = metrics.instrument('callback', lambda year: table(year) + table(year + 1),
+                                      caches={'table': table})
+    instrumented(2000)
+    instrumented(2001)
+    assert metrics.summary()['callback']['lru_cache_hit_ratio'] == pytest.approx(0.25)
+    text = metrics.prometheus_text()
+    assert 'dash_callback_lru_cache_total{callback="callback",cache="table",result="hit"} 1' in text
+    assert 'dash_callback_lru_cache_total{callback="callback",cache="table",result="miss"} 3' in text
+    assert 'dash_callback_wall_seconds_count{callback="callback"} 2' in text
+
+
+def test_metrics_endpoints_over_the_dash_app():
+    app_module = pytest.importorskip('app')
+    client = app_module.app.server.test_client()
+    assert '# TYPE dash_callback_wall_seconds histogram' in client.get('/metrics').get_data(as_text=True)
+    assert isinstance(client.get('/metrics.json').get_json(), dict)
@@ -0,0 +1,52 @@
+import pytest
+from flask import Flask
+
+from profiling import CallbackProfiler, register_profiling
+
+
+def work(n):
+    return sum(index * index for index in range(n))
+
+
+@pytest.mark.parametrize('mode, data_file', [('cprofile', '.prof'), ('sampling', '.folded')])
+def test_armed_calls_are_profiled_and_then_disarmed(tmp_path, mode, data_file):
+    profiler = CallbackProfiler('secret', directory=str(tmp_path))
+    profiled = profiler.wrap('work', work)
+    assert profiled(100) == work(100) and not profiler.reports()
+    profiler.arm('work', count=2, mode=mode)
+    assert profiler.armed() == {'work': {'remaining': 2, 'mode': mode}}
+    for _ in range(3):
+        assert profiled(200000) == work(200000)
+    reports = profiler.reports()
+    assert len(reports) == 2 and not profiler.armed()
+    assert (tmp_path / f"{reports[0]}{data_file}").exists()
+    assert f"mode: {mode}" in (tmp_path / f"{reports[0]}.txt").read_text()
+
+
+def test_old_profiles_are_rotated(tmp_path):
+    profiler = CallbackProfiler('secret', directory=str(tmp_path), keep=2)
+    profiled = profiler.wrap('work', work)
+    profiler.arm('work', count=4)
+    for _ in range(4):
+        profiled(1000)
+    assert len(profiler.reports()) == 2
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_profiling_routes_need_the_admin_token(tmp_path):
+    server = Flask(__name__)
+    profiler = CallbackProfiler('secret', directory=str(tmp_path))
+    register_profiling(server, profiler)
+    server.route('/ping')(lambda: 'pong')
+    client = server.test_client()
+    assert client.get('/admin/profiles').status_code == 403
+    assert client.get('/admin/profiles', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.get('/ping', headers={'X-Profile-Callback': 'work'}).status_code == 403
+    admin = {'X-Admin-Token': 'secret'}
+    assert client.get('/ping', headers={**admin, 'X-Profile-Callback': 'work', 'X-Profile-Mode': 'trace'}
+                      ).status_code == 400
+    assert client.get('/ping', headers={**admin, 'X-Profile-Callback': 'work', 'X-Profile-Count': '3'}
+                      ).status_code == 200
+    assert client.get('/admin/profiles', headers=admin).get_json()['armed'] == {
+        'work': {'remaining': 3, 'mode': 'cprofile'}}
+    assert client.get('/admin/profiles/missing', headers=admin).status_code == 404
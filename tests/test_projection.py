@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import compute
+from helpers import geometric
+
+
+def test_monte_carlo_paths():
+    last_values, drift = np.array([100.0, 50.0]), np.array([0.02, 0.05])
+    covariance = np.array([[0.01, 0.004], [0.004, 0.02]])
+    first = compute.simulate_paths(last_values, drift, covariance, 10, 500, seed=7)
+    assert first.shape == (500, 11, 2)
+    np.testing.assert_array_equal(first, compute.simulate_paths(last_values, drift, covariance, 10, 500, seed=7))
+    np.testing.assert_array_equal(first[:, 0], np.broadcast_to(last_values, (500, 2)))
+    bands = compute.fan_bands(first)
+    assert bands.shape == (len(compute.FAN_PERCENTILES), 11, 2)
+    assert (np.diff(bands, axis=0) >= 0).all()
+    assert (np.diff(compute.ratio_bands(first, 0, 1), axis=0) >= 0).all()
+    # Without volatility every path follows the drift
+    still = compute.simulate_paths(last_values, drift, np.zeros((2, 2)), 5, 3, seed=1)
+    np.testing.assert_allclose(still[1, 5], last_values * np.exp(5 * drift))
+
+
+def test_fit_growth():
+    model = compute.fit_growth({'income': geometric(2000, 10, 100.0, 0.03),
+                                'housing': geometric(2003, 10, 10.0, 0.05)})
+    assert model['last_year'] == 2009
+    np.testing.assert_allclose(model['drift'], np.log([1.03, 1.05]))
+    np.testing.assert_allclose(model['covariance'], 0, atol=1e-20)
+    with pytest.raises(ValueError):
+        compute.fit_growth({'income': geometric(2000, 2, 100.0, 0.03)})
+    with pytest.raises(ValueError):
+        compute.fit_growth({})
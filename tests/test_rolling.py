@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import compute
+from helpers import geometric
+
+
+def test_rolling_measures():
+    years, values = geometric(2000, 8, 100.0, 0.1)
+    matrix = values[np.newaxis, :]
+    average = compute.moving_average(matrix, 3)[0]
+    assert np.isnan(average[:2]).all()
+    np.testing.assert_allclose(average[2:], [values[index - 2:index + 1].mean() for index in range(2, 8)])
+    cagr = compute.rolling_cagr(matrix, 3)[0]
+    assert np.isnan(cagr[:3]).all()
+    np.testing.assert_allclose(cagr[3:], 10.0)
+    volatility = compute.rolling_volatility(matrix, 3)[0]
+    assert np.isnan(volatility[:3]).all()
+    np.testing.assert_allclose(volatility[3:], 0.0, atol=1e-9)
+    # Windows longer than the series leave everything undefined
+    assert np.isnan(compute.moving_average(matrix, 9)).all()
+    assert np.isnan(compute.rolling_cagr(matrix, 8)).all()
+
+
+def test_rolling_analytics_series_in_a_range():
+    analytics = compute.RollingAnalytics({'series': geometric(2000, 10, 100.0, 0.05)})
+    years, values = analytics.series('series', 'cagr', 3, 2001, 2005)
+    np.testing.assert_array_equal(years, [2003, 2004, 2005])
+    np.testing.assert_allclose(values, 5.0)
+    with pytest.raises(ValueError):
+        analytics.values('median', 3)
+    with pytest.raises(ValueError):
+        analytics.values('cagr', 1)
+
+
+def test_year_grid_with_gaps():
+    years, matrix = compute.year_grid({'a': (np.array([2001, 2003]), np.array([1.0, 3.0])),
+                                       'b': (np.array([2002, 2002]), np.array([2.0, 9.0])),
+                                       'c': (np.array([], dtype=int), np.array([]))})
+    np.testing.assert_array_equal(years, [2001, 2002, 2003])
+    np.testing.assert_array_equal(matrix[0], [1.0, np.nan, 3.0])
+    np.testing.assert_array_equal(matrix[1], [np.nan, 2.0, np.nan])
+    assert np.isnan(matrix[2]).all()
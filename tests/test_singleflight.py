@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, normalize_key
+
+
+def test_normalize_key():
+    assert normalize_key('cb', [['housing', 'energy'], [1990, 2020]]) == \
+        normalize_key('cb', [['energy', 'housing'], [1990, 2020]])
+    assert normalize_key('cb', [[1990, 2020]]) != normalize_key('cb', [[2020, 1990]])
+    assert normalize_key('cb', [1], {'b': 2, 'a': 1}) == normalize_key('cb', [1], {'a': 1, 'b': 2})
+    hash(normalize_key('cb', [{'x': [1, 2]}, None]))
+    assert normalize_key('cb', [1], version='a') != normalize_key('cb', [1], version='b')
+    assert normalize_key('cb', [1], trigger=('a.value',)) != normalize_key('cb', [1], trigger=('b.value',))
+
+
+def concurrent_calls(func, arguments):
+    """Call func once per argument from its own thread, all released at once; returns the results"""
+    barrier = threading.Barrier(len(arguments))
+    results = [None] * len(arguments)
+
+    def run(index, argument):
+        barrier.wait()
+        try:
+            results[index] = func(argument)
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=run, args=item) for item in enumerate(arguments)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    @flight.wrap
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.2)
+        return [value]
+
+    results = concurrent_calls(slow, [1] * 8 + [2] * 4)
+    assert sorted(calls) == [1, 2]
+    assert results[:8] == [[1]] * 8 and results[8:] == [[2]] * 4
+    assert flight.stats == {'computed': 2, 'shared': 10}
+    # Finished calls are forgotten, so a later call computes again
+    assert slow(1) == [1] and calls.count(1) == 2
+
+
+def test_calls_after_a_data_reload_are_not_shared():
+    version = ['old']
+    flight = SingleFlight(version=lambda: version[0])
+    release = threading.Event()
+    calls = []
+    results = []
+
+    @flight.wrap
+    def load(value):
+        calls.append(version[0])
+        release.wait()
+        return version[0]
+
+    def run():
+        results.append(load(1))
+
+    first = threading.Thread(target=run)
+    first.start()
+    while not calls:
+        time.sleep(0.01)
+    # The data reloads while the first call is still running, so the next caller computes its own result
+    version[0] = 'new'
+    second = threading.Thread(target=run)
+    second.start()
+    for _ in range(200):
+        if len(calls) == 2:
+            break
+        time.sleep(0.01)
+    release.set()
+    first.join()
+    second.join()
+    assert calls == ['old', 'new']
+    assert flight.stats == {'computed': 2, 'shared': 0}
+
+
+def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+
+    @flight.wrap
+    def failing(value):
+        time.sleep(0.1)
+        raise RuntimeError(value)
+
+    results = concurrent_calls(failing, ['boom'] * 4)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats['computed'] == 1
+    with pytest.raises(RuntimeError):
+        failing('again')
+
+
+def test_disabled_flight_calls_through():
+    flight = SingleFlight(enabled=False)
+    calls = []
+
+    @flight.wrap
+    def record(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value
+
+    concurrent_calls(record, [1] * 4)
+    assert calls == [1] * 4
+    assert not flight.last_call_shared()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from analysis import EXPENSE_CATEGORIES, affordability_attribution, expense_keys, living_wage
+from callbacks import build_callbacks, prerender_outputs
+from data_store import DataStore, discover_states
+from scripts import synth_fred
+from scripts.golden import input_grid
+
+
+@pytest.fixture(scope='module')
+def wide_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp('synth')
+    synth_fred.main(['--out', str(out), '--states', '2', '--years', '30', '--categories', '7', '--seed', '3'])
+    return str(out)
+
+
+def test_synthetic_states_load(wide_dir):
+    states = discover_states(wide_dir)
+    assert len(states) == 2
+    for state in states:
+        store = DataStore(wide_dir, state=state)
+        assert len(store.datasets) == 9
+        years = store['min_wage']['observation_date'].dt.year
+        assert years.min() == 1995 and years.max() == 2024
+
+
+def test_extra_categories_reach_the_analysis(wide_dir):
+    store = DataStore(wide_dir)
+    keys = expense_keys(store.datasets)
+    assert keys == list(EXPENSE_CATEGORIES) + ['extra_01', 'extra_02', 'extra_03']
+    attribution = affordability_attribution(store.datasets)
+    assert attribution.categories == keys
+    result = attribution.between(keys, int(attribution.years[0]), int(attribution.years[-1]))
+    assert sum(result['contributions'].values()) == pytest.approx(result['end_ratio'] - result['start_ratio'])
+    assert living_wage(store.datasets).annual.shape[1] == 8
+
+
+def test_dashboard_runs_on_wide_data(wide_dir):
+    store = DataStore(wide_dir)
+    defaults = {key: values[0] for key, values in input_grid(store).items()}
+    rendered = prerender_outputs(build_callbacks(store), {**defaults, 'year-slider.value': [2000, 2024]})
+    assert rendered['income-growth-value.children'].endswith('%')
+
+
+def test_extra_categories_do_not_change_the_real_ones(tmp_path):
+    narrow, wide = tmp_path / 'narrow', tmp_path / 'wide'
+    synth_fred.main(['--out', str(narrow), '--states', '1', '--years', '20'])
+    synth_fred.main(['--out', str(wide), '--states', '1', '--years', '20', '--categories', '5'])
+    narrow_data, wide_data = DataStore(str(narrow)).datasets, DataStore(str(wide)).datasets
+    assert set(wide_data) - set(narrow_data) == {'extra_01'}
+    for key, df in narrow_data.items():
+        np.testing.assert_array_equal(df.to_numpy(), wide_data[key].to_numpy())
+    with pytest.raises(SystemExit):
+        synth_fred.main(['--out', str(tmp_path / 'bad'), '--categories', '3'])